@@ -5,6 +5,8 @@ from pc_control.click import ClickController
 from pc_control.keyboard import KeyboardController
 from pc_control.screen import ScreenCapture
 from pc_control.windows import WindowController
+from pc_control.capture_service import get_capture_service
+from pc_control.actuator import get_input_actuator
 
 logger = logging.getLogger(__name__)
 
@@ -17,6 +19,9 @@ class Executor:
         self.keyboard = KeyboardController()
         self.screen = ScreenCapture()
         self.windows = WindowController()
+        self.capture_service = get_capture_service()
+        # Дії миші/клавіатури - через чергу в окремому потоці, event loop не блокується
+        self.input = get_input_actuator()
     
     async def prepare_commands(self, task: dict) -> str:
         """Готує команди для виконання"""
@@ -107,19 +112,25 @@ class Executor:
             if x and y:
                 # Клік по координатам
                 if params.get('double'):
-                    self.click.double_click(x, y)
+                    await self.input.double_click(x, y)
                     return f"✅ Подвійний клік по ({x}, {y})"
                 elif params.get('button') == 'right':
-                    self.click.right_click(x, y)
+                    await self.input.right_click(x, y)
                     return f"✅ Правий клік по ({x}, {y})"
                 else:
-                    self.click.click(x, y)
+                    await self.input.click(x, y)
                     return f"✅ Клік по ({x}, {y})"
             else:
-                # Пошук по тексту на екрані
-                coords = self.screen.find_text_on_screen(target)
+                # Пошук по тексту на екрані (або лише на моніторі/у вікні)
+                bbox = self.screen.resolve_region(
+                    bbox=params.get('region'),
+                    monitor=params.get('monitor'),
+                    window=params.get('window'),
+                )
+                frame = await self.capture_service.frame()
+                coords = await self.capture_service.analyze(self.screen.find_text_on_screen, target, frame, bbox)
                 if coords:
-                    self.click.click(coords[0], coords[1])
+                    await self.input.click(coords[0], coords[1])
                     return f"✅ Клік по '{target}' на {coords}"
                 else:
                     return f"⚠️ Не знайдено '{target}' на екрані"
@@ -131,12 +142,13 @@ class Executor:
     async def _execute_type(self, text: str, params: dict) -> str:
         """Виконує введення тексту"""
         try:
-            # Спробуємо Unicode (для українського)
-            self.keyboard.write_unicode(text)
+            # Стратегія під текст: вставка шматками, пакет клавіш або повільний набір
+            stats = await self.input.enter_text(text, strategy=params.get('strategy'), rate=params.get('rate'))
             # Натискаємо Enter після введення
             await asyncio.sleep(0.2)
-            self.keyboard.press_key('enter')
-            return f"✅ Текст введено: '{text}' + Enter"
+            await self.input.press('enter')
+            preview = text if len(text) <= 50 else text[:50] + '...'
+            return f"✅ Текст введено: '{preview}' + Enter ({stats['chars']} симв., {stats['strategy']}, {stats['cps']:.0f} симв/с)"
         except Exception as e:
             logger.error(f"Type execution error: {e}")
             return f"❌ Помилка введення: {str(e)}"
@@ -144,7 +156,7 @@ class Executor:
     async def _execute_screenshot(self) -> str:
         """Робить скріншот"""
         try:
-            path = self.screen.capture()
+            path = await self.capture_service.capture()
             return f"✅ Скріншот збережено: {path}"
         except Exception as e:
             logger.error(f"Screenshot execution error: {e}")
@@ -185,7 +197,7 @@ class Executor:
         try:
             keys = params.get('keys', [])
             if keys:
-                self.keyboard.hotkey(*keys)
+                await self.input.hotkey(*keys)
                 return f"✅ Комбінація {'+'.join(keys)} виконана"
             return "⚠️ Немає клавіш для виконання"
         except Exception as e:
@@ -196,7 +208,7 @@ class Executor:
         """Чекає певний час"""
         try:
             seconds = params.get('seconds', 1)
-            await asyncio.sleep(seconds)
+            await self.input.wait(seconds)
             return f"✅ Очікування {seconds} сек завершено"
         except Exception as e:
             logger.error(f"Wait execution error: {e}")
@@ -211,7 +223,7 @@ class Executor:
             y2 = params.get('y2')
             
             if all([x1, y1, x2, y2]):
-                self.click.drag(x1, y1, x2, y2)
+                await self.input.drag(x1, y1, x2, y2)
                 return f"✅ Перетягування з ({x1}, {y1}) на ({x2}, {y2})"
             return "⚠️ Недостатньо координат"
         except Exception as e:
@@ -221,7 +233,7 @@ class Executor:
     async def _execute_alt_enter(self) -> str:
         """Виконує Alt+Enter"""
         try:
-            self.keyboard.alt_enter()
+            await self.input.run(self.keyboard.alt_enter)
             return f"✅ Alt+Enter виконано"
         except Exception as e:
             logger.error(f"Alt+Enter execution error: {e}")
@@ -230,7 +242,7 @@ class Executor:
     async def _execute_enter_alt(self) -> str:
         """Виконує Enter+Alt"""
         try:
-            self.keyboard.enter_alt()
+            await self.input.run(self.keyboard.enter_alt)
             return f"✅ Enter+Alt виконано"
         except Exception as e:
             logger.error(f"Enter+Alt execution error: {e}")
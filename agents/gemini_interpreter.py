@@ -31,7 +31,7 @@ Available actions:
 - hotkey: Press keyboard shortcut (ctrl, alt, shift, etc.)
 - wait: Wait for seconds
 - drag: Drag mouse
-- move_mouse: Move mouse to coordinates
+- move_mouse: Move mouse to screen coordinates x, y (add "relative": true to move by an offset instead)
 - keypress: Press single key
 - open_url: Open URL in browser
 - switch_tab: Switch browser tab
@@ -51,6 +51,12 @@ Example output: {"action": "type", "target": "hello world"}
 Example input: "click on the button"
 Example output: {"action": "click", "target": "button"}
 
+Example input: "move the mouse to 500, 300"
+Example output: {"action": "move_mouse", "x": 500, "y": 300}
+
+Example input: "move the mouse 100 pixels to the right"
+Example output: {"action": "move_mouse", "x": 100, "y": 0, "relative": true}
+
 Example input: "press ctrl+c"
 Example output: {"action": "hotkey", "keys": ["ctrl", "c"]}
 
@@ -1,6 +1,10 @@
 import logging
 import os
 import hashlib
+import hmac
+import json
+import time
+from urllib.parse import parse_qsl
 from dotenv import load_dotenv
 from persistence import save_users, load_users, save_user_password, verify_user_password
 
@@ -19,6 +23,43 @@ def hash_password(password: str) -> str:
     return hashlib.sha256(password.encode()).hexdigest()
 
 
+def verify_webapp_init_data(init_data: str, bot_token: str, max_age: int = 86400) -> dict:
+    """
+    Перевіряє підпис Telegram.WebApp.initData
+    
+    Args:
+        init_data: Рядок initData з Mini App
+        bot_token: Токен бота
+        max_age: Максимальний вік auth_date в секундах
+        
+    Returns:
+        dict: Дані користувача або None, якщо підпис невалідний
+    """
+    try:
+        fields = dict(parse_qsl(init_data, keep_blank_values=True))
+        received_hash = fields.pop('hash', '')
+        if not received_hash or not bot_token:
+            return None
+        
+        data_check_string = '\n'.join(f"{key}={value}" for key, value in sorted(fields.items()))
+        secret_key = hmac.new(b'WebAppData', bot_token.encode(), hashlib.sha256).digest()
+        expected_hash = hmac.new(secret_key, data_check_string.encode(), hashlib.sha256).hexdigest()
+        
+        if not hmac.compare_digest(expected_hash, received_hash):
+            logger.warning("Invalid Mini App initData signature")
+            return None
+        
+        if max_age and time.time() - int(fields.get('auth_date', 0)) > max_age:
+            logger.warning("Expired Mini App initData")
+            return None
+        
+        return json.loads(fields.get('user', '{}'))
+    
+    except Exception as e:
+        logger.error(f"initData verification error: {e}")
+        return None
+
+
 class AuthManager:
     """Менеджер аутентифікації"""
     
@@ -0,0 +1,89 @@
+#!/usr/bin/env python3
+"""
+Бенчмарк шляху виконання дій без дисплея
+
+Підміняє бекенд вводу на RecordingBackend (події лише записуються, пауз
+після дій немає) і проганяє типові дії через Executor, ShortcutExecutor
+та InputActuator (ним користуються команди Mini App). Показує власні
+накладні витрати коду на дію - без pyautogui і фіксованих sleep.
+
+Запуск: python benchmarks/input_actions.py [--repeat 50]
+"""
+
+import argparse
+import asyncio
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from pc_control.input_backends import RecordingBackend, set_input_backend
+
+backend = RecordingBackend()
+set_input_backend(backend)
+
+from agents.executor import Executor
+from pc_control.actuator import get_input_actuator
+from shortcuts import SHORTCUTS, ShortcutExecutor
+
+EXECUTOR_TASKS = [
+    ('click x,y', {'action': 'click', 'parameters': {'x': 100, 'y': 200}}),
+    ('double click', {'action': 'click', 'parameters': {'x': 100, 'y': 200, 'double': True}}),
+    ('hotkey', {'action': 'hotkey', 'parameters': {'keys': ['ctrl', 's']}}),
+    ('drag', {'action': 'drag', 'parameters': {'x1': 10, 'y1': 10, 'x2': 300, 'y2': 300}}),
+    ('alt_enter', {'action': 'alt_enter'}),
+]
+
+MINI_APP_COMMANDS = [
+    ('click', lambda a: a.click(640, 360)),
+    ('click_center', lambda a: a.click_center()),
+    ('hotkey', lambda a: a.hotkey('alt', 'left')),
+    ('write', lambda a: a.write('Привіт')),
+    ('enter_text 5k keys', lambda a: a.enter_text('x' * 5000, strategy='keys')),
+    ('enter_text 5k paste', lambda a: a.enter_text('Привіт ' * 700, strategy='paste')),
+    ('move', lambda a: a.move(10, 10)),
+]
+
+
+async def measure(name: str, factory, repeat: int) -> tuple:
+    """(назва, середній час дії в мс, подій на дію)"""
+    backend.clear()
+    start = time.perf_counter()
+    for _ in range(repeat):
+        await factory()
+    elapsed = (time.perf_counter() - start) / repeat
+    return name, elapsed * 1000, len(backend.events) / repeat
+
+
+async def main():
+    parser = argparse.ArgumentParser(description='Headless input path benchmark')
+    parser.add_argument('--repeat', type=int, default=50, help='Повторів кожної дії')
+    args = parser.parse_args()
+    
+    executor = Executor()
+    shortcuts = ShortcutExecutor()
+    actuator = get_input_actuator()
+    
+    rows = []
+    for name, task in EXECUTOR_TASKS:
+        rows.append(('Executor',) + await measure(name, lambda task=task: executor.execute(task), args.repeat))
+    for name in SHORTCUTS:
+        rows.append(('Shortcut',) + await measure(name, lambda name=name: shortcuts.execute_shortcut(name), args.repeat))
+    for name, command in MINI_APP_COMMANDS:
+        rows.append(('Mini App',) + await measure(name, lambda command=command: command(actuator), args.repeat))
+    
+    print(f"⌨️ Бекенд: {backend.name}, повторів: {args.repeat}\n")
+    print(f"{'Path':<10}{'Action':<22}{'ms/action':>11}{'events':>8}")
+    print('-' * 51)
+    for path, name, ms, events in rows:
+        print(f"{path:<10}{name:<22}{ms:>11.3f}{events:>8.1f}")
+    
+    status = actuator.get_status()
+    print('-' * 51)
+    print(f"Черга: {status['done']} дій, очікування {status['wait_ms']:.3f} мс, виконання {status['run_ms']:.3f} мс")
+    actuator.stop()
+
+
+if __name__ == '__main__':
+    asyncio.run(main())
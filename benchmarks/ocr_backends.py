@@ -0,0 +1,81 @@
+#!/usr/bin/env python3
+"""
+Бенчмарк OCR бекендів
+
+Порівнює затримку одного виклику pytesseract (новий процес tesseract на
+кожен виклик) і tesserocr (рушій з завантаженими traineddata в процесі)
+на кадрах і смугах кадрів з screenshots/. Дрібні смуги показують вартість
+запуску процесу найкраще - саме такі виклики дають плитки та префільтр.
+
+Запуск: python benchmarks/ocr_backends.py [--dir screenshots] [--limit 5] [--repeat 3]
+"""
+
+import argparse
+import glob
+import os
+import sys
+
+import cv2
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from pc_control.ocr import MIN_TILE_HEIGHT
+from pc_control.ocr_backends import PytesseractBackend, TesserocrBackend
+
+
+def load_frames(directory: str, limit: int) -> list:
+    """Завантажує кадри з папки"""
+    frames = []
+    for path in sorted(glob.glob(os.path.join(directory, '*.png')))[:limit]:
+        frame = cv2.imread(path, cv2.IMREAD_GRAYSCALE)
+        if frame is not None:
+            frames.append((os.path.basename(path), frame))
+    return frames
+
+
+def measure(backend, images: list, repeat: int) -> dict:
+    """Проганяє всі зображення repeat разів і повертає метрики бекенда"""
+    for _ in range(repeat):
+        for image in images:
+            backend.image_to_data(image)
+    return backend.metrics()
+
+
+def main():
+    parser = argparse.ArgumentParser(description='OCR backend latency benchmark')
+    parser.add_argument('--dir', default='screenshots', help='Папка з PNG кадрами')
+    parser.add_argument('--limit', type=int, default=5, help='Максимум кадрів')
+    parser.add_argument('--repeat', type=int, default=3, help='Повторів кожного зображення')
+    parser.add_argument('--lang', default='eng', help='Мови Tesseract')
+    args = parser.parse_args()
+    
+    frames = load_frames(args.dir, args.limit)
+    if not frames:
+        print(f"❌ Немає кадрів у {args.dir}")
+        sys.exit(1)
+    
+    strips = [gray[top:top + MIN_TILE_HEIGHT] for _, gray in frames
+              for top in range(0, gray.shape[0] - MIN_TILE_HEIGHT + 1, MIN_TILE_HEIGHT)]
+    workloads = [('frames', [gray for _, gray in frames]), ('strips', strips)]
+    
+    backends = [('pytesseract', lambda: PytesseractBackend(lang=args.lang))]
+    try:
+        import tesserocr  # noqa: F401
+        backends.append(('tesserocr', lambda: TesserocrBackend(lang=args.lang)))
+    except ImportError:
+        print("⚠️ tesserocr не встановлено - лише pytesseract (pip install tesserocr)")
+    
+    print(f"🔤 Кадрів: {len(frames)}, смуг: {len(strips)}, повторів: {args.repeat}\n")
+    print(f"{'Backend':<14}{'Workload':<10}{'calls':>7}{'avg ms':>9}{'p50 ms':>9}{'p95 ms':>9}")
+    print('-' * 58)
+    
+    for name, factory in backends:
+        for workload, images in workloads:
+            backend = factory()
+            m = measure(backend, images, args.repeat)
+            backend.close()
+            print(f"{name:<14}{workload:<10}{m['calls']:>7}{m['avg_ms']:>9.0f}{m['p50_ms']:>9.0f}{m['p95_ms']:>9.0f}")
+
+
+if __name__ == '__main__':
+    main()
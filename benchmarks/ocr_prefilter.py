@@ -0,0 +1,106 @@
+#!/usr/bin/env python3
+"""
+Бенчмарк префільтра текстових областей
+
+Порівнює OCR всього кадру з OCR лише областей, знайдених OpenCV
+(detect_text_regions + колаж), на кадрах з screenshots/: час, частку
+пікселів, що йдуть у Tesseract, та частку слів повного проходу, які
+знайдено з префільтром.
+
+Запуск: python benchmarks/ocr_prefilter.py [--dir screenshots] [--limit 5]
+"""
+
+import argparse
+import glob
+import os
+import sys
+import time
+
+import cv2
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from pc_control.ocr import TextIndex, create_ocr_backend, detect_text_regions, ocr_text_regions, pack_regions
+
+
+def load_frames(directory: str, limit: int) -> list:
+    """Завантажує кадри з папки"""
+    frames = []
+    for path in sorted(glob.glob(os.path.join(directory, '*.png')))[:limit]:
+        frame = cv2.imread(path, cv2.IMREAD_GRAYSCALE)
+        if frame is not None:
+            frames.append((os.path.basename(path), frame))
+    return frames
+
+
+def words(data: dict) -> list:
+    """Розпізнані слова (нижній регістр)"""
+    return [w['norm'] for w in TextIndex(data).words]
+
+
+def recall(reference: list, found: list) -> float:
+    """Частка слів еталону, що є серед знайдених (з урахуванням повторів)"""
+    if not reference:
+        return 1.0
+    remaining = list(found)
+    hits = 0
+    for word in reference:
+        if word in remaining:
+            remaining.remove(word)
+            hits += 1
+    return hits / len(reference)
+
+
+def timed(func, *args) -> tuple:
+    """(результат, секунди)"""
+    start = time.perf_counter()
+    result = func(*args)
+    return result, time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Text-region prefilter benchmark')
+    parser.add_argument('--dir', default='screenshots', help='Папка з PNG кадрами')
+    parser.add_argument('--limit', type=int, default=5, help='Максимум кадрів')
+    parser.add_argument('--backend', default='auto', help='OCR бекенд: auto, tesserocr, pytesseract')
+    args = parser.parse_args()
+    
+    frames = load_frames(args.dir, args.limit)
+    if not frames:
+        print(f"❌ Немає кадрів у {args.dir}")
+        sys.exit(1)
+    
+    backend = create_ocr_backend(args.backend)
+    print(f"🔤 Кадрів: {len(frames)}, бекенд: {backend.name}\n")
+    print(f"{'Frame':<36}{'full s':>8}{'filter s':>10}{'saved':>8}{'detect ms':>11}{'pixels':>8}{'words':>7}{'recall':>8}")
+    print('-' * 96)
+    
+    total_full = total_filtered = 0.0
+    total_words = total_hits = 0.0
+    for name, gray in frames:
+        regions, detect_time = timed(detect_text_regions, gray)
+        collage, _ = pack_regions(gray, regions) if regions else (gray[:0], [])
+        
+        reference, full_time = timed(backend.image_to_data, gray)
+        result, filtered_time = timed(ocr_text_regions, gray, backend.image_to_data)
+        total_full += full_time
+        total_filtered += filtered_time
+        
+        reference_words = words(reference)
+        match = recall(reference_words, words(result))
+        total_words += len(reference_words)
+        total_hits += match * len(reference_words)
+        print(
+            f"{name[:35]:<36}{full_time:>8.2f}{filtered_time:>10.2f}{1 - filtered_time / full_time:>8.0%}"
+            f"{detect_time * 1000:>11.0f}{collage.size / gray.size:>8.0%}{len(reference_words):>7}{match:>8.1%}"
+        )
+    
+    print('-' * 96)
+    print(
+        f"{'Total':<36}{total_full:>8.2f}{total_filtered:>10.2f}{1 - total_filtered / total_full:>8.0%}"
+        f"{'':>26}{total_hits / max(total_words, 1):>8.1%}"
+    )
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,99 @@
+#!/usr/bin/env python3
+"""
+Бенчмарк OCR плитками
+
+Порівнює один виклик Tesseract на весь кадр (старий шлях) з паралельним
+OCR горизонтальних смуг з перекриттям на кадрах з screenshots/.
+Також показує, яка частка слів з повного проходу знайдена плитками.
+
+Запуск: python benchmarks/ocr_tiles.py [--dir screenshots] [--workers 4] [--limit 5]
+"""
+
+import argparse
+import glob
+import os
+import sys
+import time
+
+import cv2
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from pc_control.ocr import OcrEngine, TextIndex
+
+
+def load_frames(directory: str, limit: int) -> list:
+    """Завантажує кадри з папки"""
+    frames = []
+    for path in sorted(glob.glob(os.path.join(directory, '*.png')))[:limit]:
+        frame = cv2.imread(path, cv2.IMREAD_GRAYSCALE)
+        if frame is not None:
+            frames.append((os.path.basename(path), frame))
+    return frames
+
+
+def words(data: dict) -> list:
+    """Розпізнані слова (нижній регістр)"""
+    return [w['norm'] for w in TextIndex(data).words]
+
+
+def recall(reference: list, found: list) -> float:
+    """Частка слів еталону, що є серед знайдених (з урахуванням повторів)"""
+    if not reference:
+        return 1.0
+    remaining = list(found)
+    hits = 0
+    for word in reference:
+        if word in remaining:
+            remaining.remove(word)
+            hits += 1
+    return hits / len(reference)
+
+
+def timed(func, *args) -> tuple:
+    """(результат, секунди)"""
+    start = time.perf_counter()
+    result = func(*args)
+    return result, time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Tiled OCR benchmark')
+    parser.add_argument('--dir', default='screenshots', help='Папка з PNG кадрами')
+    parser.add_argument('--workers', type=int, default=os.cpu_count() or 1, help='Паралельних плиток')
+    parser.add_argument('--limit', type=int, default=5, help='Максимум кадрів')
+    args = parser.parse_args()
+
+    frames = load_frames(args.dir, args.limit)
+    if not frames:
+        print(f"❌ Немає кадрів у {args.dir}")
+        sys.exit(1)
+
+    single = OcrEngine(workers=1)
+    tiled = OcrEngine(workers=args.workers)
+
+    print(f"🔤 Кадрів: {len(frames)}, плиток: до {args.workers}\n")
+    print(f"{'Frame':<36}{'single s':>10}{'tiled s':>10}{'speedup':>10}{'words':>8}{'recall':>9}")
+    print('-' * 83)
+
+    total_single = total_tiled = 0.0
+    for name, gray in frames:
+        reference, single_time = timed(single._run, gray)
+        result, tiled_time = timed(tiled._run, gray)
+        total_single += single_time
+        total_tiled += tiled_time
+
+        reference_words = words(reference)
+        match = recall(reference_words, words(result))
+        print(
+            f"{name[:35]:<36}{single_time:>10.2f}{tiled_time:>10.2f}"
+            f"{single_time / tiled_time:>9.1f}x{len(reference_words):>8}{match:>9.1%}"
+        )
+
+    print('-' * 83)
+    print(f"{'Total':<36}{total_single:>10.2f}{total_tiled:>10.2f}{total_single / total_tiled:>9.1f}x")
+    tiled.shutdown()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,104 @@
+#!/usr/bin/env python3
+"""
+Бенчмарк кодувальників скріншотів
+
+Порівнює PNG (різні рівні стиснення), JPEG та WebP на кадрах з screenshots/,
+а також старий шлях: збереження PNG на диск + повторне читання файлу.
+
+Запуск: python benchmarks/screenshot_encoders.py [--dir screenshots] [--repeat 3]
+"""
+
+import argparse
+import glob
+import os
+import sys
+import tempfile
+import time
+
+import cv2
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from pc_control.screen import encode_frame
+
+ENCODERS = [
+    ('png level 6 (PIL default)', 'png', {'png_compression': 6}),
+    ('png level 3', 'png', {'png_compression': 3}),
+    ('png level 1', 'png', {'png_compression': 1}),
+    ('jpeg q95', 'jpeg', {'quality': 95}),
+    ('jpeg q85', 'jpeg', {'quality': 85}),
+    ('jpeg q70', 'jpeg', {'quality': 70}),
+    ('webp q80', 'webp', {'quality': 80}),
+]
+
+
+def load_frames(directory: str) -> list:
+    """Завантажує всі кадри з папки"""
+    frames = []
+    for path in sorted(glob.glob(os.path.join(directory, '*.png'))):
+        frame = cv2.imread(path)
+        if frame is not None:
+            frames.append(frame)
+    return frames
+
+
+def bench_encoder(frames: list, fmt: str, options: dict, repeat: int) -> tuple[float, float]:
+    """Повертає (середній час в мс, середній розмір в КБ)"""
+    total_time = 0.0
+    total_size = 0
+    for frame in frames:
+        for _ in range(repeat):
+            start = time.perf_counter()
+            data = encode_frame(frame, fmt=fmt, **options)
+            total_time += time.perf_counter() - start
+            total_size += len(data)
+    runs = len(frames) * repeat
+    return total_time / runs * 1000, total_size / runs / 1024
+
+
+def bench_disk_roundtrip(frames: list, repeat: int) -> tuple[float, float]:
+    """Старий шлях: PNG на диск + читання файлу назад для відправки"""
+    total_time = 0.0
+    total_size = 0
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'frame.png')
+        for frame in frames:
+            for _ in range(repeat):
+                start = time.perf_counter()
+                data = encode_frame(frame, fmt='png', png_compression=6)
+                with open(path, 'wb') as f:
+                    f.write(data)
+                with open(path, 'rb') as f:
+                    data = f.read()
+                total_time += time.perf_counter() - start
+                total_size += len(data)
+    runs = len(frames) * repeat
+    return total_time / runs * 1000, total_size / runs / 1024
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Screenshot encoder benchmark')
+    parser.add_argument('--dir', default='screenshots', help='Папка з PNG кадрами')
+    parser.add_argument('--repeat', type=int, default=3, help='Повторів на кадр')
+    args = parser.parse_args()
+
+    frames = load_frames(args.dir)
+    if not frames:
+        print(f"❌ Немає кадрів у {args.dir}")
+        sys.exit(1)
+
+    height, width = frames[0].shape[:2]
+    print(f"📸 Кадрів: {len(frames)} ({width}x{height}), повторів: {args.repeat}\n")
+    print(f"{'Encoder':<28}{'ms/frame':>10}{'KB/frame':>12}")
+    print('-' * 50)
+
+    ms, kb = bench_disk_roundtrip(frames, args.repeat)
+    print(f"{'png level 6 + disk I/O':<28}{ms:>10.1f}{kb:>12.1f}")
+
+    for name, fmt, options in ENCODERS:
+        ms, kb = bench_encoder(frames, fmt, options, args.repeat)
+        print(f"{name:<28}{ms:>10.1f}{kb:>12.1f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -1,11 +1,123 @@
+import json
 import logging
-import cv2
+import os
+import threading
+import time
+from collections import OrderedDict
 import numpy as np
 from pc_control.screen import ScreenCapture
 from pc_control.click import ClickController
+from pc_control.actuator import get_input_actuator
+from pc_control.capture_service import get_capture_service
+from pc_control.color_search import find_color_regions
+from pc_control.frame_store import exact_hash
+from pc_control.input_backends import get_input_backend
+from pc_control.ocr import get_ocr_engine, normalize_text
+from pc_control.templates import get_template_store
+from pc_control.windows import WindowController
 
 logger = logging.getLogger(__name__)
 
+LOCATIONS_FILE = "data/button_locations.json"
+
+
+class LocationMemory:
+    """
+    Пам'ять положень кнопок
+    
+    Ключ - (мітка, заголовок активного вікна, роздільність екрану), значення -
+    останні межі кнопки та контрольна сума її пікселів. Якщо на запам'ятованому
+    місці ті самі пікселі - кнопка там, і жоден пошук не потрібен.
+    Найдавніше використані записи витісняються (LRU).
+    """
+    
+    def __init__(self, path: str = LOCATIONS_FILE, max_items: int = 256):
+        self.path = path
+        self.max_items = max_items
+        self._lock = threading.Lock()
+        self._items = self._load()
+    
+    @staticmethod
+    def make_key(label: str, window_title: str, resolution: tuple) -> str:
+        return f"{normalize_text(label)}|{window_title}|{resolution[0]}x{resolution[1]}"
+    
+    @staticmethod
+    def checksum(image: np.ndarray, bbox: tuple, origin: tuple = (0, 0)) -> str:
+        """Хеш пікселів кнопки (bbox - глобальні координати, origin - зміщення кадру) або None"""
+        left, top, right, bottom = bbox
+        left, top, right, bottom = left - origin[0], top - origin[1], right - origin[0], bottom - origin[1]
+        if left < 0 or top < 0 or right > image.shape[1] or bottom > image.shape[0] or right <= left or bottom <= top:
+            return None
+        return exact_hash(image[top:bottom, left:right])
+    
+    def _load(self) -> OrderedDict:
+        """Читає збережені положення"""
+        try:
+            if os.path.exists(self.path):
+                with open(self.path, 'r', encoding='utf-8') as f:
+                    return OrderedDict(json.load(f))
+        except Exception as e:
+            logger.error(f"Error loading button locations: {e}")
+        return OrderedDict()
+    
+    def _save(self):
+        """Записує положення на диск (викликається під self._lock)"""
+        os.makedirs(os.path.dirname(self.path) or '.', exist_ok=True)
+        tmp_path = self.path + '.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(self._items, f, ensure_ascii=False)
+        os.replace(tmp_path, self.path)
+    
+    def verify(self, key: str, image: np.ndarray, origin: tuple = (0, 0)) -> dict:
+        """
+        Перевіряє запам'ятоване положення на кадрі
+        
+        Returns:
+            dict: {'bbox', 'center'} у глобальних координатах, якщо пікселі збігаються, інакше None
+        """
+        with self._lock:
+            entry = self._items.get(key)
+            if entry is None:
+                return None
+            self._items.move_to_end(key)
+        
+        if self.checksum(image, entry['bbox'], origin) != entry['checksum']:
+            return None
+        return {'bbox': tuple(entry['bbox']), 'center': tuple(entry['center'])}
+    
+    def remember(self, key: str, label: str, image: np.ndarray, bbox: tuple, center: tuple, origin: tuple = (0, 0)):
+        """Запам'ятовує положення кнопки і контрольну суму її пікселів"""
+        checksum = self.checksum(image, bbox, origin)
+        if checksum is None:
+            return
+        with self._lock:
+            self._items[key] = {
+                'label': label,
+                'bbox': list(bbox),
+                'center': list(center),
+                'checksum': checksum,
+                'updated': time.time(),
+            }
+            self._items.move_to_end(key)
+            while len(self._items) > self.max_items:
+                self._items.popitem(last=False)
+            self._save()
+    
+    def forget(self, label: str = None) -> int:
+        """Видаляє положення мітки (або всі), повертає кількість"""
+        norm = normalize_text(label) if label else None
+        with self._lock:
+            keys = [key for key, entry in self._items.items()
+                    if norm is None or normalize_text(entry['label']) == norm]
+            for key in keys:
+                del self._items[key]
+            if keys:
+                self._save()
+        return len(keys)
+    
+    def __len__(self):
+        return len(self._items)
+
 
 class ButtonFinder:
     """Пошук та клік по кнопкам на екрані"""
@@ -13,57 +125,140 @@ class ButtonFinder:
     def __init__(self):
         self.screen = ScreenCapture()
         self.click = ClickController()
+        # Кліки - через спільну чергу вводу (строго по черзі з іншими діями)
+        self.input = get_input_actuator()
+        self.capture_service = get_capture_service()
+        self.ocr = get_ocr_engine()
+        self.templates = get_template_store()
+        self.use_templates = os.getenv('TEMPLATE_MATCHING', 'true').lower() in ('1', 'true', 'yes')
+        self.windows = WindowController()
+        self.locations = LocationMemory(max_items=int(os.getenv('BUTTON_LOCATIONS_SIZE', '256')))
+    
+    def _location_keys(self, labels: list) -> list:
+        """Ключі LocationMemory для міток у поточному контексті (активне вікно, роздільність)"""
+        window_title = self.windows.get_active_window()
+        # Розмір екрану лише читається - не через чергу вводу, інакше пошук
+        # чекав би на вже поставлені дії (відтворення макросу, довгий текст)
+        resolution = tuple(get_input_backend().size())
+        return [LocationMemory.make_key(label, window_title, resolution) for label in labels]
+    
+    def _find(self, labels: list, threshold: float = 0.7, bbox: tuple = None) -> tuple:
+        """
+        Пошук міток на одному кадрі: запам'ятовані положення, шаблони, OCR - лише для промахів
+        
+        Returns:
+            (результати find_buttons, кадр, зміщення кадру (left, top), ключі LocationMemory)
+        """
+        logger.info(f"Searching for buttons: {labels}")
+        
+        # Один кадр у пам'яті на всі мітки
+        image = self.capture_service.get_frame(bbox)
+        origin = tuple(bbox[:2]) if bbox else (0, 0)
+        keys = self._location_keys(labels)
+        
+        results = [None] * len(labels)
+        
+        # Кнопка на тому ж місці з тими ж пікселями - достатньо порівняти хеш
+        for i, label in enumerate(labels):
+            match = self.locations.verify(keys[i], image, origin=origin)
+            if match:
+                results[i] = {'label': label, 'found': True, 'text': label, 'score': 1.0, 'conf': -1.0,
+                              'source': 'memory', **match}
+        
+        # Кнопки, які вже натискали: matchTemplate на зменшеному кадрі (мілісекунди)
+        pending = [label for label, result in zip(labels, results) if result is None]
+        if self.use_templates and any(self.templates.has(label) for label in pending):
+            prepared = self.templates.prepare(image)
+            for i, label in enumerate(labels):
+                if results[i] is not None:
+                    continue
+                match = self.templates.match(label, prepared, origin=origin)
+                if match:
+                    results[i] = {'label': label, 'found': True, 'text': label, 'conf': -1.0,
+                                  'source': 'template', **match}
+        
+        # Решта - один текстовий індекс на всі мітки
+        if any(result is None for result in results):
+            index = self.ocr.index(image)
+            for i, label in enumerate(labels):
+                if results[i] is not None:
+                    continue
+                # Шукаємо фразу по рядках (працює і для "Accept All"), найкращий кандидат першим
+                matches = index.find(label, min_similarity=threshold, limit=1, origin=origin)
+                if matches:
+                    results[i] = {'label': label, 'found': True, 'source': 'ocr', **matches[0]}
+                else:
+                    results[i] = {'label': label, 'found': False, 'text': '', 'center': (0, 0),
+                                  'bbox': (0, 0, 0, 0), 'score': 0.0, 'conf': -1.0, 'source': None}
+        
+        logger.info(
+            f"Buttons found: {sum(r['found'] for r in results)}/{len(labels)} "
+            f"({sum(r['source'] == 'memory' for r in results)} by location, "
+            f"{sum(r['source'] == 'template' for r in results)} by template)"
+        )
+        return results, image, origin, keys
     
-    def find_button_by_text(self, button_text: str, threshold: float = 0.7) -> tuple[bool, tuple]:
+    def find_buttons(self, labels: list, threshold: float = 0.7, bbox: tuple = None) -> list:
+        """
+        Шукає кілька кнопок за один кадр і один прохід OCR
+        
+        Кнопки з збереженим шаблоном (див. TemplateStore) знаходяться без OCR.
+        
+        Args:
+            labels: Тексти кнопок у порядку пріоритету (напр. ["OK", "Save", "Accept All"])
+            threshold: Мінімальна схожість тексту для нечіткого збігу (0..1)
+            bbox: Шукати лише в області (глобальні координати, див. ScreenCapture.resolve_region)
+        
+        Returns:
+            list: Для кожної мітки (в тому ж порядку) {'label', 'found', 'text', 'center', 'bbox',
+                  'score', 'conf', 'source'}; центр і межі - в глобальних координатах екрану,
+                  source - memory, template, ocr або None
+        """
+        return self._find(labels, threshold=threshold, bbox=bbox)[0]
+    
+    def _click_match(self, match: dict, image, origin: tuple, key: str):
+        """
+        Натискає знайдену кнопку
+        
+        Запам'ятовує її положення (LocationMemory), а знайдену через OCR - ще й як шаблон.
+        """
+        x, y = match['center']
+        self.input.call(self.click.click, x, y)
+        logger.info(f"Button clicked: {match['label']} at ({x}, {y}) via {match['source']}")
+        
+        if match['source'] != 'memory':
+            try:
+                self.locations.remember(key, match['label'], image, match['bbox'], match['center'], origin=origin)
+            except Exception as e:
+                logger.error(f"Location remember error: {e}")
+        
+        if self.use_templates and match['source'] == 'ocr':
+            left, top, right, bottom = match['bbox']
+            try:
+                self.templates.learn(match['label'], image, (left - origin[0], top - origin[1],
+                                                             right - origin[0], bottom - origin[1]))
+            except Exception as e:
+                logger.error(f"Template learn error: {e}")
+    
+    def find_button_by_text(self, button_text: str, threshold: float = 0.7, bbox: tuple = None) -> tuple[bool, tuple]:
         """
         Знаходить кнопку за текстом
         
         Args:
             button_text: Текст на кнопці (напр. "Accept All")
-            threshold: Поріг впевненості для OCR
+            threshold: Мінімальна схожість тексту для нечіткого збігу (0..1)
+            bbox: Шукати лише в області (глобальні координати, див. ScreenCapture.resolve_region)
             
         Returns:
             (знайдено, координати)
         """
         try:
-            logger.info(f"Searching for button: {button_text}")
-            
-            # Беремо скріншот
-            screenshot_path = self.screen.capture()
-            
-            # Читаємо зображення
-            image = cv2.imread(screenshot_path)
-            if image is None:
-                logger.error(f"Failed to read screenshot: {screenshot_path}")
-                return False, (0, 0)
-            
-            # Конвертуємо в сірий
-            gray = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY)
-            
-            # Розпізнаємо текст
-            try:
-                import pytesseract
-                text_data = pytesseract.image_to_data(gray, output_type=pytesseract.Output.DICT)
-                
-                # Шукаємо текст
-                for i, text in enumerate(text_data['text']):
-                    if button_text.lower() in text.lower():
-                        # Отримуємо координати
-                        x = text_data['left'][i]
-                        y = text_data['top'][i]
-                        w = text_data['width'][i]
-                        h = text_data['height'][i]
-                        
-                        # Центр кнопки
-                        center_x = x + w // 2
-                        center_y = y + h // 2
-                        
-                        logger.info(f"Button found at ({center_x}, {center_y}): {text}")
-                        return True, (center_x, center_y)
+            match = self.find_buttons([button_text], threshold=threshold, bbox=bbox)[0]
             
-            except Exception as e:
-                logger.error(f"OCR error: {e}")
-                return False, (0, 0)
+            if match['found']:
+                center_x, center_y = match['center']
+                logger.info(f"Button found at ({center_x}, {center_y}): {match['text']} (score {match['score']})")
+                return True, (center_x, center_y)
             
             logger.warning(f"Button not found: {button_text}")
             return False, (0, 0)
@@ -72,12 +267,13 @@ class ButtonFinder:
             logger.error(f"Button finder error: {e}")
             return False, (0, 0)
     
-    def find_and_click_button(self, button_text: str) -> str:
+    def find_and_click_button(self, button_text: str, bbox: tuple = None) -> str:
         """
         Знаходить кнопку та натискає на неї
         
         Args:
             button_text: Текст на кнопці
+            bbox: Область пошуку (глобальні координати)
             
         Returns:
             str: Результат операції
@@ -85,78 +281,119 @@ class ButtonFinder:
         try:
             logger.info(f"Finding and clicking button: {button_text}")
             
-            found, (x, y) = self.find_button_by_text(button_text)
+            (match,), image, origin, (key,) = self._find([button_text], bbox=bbox)
             
-            if not found or (x == 0 and y == 0):
+            if not match['found']:
                 return f"❌ Кнопка '{button_text}' не знайдена на екрані"
             
             # Натискаємо на кнопку
-            self.click.click(x, y)
+            self._click_match(match, image, origin, key)
             
-            logger.info(f"Button clicked: {button_text} at ({x}, {y})")
+            x, y = match['center']
             return f"✅ Кнопка '{button_text}' натиснута на ({x}, {y})"
         
         except Exception as e:
             logger.error(f"Click button error: {e}")
             return f"❌ Помилка: {str(e)}"
     
-    def find_button_by_color(self, color_bgr: tuple, tolerance: int = 30) -> tuple[bool, tuple]:
+    def click_first_button(self, labels: list, bbox: tuple = None) -> str:
+        """
+        Натискає першу за пріоритетом кнопку, яка є на екрані
+        
+        Args:
+            labels: Тексти кнопок у порядку пріоритету
+            bbox: Область пошуку (глобальні координати)
+            
+        Returns:
+            str: Результат операції
+        """
+        try:
+            matches, image, origin, keys = self._find(labels, bbox=bbox)
+            for match, key in zip(matches, keys):
+                if match['found']:
+                    self._click_match(match, image, origin, key)
+                    x, y = match['center']
+                    return f"✅ Кнопка '{match['label']}' натиснута на ({x}, {y})"
+            
+            return f"❌ Жодна з кнопок не знайдена: {', '.join(labels)}"
+        
+        except Exception as e:
+            logger.error(f"Click first button error: {e}")
+            return f"❌ Помилка: {str(e)}"
+    
+    def find_color_candidates(self, color_bgr: tuple, tolerance: int = 30, hsv: bool = False,
+                              bbox: tuple = None, limit: int = 10) -> list:
+        """
+        Усі області потрібного кольору, ранжовані як кандидати в кнопки
+        
+        Args:
+            color_bgr: Колір в форматі BGR (напр. (0, 255, 0) для зеленого)
+            tolerance: Допуск кольору (BGR)
+            hsv: Шукати в HSV (стійкіше до підсвічування кнопки)
+            bbox: Шукати лише в області (глобальні координати)
+            limit: Максимум кандидатів
+        
+        Returns:
+            list: [{'bbox', 'center', 'area', 'fill', 'aspect', 'score'}, ...] у глобальних координатах
+        """
+        # Беремо кадр у пам'яті (спільний з одночасними запитами)
+        image = self.capture_service.get_frame(bbox)
+        left, top = bbox[:2] if bbox else (0, 0)
+        
+        start = time.perf_counter()
+        candidates = find_color_regions(image, color_bgr, tolerance=tolerance, hsv=hsv, limit=limit)
+        for candidate in candidates:
+            l, t, r, b = candidate['bbox']
+            candidate['bbox'] = (l + left, t + top, r + left, b + top)
+            candidate['center'] = (candidate['center'][0] + left, candidate['center'][1] + top)
+        
+        logger.info(
+            f"Color search {color_bgr}: {len(candidates)} candidates in "
+            f"{(time.perf_counter() - start) * 1000:.1f} ms"
+        )
+        return candidates
+    
+    def find_button_by_color(self, color_bgr: tuple, tolerance: int = 30, hsv: bool = False,
+                             bbox: tuple = None) -> tuple[bool, tuple]:
         """
         Знаходить кнопку за кольором
         
         Args:
             color_bgr: Колір в форматі BGR (напр. (0, 255, 0) для зеленого)
             tolerance: Допуск кольору
+            hsv: Шукати в HSV
+            bbox: Область пошуку (глобальні координати)
             
         Returns:
-            (знайдено, координати)
+            (знайдено, координати найкращого кандидата)
         """
         try:
             logger.info(f"Searching for button by color: {color_bgr}")
             
-            # Беремо скріншот
-            screenshot_path = self.screen.capture()
-            
-            # Читаємо зображення
-            image = cv2.imread(screenshot_path)
-            if image is None:
-                logger.error(f"Failed to read screenshot: {screenshot_path}")
-                return False, (0, 0)
-            
-            # Створюємо маску для кольору
-            lower = np.array([max(0, c - tolerance) for c in color_bgr])
-            upper = np.array([min(255, c + tolerance) for c in color_bgr])
+            candidates = self.find_color_candidates(color_bgr, tolerance=tolerance, hsv=hsv, bbox=bbox, limit=1)
             
-            mask = cv2.inRange(image, lower, upper)
-            
-            # Знаходимо контури
-            contours, _ = cv2.findContours(mask, cv2.RETR_TREE, cv2.CHAIN_APPROX_SIMPLE)
-            
-            if not contours:
+            if not candidates:
                 logger.warning(f"No buttons found with color: {color_bgr}")
                 return False, (0, 0)
             
-            # Беремо найбільший контур (найімовірніше це кнопка)
-            largest_contour = max(contours, key=cv2.contourArea)
-            x, y, w, h = cv2.boundingRect(largest_contour)
-            
-            # Центр кнопки
-            center_x = x + w // 2
-            center_y = y + h // 2
-            
-            logger.info(f"Button found at ({center_x}, {center_y})")
+            center_x, center_y = candidates[0]['center']
+            logger.info(f"Button found at ({center_x}, {center_y}) (score {candidates[0]['score']})")
             return True, (center_x, center_y)
         
         except Exception as e:
             logger.error(f"Button finder by color error: {e}")
             return False, (0, 0)
     
-    def find_and_click_button_by_color(self, color_bgr: tuple) -> str:
+    def find_and_click_button_by_color(self, color_bgr: tuple, tolerance: int = 30, hsv: bool = False,
+                                       bbox: tuple = None) -> str:
         """
         Знаходить кнопку за кольором та натискає на неї
         
         Args:
             color_bgr: Колір в форматі BGR
+            tolerance: Допуск кольору
+            hsv: Шукати в HSV
+            bbox: Область пошуку (глобальні координати)
             
         Returns:
             str: Результат операції
@@ -164,13 +401,13 @@ class ButtonFinder:
         try:
             logger.info(f"Finding and clicking button by color: {color_bgr}")
             
-            found, (x, y) = self.find_button_by_color(color_bgr)
+            found, (x, y) = self.find_button_by_color(color_bgr, tolerance=tolerance, hsv=hsv, bbox=bbox)
             
             if not found or (x == 0 and y == 0):
                 return f"❌ Кнопка з кольором {color_bgr} не знайдена"
             
             # Натискаємо на кнопку
-            self.click.click(x, y)
+            self.input.call(self.click.click, x, y)
             
             logger.info(f"Button clicked by color at ({x}, {y})")
             return f"✅ Кнопка натиснута на ({x}, {y})"
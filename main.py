@@ -2,10 +2,12 @@ import asyncio
 import logging
 import os
 import json
+import cv2
+import numpy as np
 from dotenv import load_dotenv
 from aiogram import Bot, Dispatcher, types
 from aiogram.filters import Command, StateFilter
-from aiogram.types import Message, FSInputFile, InlineKeyboardMarkup, InlineKeyboardButton
+from aiogram.types import Message, BufferedInputFile, InlineKeyboardMarkup, InlineKeyboardButton
 from aiogram.fsm.context import FSMContext
 from aiogram.fsm.state import State, StatesGroup
 
@@ -13,7 +15,12 @@ from agents.task_interpreter import TaskInterpreter
 from agents.gemini_interpreter import GeminiTaskInterpreter
 from agents.executor import Executor
 from agents.approval import ApprovalAgent
-from pc_control.screen import ScreenCapture
+from pc_control.screen import IMAGE_EXTENSIONS, ScreenRecorder, list_monitors
+from pc_control.capture_service import get_capture_service
+from pc_control.retention import ScreenshotRetention
+from pc_control.ocr import get_ocr_engine
+from pc_control.macros import get_macro_manager, parse_play_options
+from pc_control.mouse_motion import get_mouse_motion
 from auth import AuthManager
 from persistence import save_task, write_to_windsurf
 from shortcuts import ShortcutExecutor
@@ -56,10 +63,70 @@ dp = Dispatcher()
 task_interpreter = GeminiTaskInterpreter()  # Using AI-powered interpreter
 executor = Executor()
 approval_agent = ApprovalAgent()
-screen = ScreenCapture()
+capture_service = get_capture_service()
+screen = capture_service.screen
 auth_manager = AuthManager()
 shortcut_executor = ShortcutExecutor()
 button_finder = ButtonFinder()
+screenshot_retention = ScreenshotRetention(screen.screenshot_dir)
+screen_recorder = ScreenRecorder(
+    capture_service.get_frame,
+    fps=float(os.getenv('RECORDER_FPS', '2')),
+    seconds=int(os.getenv('RECORDER_SECONDS', '60')),
+)
+
+
+def screen_filename() -> str:
+    """Ім'я файлу скріншота для Telegram відповідно до формату"""
+    ext = IMAGE_EXTENSIONS.get(screen.image_format, '.jpg')
+    return f"screenshot{ext}"
+
+
+def full_size_keyboard(shot_id: str) -> InlineKeyboardMarkup:
+    """Кнопка для отримання скріншота в повному розмірі"""
+    return InlineKeyboardMarkup(inline_keyboard=[
+        [InlineKeyboardButton(text="🔍 Повний розмір", callback_data=f"full_{shot_id}")]
+    ])
+
+
+async def send_screenshot(message: Message, caption: str, bbox: tuple = None, parse_mode: str = None):
+    """
+    Надсилає прев'ю скріншота з кнопкою повного розміру
+    
+    Повнорозмірний PNG кодується лише якщо користувач натисне кнопку.
+    """
+    shot_id, preview = await capture_service.capture_preview(bbox=bbox)
+    await message.answer_photo(
+        BufferedInputFile(preview, filename=screen_filename()),
+        caption=caption,
+        parse_mode=parse_mode,
+        reply_markup=full_size_keyboard(shot_id)
+    )
+
+
+def parse_region(args: list) -> tuple:
+    """
+    Область екрану з аргументів команди
+    
+    /screenshot 2 - монітор 2, /screenshot window Chrome - вікно,
+    /screenshot 0 0 800 600 - прямокутник (left top right bottom)
+    """
+    if not args:
+        return None
+    if args[0] == 'window' and len(args) > 1:
+        return screen.resolve_region(window=' '.join(args[1:]))
+    if len(args) == 1 and args[0].isdigit():
+        return screen.resolve_region(monitor=int(args[0]))
+    if len(args) == 4:
+        return screen.resolve_region(bbox=[int(v) for v in args])
+    raise ValueError("Використовуйте: /screenshot [монітор | window <назва> | left top right bottom]")
+
+
+def parse_labels(text: str) -> list:
+    """Тексти кнопок через | або кому: "OK | Save | Accept All" -> ['OK', 'Save', 'Accept All']"""
+    separator = '|' if '|' in text else ','
+    return [label.strip() for label in text.split(separator) if label.strip()]
+
 
 # Стан системи
 system_state = {
@@ -227,6 +294,9 @@ async def cmd_start(message: Message):
         )
         return
     
+    # Меню часто закінчується натисканням "Скріншот" - готуємо прев'ю заздалегідь
+    capture_service.prefetch()
+    
     username = auth_manager.get_username(user_id)
     
     # Отримуємо реальне ім'я користувача з Telegram
@@ -291,16 +361,26 @@ async def cmd_screenshot(message: Message):
         await message.answer("🔐 Ви не аутентифіковані! Використовуйте /register або /login")
         return
     
+    args = message.text.split()[1:]
+    
+    if args == ['monitors']:
+        text = "🖥 Монітори:\n\n"
+        for info in list_monitors():
+            left, top, right, bottom = info['bbox']
+            primary = " (основний)" if info['primary'] else ""
+            text += f"{info['index']}. {right - left}x{bottom - top} на ({left}, {top}){primary}\n"
+        text += "\n💡 Скріншот монітора: /screenshot 2"
+        await message.answer(text)
+        return
+    
     try:
+        bbox = parse_region(args)
         await message.answer("📸 Беру скріншот...")
-        screenshot_path = screen.capture()
-        
-        # Використовуємо FSInputFile для відправки файлу
-        photo = FSInputFile(screenshot_path)
-        await bot.send_photo(
-            chat_id=message.chat.id,
-            photo=photo,
-            caption="📸 Поточний стан екрану"
+        # Захоплення та кодування поза event loop, спочатку лише прев'ю
+        await send_screenshot(
+            message,
+            caption="📸 Поточний стан екрану" if bbox is None else f"📸 Область {bbox}",
+            bbox=bbox
         )
         logger.info("Screenshot sent successfully")
     except Exception as e:
@@ -419,13 +499,22 @@ async def cmd_status(message: Message):
         await message.answer("🔐 Ви не аутентифіковані! Використовуйте /register або /login")
         return
     
+    ocr = get_ocr_engine().get_metrics()
+    actions = executor.input.get_status()
+    motion = get_mouse_motion().get_status()
     status_text = (
         "📊 Статус системи:\n\n"
         f"Bot: ✅ Online\n"
         f"Task Interpreter: ✅ Ready\n"
         f"Executor: ✅ Ready\n"
         f"Approval Agent: ✅ Ready\n"
-        f"Waiting approval: {'🟡 Так' if system_state['waiting_approval'] else '🟢 Ні'}"
+        f"Waiting approval: {'🟡 Так' if system_state['waiting_approval'] else '🟢 Ні'}\n"
+        f"OCR: {ocr['backend']}, {ocr['calls']} викликів, "
+        f"p50 {ocr['p50_ms']:.0f} мс, p95 {ocr['p95_ms']:.0f} мс, кеш {ocr['hits']}\n"
+        f"Input: черга {actions['queue_depth']}, виконано {actions['done']}, помилок {actions['errors']}, "
+        f"очікування {actions['wait_ms']:.0f} мс, дія {actions['run_ms']:.0f} мс\n"
+        f"Mouse: {motion['requests']} запитів → {motion['applied']} рухів, "
+        f"затримка {motion['latency_ms']:.0f} мс (p95 {motion['latency_p95_ms']:.0f} мс)"
     )
     await message.answer(status_text)
 
@@ -550,7 +639,7 @@ async def cmd_click_button(message: Message):
     
     try:
         await message.answer(f"🔍 Шукаю кнопку '{button_text}'...")
-        result = button_finder.find_and_click_button(button_text)
+        result = await capture_service.analyze(button_finder.find_and_click_button, button_text)
         await message.answer(result)
         logger.info(f"Button clicked by user {user_id}: {button_text}")
     except Exception as e:
@@ -558,6 +647,332 @@ async def cmd_click_button(message: Message):
         logger.error(f"Click button error: {e}")
 
 
+@dp.message(Command('click_any'))
+async def cmd_click_any(message: Message):
+    """Натискає першу знайдену кнопку зі списку (один скріншот і один OCR на всі)"""
+    user_id = message.from_user.id
+    
+    # Перевіряємо аутентифікацію
+    if not auth_manager.is_authenticated(user_id):
+        await message.answer("🔐 Ви не аутентифіковані! Використовуйте /register або /login")
+        return
+    
+    labels = parse_labels(message.text.partition(' ')[2])
+    
+    if not labels:
+        await message.answer(
+            "❌ Вкажіть тексти кнопок у порядку пріоритету.\n\n"
+            "Приклад:\n"
+            "/click_any OK | Save | Accept All"
+        )
+        return
+    
+    try:
+        await message.answer(f"🔍 Шукаю кнопки: {', '.join(labels)}...")
+        result = await capture_service.analyze(button_finder.click_first_button, labels)
+        await message.answer(result)
+        logger.info(f"Click any by user {user_id}: {labels}")
+    except Exception as e:
+        await message.answer(f"❌ Помилка: {str(e)}")
+        logger.error(f"Click any error: {e}")
+
+
+@dp.message(Command('find_buttons'))
+async def cmd_find_buttons(message: Message):
+    """Показує, які з кнопок є на екрані, з координатами та впевненістю"""
+    user_id = message.from_user.id
+    
+    # Перевіряємо аутентифікацію
+    if not auth_manager.is_authenticated(user_id):
+        await message.answer("🔐 Ви не аутентифіковані! Використовуйте /register або /login")
+        return
+    
+    labels = parse_labels(message.text.partition(' ')[2])
+    
+    if not labels:
+        await message.answer("❌ Вкажіть тексти кнопок.\n\nПриклад:\n/find_buttons OK | Save | Cancel")
+        return
+    
+    try:
+        matches = await capture_service.analyze(button_finder.find_buttons, labels)
+        await message.answer(format_button_matches(matches))
+    except Exception as e:
+        await message.answer(f"❌ Помилка: {str(e)}")
+        logger.error(f"Find buttons error: {e}")
+
+
+def format_button_matches(matches: list) -> str:
+    """Результат find_buttons для повідомлення"""
+    lines = ["🔍 Кнопки на екрані:\n"]
+    for match in matches:
+        if match['found']:
+            x, y = match['center']
+            lines.append(f"✅ {match['label']} - ({x}, {y}), '{match['text']}', бал {match['score']}, conf {match['conf']:.0f}")
+        else:
+            lines.append(f"❌ {match['label']} - не знайдено")
+    return '\n'.join(lines)
+
+
+@dp.message(Command('template'))
+async def cmd_template(message: Message):
+    """
+    Шаблони кнопок для пошуку без OCR
+    
+    Фото з підписом "/template Accept All" - зберегти зображення кнопки,
+    /template - список, /template del Accept All - видалити.
+    """
+    user_id = message.from_user.id
+    
+    # Перевіряємо аутентифікацію
+    if not auth_manager.is_authenticated(user_id):
+        await message.answer("🔐 Ви не аутентифіковані! Використовуйте /register або /login")
+        return
+    
+    args = (message.text or message.caption or '').partition(' ')[2].strip()
+    templates = button_finder.templates
+    
+    image_file = message.photo[-1] if message.photo else None
+    if image_file is None and message.document and (message.document.mime_type or '').startswith('image/'):
+        image_file = message.document
+    
+    try:
+        if image_file is not None:
+            if not args:
+                await message.answer("❌ Вкажіть текст кнопки в підписі: /template Accept All")
+                return
+            data = await bot.download(image_file)
+            image = cv2.imdecode(np.frombuffer(data.read(), np.uint8), cv2.IMREAD_COLOR)
+            if image is None:
+                await message.answer("❌ Не вдалося прочитати зображення")
+                return
+            key = await asyncio.to_thread(templates.save, args, image, source='upload')
+            await message.answer(f"✅ Шаблон '{args}' збережено ({image.shape[1]}x{image.shape[0]}, {key})")
+            logger.info(f"Template uploaded by user {user_id}: {key}")
+            return
+        
+        if args.startswith('del '):
+            label = args[4:].strip()
+            removed = await asyncio.to_thread(templates.remove, label)
+            await message.answer(f"🗑 Видалено шаблонів '{label}': {removed}")
+            return
+        
+        entries = templates.list()
+        if not entries:
+            await message.answer(
+                "🧩 Шаблонів ще немає.\n\n"
+                "Вони зберігаються автоматично після /click_button, або надішліть фото кнопки "
+                "з підписом /template <текст кнопки>"
+            )
+            return
+        lines = [f"🧩 Шаблони кнопок ({len(entries)}):\n"]
+        for entry in sorted(entries, key=lambda e: e['label'].lower()):
+            lines.append(f"• {entry['label']} - {entry['width']}x{entry['height']}, масштаб {entry['scale']}, {entry['source']}")
+        lines.append("\nВидалити: /template del <текст кнопки>")
+        await message.answer('\n'.join(lines))
+    
+    except Exception as e:
+        await message.answer(f"❌ Помилка: {str(e)}")
+        logger.error(f"Template error: {e}")
+
+
+@dp.message(Command('retention'))
+async def cmd_retention(message: Message):
+    """Налаштування ротації скріншотів"""
+    user_id = message.from_user.id
+    
+    # Перевіряємо аутентифікацію
+    if not auth_manager.is_authenticated(user_id):
+        await message.answer("🔐 Ви не аутентифіковані! Використовуйте /register або /login")
+        return
+    
+    args = message.text.split()[1:]
+    
+    if not args:
+        await message.answer(screenshot_retention.get_status())
+        return
+    
+    if args[0] == 'run':
+        screenshot_retention.run_now()
+        await message.answer("🧹 Очищення скріншотів запущено у фоні")
+        return
+    
+    if len(args) != 2:
+        await message.answer("❌ Використовуйте: /retention <налаштування> <значення>\n\nПриклад: /retention max_count 200")
+        return
+    
+    success, msg = screenshot_retention.update_setting(args[0], args[1])
+    await message.answer(msg)
+    if success:
+        logger.info(f"Retention setting changed by user {user_id}: {args[0]}={args[1]}")
+
+
+@dp.message(Command('history'))
+async def cmd_history(message: Message):
+    """Історія скріншотів зі сховища (час -> хеш)"""
+    user_id = message.from_user.id
+    
+    # Перевіряємо аутентифікацію
+    if not auth_manager.is_authenticated(user_id):
+        await message.answer("🔐 Ви не аутентифіковані! Використовуйте /register або /login")
+        return
+    
+    if not screen.store:
+        await message.answer("❌ Сховище скріншотів вимкнене (SCREENSHOT_DEDUP=off)")
+        return
+    
+    args = message.text.split()[1:]
+    
+    # /history <хеш> - надіслати кадр
+    if args and not args[0].isdigit():
+        path = screen.store.get(args[0])
+        if not path:
+            await message.answer(f"❌ Кадр не знайдено: {args[0]}")
+            return
+        with open(path, 'rb') as f:
+            data = f.read()
+        await message.answer_document(
+            BufferedInputFile(data, filename=os.path.basename(path)),
+            caption=f"🖼 {os.path.basename(path)}"
+        )
+        return
+    
+    limit = min(int(args[0]), 50) if args else 10
+    entries = screen.store.history(limit)
+    if not entries:
+        await message.answer("📭 Історія скріншотів порожня")
+        return
+    
+    text = "🕘 Історія скріншотів:\n\n"
+    for entry in entries:
+        text += f"• {entry['ts'].replace('T', ' ')} - {entry['hash'][:10]}\n"
+    text += "\n💡 Відкрити кадр: /history <хеш>"
+    await message.answer(text)
+
+
+@dp.message(Command('recorder'))
+async def cmd_recorder(message: Message):
+    """Увімкнути/вимкнути фоновий запис екрану"""
+    user_id = message.from_user.id
+    
+    # Перевіряємо аутентифікацію
+    if not auth_manager.is_authenticated(user_id):
+        await message.answer("🔐 Ви не аутентифіковані! Використовуйте /register або /login")
+        return
+    
+    args = message.text.split()[1:]
+    
+    if args == ['on']:
+        screen_recorder.start()
+        logger.info(f"Screen recorder enabled by user {user_id}")
+    elif args == ['off']:
+        # join потоку запису - не блокуємо event loop
+        await asyncio.to_thread(screen_recorder.stop)
+        logger.info(f"Screen recorder disabled by user {user_id}")
+    elif args:
+        await message.answer("❌ Використовуйте: /recorder on | off")
+        return
+    
+    await message.answer(screen_recorder.get_status())
+
+
+@dp.message(Command('replay'))
+async def cmd_replay(message: Message):
+    """Відео останніх N секунд з буфера запису"""
+    user_id = message.from_user.id
+    
+    # Перевіряємо аутентифікацію
+    if not auth_manager.is_authenticated(user_id):
+        await message.answer("🔐 Ви не аутентифіковані! Використовуйте /register або /login")
+        return
+    
+    args = message.text.split()[1:]
+    try:
+        seconds = int(args[0]) if args else 30
+    except ValueError:
+        await message.answer("❌ Використовуйте: /replay <секунд>\n\nПриклад: /replay 30")
+        return
+    
+    try:
+        data = await capture_service.run(screen_recorder.export, seconds)
+        if not data:
+            await message.answer("📭 Буфер запису порожній. Увімкніть запис: /recorder on")
+            return
+        await message.answer_video(
+            BufferedInputFile(data, filename="replay.mp4"),
+            caption=f"🎞 Останні {seconds} с"
+        )
+        logger.info(f"Replay sent to user {user_id}: {seconds}s")
+    except Exception as e:
+        await message.answer(f"❌ Помилка: {str(e)}")
+        logger.error(f"Replay error: {e}")
+
+
+@dp.message(Command('macro'))
+async def cmd_macro(message: Message):
+    """Запис і відтворення макросів"""
+    user_id = message.from_user.id
+    
+    # Перевіряємо аутентифікацію
+    if not auth_manager.is_authenticated(user_id):
+        await message.answer("🔐 Ви не аутентифіковані! Використовуйте /register або /login")
+        return
+    
+    macros = get_macro_manager()
+    args = message.text.split()[1:]
+    
+    try:
+        if not args:
+            await message.answer(macros.format_list())
+        elif args[0] == 'rec' and len(args) == 2:
+            macros.start(args[1])
+            await message.answer(
+                f"⏺ Запис макросу {args[1]}. Виконуйте команди бота або Mini App, потім /macro stop\n"
+                "Скасувати: /macro cancel"
+            )
+            logger.info(f"Macro recording started by user {user_id}: {args[1]}")
+        elif args == ['stop']:
+            name, count = macros.stop()
+            if name is None:
+                await message.answer("❌ Запис не йде")
+            else:
+                await message.answer(f"💾 Макрос {name} збережено: {count} кроків\nЗапуск: /macro {name}")
+        elif args == ['cancel']:
+            await message.answer("🗑 Запис скасовано" if macros.cancel() else "❌ Запис не йде")
+        elif args[0] == 'del' and len(args) == 2:
+            await message.answer("🗑 Макрос видалено" if macros.store.delete(args[1]) else f"❌ Макрос {args[1]} не знайдено")
+        else:
+            # /macro play <назва> [raw] [x2] або коротко /macro <назва> [raw] [x2]
+            if args[0] == 'play':
+                args = args[1:]
+            if not args or len(args) > 3:
+                raise ValueError("bad arguments")
+            name = args[0]
+            speed, collapse = parse_play_options(args[1:])
+            if macros.store.get(name) is None:
+                await message.answer(f"❌ Макрос {name} не знайдено\n\n{macros.format_list()}")
+                return
+            result = await executor.input.play_macro(name, speed=speed, collapse=collapse)
+            timing = 'записані паузи' if not collapse else 'паузи згорнуто'
+            await message.answer(
+                f"✅ Макрос {name}: {result['steps']} кроків → {result['actions']} дій "
+                f"за {result['seconds']:.2f} с ({timing}, x{speed:g})"
+            )
+            logger.info(f"Macro played by user {user_id}: {name} x{speed} collapse={collapse}")
+    except ValueError:
+        await message.answer(
+            "❌ Використовуйте:\n"
+            "/macro - список\n"
+            "/macro rec <назва> - почати запис\n"
+            "/macro stop | cancel - зберегти / скасувати запис\n"
+            "/macro play <назва> [raw] [x2] - відтворити (raw - з записаними паузами, "
+            "x2 - удвічі швидше); коротко: /macro <назва>\n"
+            "/macro del <назва> - видалити"
+        )
+    except Exception as e:
+        await message.answer(f"❌ Помилка: {str(e)}")
+        logger.error(f"Macro error: {e}")
+
+
 @dp.message(Command('help'))
 async def cmd_help(message: Message):
     """Довідка"""
@@ -568,10 +983,18 @@ async def cmd_help(message: Message):
         "/login - Вхід\n"
         "/logout - Вихід\n"
         "/start - Запуск\n"
-        "/screenshot - Скріншот\n"
+        "/screenshot - Скріншот (/screenshot 2, /screenshot window Chrome, /screenshot monitors)\n"
         "/task - Виконати завдання\n"
         "/shortcut - Виконати шорткат\n"
         "/click_button - Натиснути кнопку\n"
+        "/click_any - Натиснути першу знайдену кнопку зі списку\n"
+        "/find_buttons - Знайти кнопки на екрані\n"
+        "/template - Шаблони кнопок (фото з підписом /template <текст>)\n"
+        "/retention - Ротація скріншотів\n"
+        "/history - Історія скріншотів\n"
+        "/recorder - Фоновий запис екрану (on/off)\n"
+        "/replay - Відео останніх N секунд\n"
+        "/macro - Макроси (rec <назва>, stop, play <назва> [raw] [x2])\n"
         "/changes - Показати зміни з Windsurf\n"
         "/accept - Прийняти зміну\n"
         "/reject - Відхилити зміну\n"
@@ -581,6 +1004,8 @@ async def cmd_help(message: Message):
         "/task напиши Hello\n"
         "/shortcut copy\n"
         "/click_button Accept All\n"
+        "/click_any OK | Save | Accept All\n"
+        "/macro rec report, ..., /macro stop, /macro report x2\n"
         "/changes\n"
         "/accept change_1"
     )
@@ -602,14 +1027,7 @@ async def handle_callback(query: types.CallbackQuery):
     # Меню кнопки
     if callback_data == "menu_screenshot":
         await query.answer()
-        screen = ScreenCapture()
-        path = screen.capture()
-        photo = FSInputFile(path)
-        await query.message.answer_photo(
-            photo,
-            caption="📸 <b>Скріншот екрану</b>",
-            parse_mode="HTML"
-        )
+        await send_screenshot(query.message, caption="📸 <b>Скріншот екрану</b>", parse_mode="HTML")
     
     elif callback_data == "menu_changes":
         await query.answer()
@@ -696,8 +1114,11 @@ async def handle_callback(query: types.CallbackQuery):
             "✅ Автоматичне виконання: <b>Вкл</b>\n"
             "✅ Сповіщення: <b>Вкл</b>\n"
             "✅ Логування: <b>Вкл</b>\n"
+            f"🗂 Скріншоти: <b>до {screenshot_retention.settings['max_count']} файлів, "
+            f"{screenshot_retention.settings['max_size_mb']} МБ, "
+            f"{screenshot_retention.settings['max_age_days']} днів</b>\n"
             "━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━\n\n"
-            "📱 <i>Більше налаштувань скоро...</i>"
+            "🗂 <i>Ротація скріншотів: /retention</i>"
         )
         await query.message.answer(settings_text, parse_mode="HTML")
     
@@ -746,6 +1167,19 @@ async def handle_callback(query: types.CallbackQuery):
         auth_manager.logout(user_id)
         await query.message.answer("👋 Ви вийшли. Введіть /start для входу")
     
+    # Скріншот у повному розмірі (документом, без перестиснення Telegram)
+    elif callback_data.startswith("full_"):
+        shot_id = callback_data.replace("full_", "", 1)
+        data = await capture_service.full_bytes(shot_id)
+        if data is None:
+            await query.answer("⌛ Скріншот застарів, зробіть новий", show_alert=True)
+            return
+        await query.answer()
+        await query.message.answer_document(
+            BufferedInputFile(data, filename=f"screenshot_{shot_id}.png"),
+            caption="🔍 Повний розмір"
+        )
+    
     # Кнопки для змін
     elif callback_data.startswith("accept_"):
         change_id = callback_data.replace("accept_", "")
@@ -837,7 +1271,7 @@ async def execute_single_command(message: Message, command_data):
             await handle_screenshot_command(message)
         elif action == 'click_center':
             await message.answer("🖱️ Клік по центру екрану")
-            await executor.click.click_center()
+            await executor.input.click_center()
             await message.answer("✅ Клік виконано!")
         elif action == 'open_url':
             url = command_data.get('url', '')
@@ -847,7 +1281,7 @@ async def execute_single_command(message: Message, command_data):
         elif action == 'switch_tab':
             number = command_data.get('number', 1)
             await message.answer(f"🔄 Перемикання на вкладку {number}")
-            await executor.keyboard.press_hotkey(['ctrl', str(number)])
+            await executor.input.hotkey('ctrl', str(number))
             await message.answer("✅ Вкладку перемкнуто!")
         elif action == 'run_program':
             path = command_data.get('path', '')
@@ -857,10 +1291,10 @@ async def execute_single_command(message: Message, command_data):
         elif action == 'type':
             text = command_data.get('target', '')
             if text:
-                await message.answer(f"✍️ Введення тексту: {text}")
-                # Actually type the text
-                await executor.keyboard.type_text(text)
-                await message.answer("✅ Текст введено!")
+                preview = text if len(text) <= 100 else text[:100] + '...'
+                await message.answer(f"✍️ Введення тексту: {preview}")
+                stats = await executor.input.enter_text(text, strategy=command_data.get('strategy'))
+                await message.answer(f"✅ Текст введено! {stats['chars']} симв. за {stats['seconds']:.2f} с ({stats['strategy']}, {stats['cps']:.0f} симв/с)")
         elif action == 'click':
             coords = command_data.get('target', '')
             if coords:
@@ -868,12 +1302,23 @@ async def execute_single_command(message: Message, command_data):
                 # Parse coordinates if provided
                 if isinstance(coords, str) and ',' in coords:
                     x, y = map(int, coords.split(','))
-                    await executor.click.click_at(x, y)
+                    await executor.input.click(x, y)
                     await message.answer("✅ Клік виконано!")
                 else:
                     # Click at center
-                    await executor.click.click_center()
+                    await executor.input.click_center()
                     await message.answer("✅ Клік по центру!")
+        elif action in ('click_any', 'find_buttons'):
+            labels = command_data.get('labels', [])
+            if isinstance(labels, str):
+                labels = parse_labels(labels)
+            if labels:
+                if action == 'click_any':
+                    result = await capture_service.analyze(button_finder.click_first_button, labels)
+                    await message.answer(result)
+                else:
+                    matches = await capture_service.analyze(button_finder.find_buttons, labels)
+                    await message.answer(format_button_matches(matches))
         elif action == 'open_app':
             app = command_data.get('target', '')
             if app:
@@ -886,19 +1331,38 @@ async def execute_single_command(message: Message, command_data):
             if keys:
                 await message.answer(f"⌨️ Гаряча клавіша: {'+'.join(keys)}")
                 # Actually press the hotkey
-                await executor.keyboard.press_hotkey(keys)
+                await executor.input.hotkey(*keys)
                 await message.answer("✅ Гарячу клавішу натиснуто!")
         elif action == 'wait':
             seconds = command_data.get('seconds', 1)
             await message.answer(f"⏳ Очікування: {seconds} секунд")
-            await asyncio.sleep(seconds)
+            await executor.input.wait(seconds)
             await message.answer("✅ Очікування завершено!")
+        elif action == 'macro':
+            name = command_data.get('name', '')
+            if name:
+                await message.answer(f"🎬 Макрос: {name}")
+                result = await executor.input.play_macro(
+                    name,
+                    speed=float(command_data.get('speed', 1.0)),
+                    collapse=not command_data.get('raw', False),
+                )
+                await message.answer(f"✅ Макрос {name}: {result['actions']} дій за {result['seconds']:.2f} с")
         elif action == 'move_mouse':
+            # x, y - координати екрану (так їх надсилає інтерпретатор команд);
+            # relative: true - зсув від поточної позиції (кнопки-стрілки Mini App).
+            # Рухи зливаються в MouseMotion, швидкі натискання не накопичуються в черзі;
+            # drain - наступна команда (click) виконається вже в новій позиції
             x = command_data.get('x', 0)
             y = command_data.get('y', 0)
-            await message.answer(f"🖱️ Переміщення миші до ({x}, {y})")
-            await executor.click.move_to(x, y)
-            await message.answer("✅ Миш переміщено!")
+            motion = get_mouse_motion()
+            relative = command_data.get('relative', False)
+            if relative:
+                motion.nudge(x, y)
+            else:
+                motion.move_to(x, y)
+            await motion.drain()
+            await message.answer(f"🖱️ Миш: {'зсув' if relative else 'до'} ({x}, {y})")
         else:
             await message.answer(f"⚡ Виконання: {action}")
             # Try to execute with the executor
@@ -932,14 +1396,7 @@ async def handle_ai_task(message: Message, task_text: str):
 async def handle_screenshot_command(message: Message):
     """Handle screenshot command"""
     try:
-        screen = ScreenCapture()
-        path = screen.capture()
-        photo = FSInputFile(path)
-        await message.answer_photo(
-            photo,
-            caption="📸 <b>Скріншот екрану</b>",
-            parse_mode="HTML"
-        )
+        await send_screenshot(message, caption="📸 <b>Скріншот екрану</b>", parse_mode="HTML")
     except Exception as e:
         logger.error(f"Screenshot error: {e}")
         await message.answer("❌ Помилка створення скріншота")
@@ -950,10 +1407,17 @@ async def main():
     logger.info("🚀 Starting Telegram bot...")
     logger.info(f"Admin ID: {ADMIN_ID}")
     
+    # Фонове очищення screenshots/
+    screenshot_retention.start()
+    
+    # Кільцевий запис екрану в пам'яті (для /replay)
+    if os.getenv('SCREEN_RECORDER', 'false').lower() in ('1', 'true', 'yes'):
+        screen_recorder.start()
+    
     # Start Mini App server
     mini_app_runner = None
     try:
-        mini_app_runner = await start_mini_app_server(port=8080)
+        mini_app_runner = await start_mini_app_server(port=8080, auth_manager=auth_manager)
         logger.info("📱 Mini App server started on http://localhost:8080")
         logger.info("🎮 Open Telegram and click the PC Control button!")
     except Exception as e:
@@ -966,6 +1430,11 @@ async def main():
     finally:
         if mini_app_runner:
             await stop_mini_app_server(mini_app_runner)
+        screenshot_retention.stop()
+        screen_recorder.stop()
+        get_ocr_engine().shutdown()
+        get_mouse_motion().stop()
+        executor.input.stop()
         await bot.session.close()
 
 
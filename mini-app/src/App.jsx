@@ -4,6 +4,7 @@ import Header from './components/Header'
 import CommandPanel from './components/CommandPanel'
 import AICommandInput from './components/AICommandInput'
 import QuickActions from './components/QuickActions'
+import MouseJoystick from './components/MouseJoystick'
 import ScreenshotViewer from './components/ScreenshotViewer'
 import { TelegramProvider } from './context/TelegramContext'
 
@@ -55,6 +56,7 @@ function App() {
           <ScreenshotViewer />
           <CommandPanel />
           <QuickActions />
+          <MouseJoystick />
           <AICommandInput />
         </div>
       </div>
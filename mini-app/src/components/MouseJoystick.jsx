@@ -0,0 +1,98 @@
+import { useEffect, useRef, useState } from 'react'
+import { Move } from 'lucide-react'
+import { useTelegram } from '../context/TelegramContext'
+import './MouseJoystick.css'
+
+// Bot's Mini App server (mini_app_server.py) - can differ from the static host
+const STREAM_URL = import.meta.env.VITE_STREAM_URL || window.location.origin
+
+// Pixels per second at full deflection (server clamps to MOUSE_MAX_SPEED)
+const MAX_SPEED = 1200
+// Velocity is resent while held; the server stops the cursor if nothing
+// arrives for MOUSE_JOYSTICK_TTL (0.3 s), so keep this well below it
+const SEND_INTERVAL = 50
+
+export default function MouseJoystick() {
+  const { tg } = useTelegram()
+  const [knob, setKnob] = useState({ x: 0, y: 0 })
+  const [active, setActive] = useState(false)
+  const padRef = useRef(null)
+  const wsRef = useRef(null)
+  const velocityRef = useRef({ vx: 0, vy: 0 })
+
+  const connect = () => {
+    if (wsRef.current && wsRef.current.readyState <= WebSocket.OPEN) return wsRef.current
+    const url = new URL('/ws/mouse', STREAM_URL)
+    url.protocol = url.protocol === 'https:' ? 'wss:' : 'ws:'
+    url.searchParams.set('initData', tg.initData || '')
+    wsRef.current = new WebSocket(url)
+    wsRef.current.onerror = (error) => console.error('Mouse control error:', error)
+    return wsRef.current
+  }
+
+  const send = (payload) => {
+    const ws = wsRef.current
+    if (ws && ws.readyState === WebSocket.OPEN) ws.send(payload)
+  }
+
+  useEffect(() => {
+    if (!active) return
+    const timer = setInterval(() => send(JSON.stringify(velocityRef.current)), SEND_INTERVAL)
+    return () => clearInterval(timer)
+  }, [active])
+
+  useEffect(() => () => wsRef.current && wsRef.current.close(), [])
+
+  const update = (event) => {
+    const rect = padRef.current.getBoundingClientRect()
+    const radius = rect.width / 2
+    let x = (event.clientX - rect.left - radius) / radius
+    let y = (event.clientY - rect.top - radius) / radius
+    const length = Math.hypot(x, y)
+    if (length > 1) {
+      x /= length
+      y /= length
+    }
+    setKnob({ x, y })
+    // Quadratic response (x, y already carry the deflection): small - precise, full - fast
+    const speed = Math.min(1, length) * MAX_SPEED
+    velocityRef.current = { vx: Math.round(x * speed), vy: Math.round(y * speed) }
+  }
+
+  const handleDown = (event) => {
+    connect()
+    padRef.current.setPointerCapture(event.pointerId)
+    setActive(true)
+    update(event)
+  }
+
+  const handleMove = (event) => {
+    if (active) update(event)
+  }
+
+  const handleUp = () => {
+    setActive(false)
+    setKnob({ x: 0, y: 0 })
+    velocityRef.current = { vx: 0, vy: 0 }
+    send('stop')
+  }
+
+  return (
+    <section className="mouse-joystick">
+      <h2><Move size={16} /> Mouse</h2>
+      <div
+        ref={padRef}
+        className={`joystick-pad ${active ? 'active' : ''}`}
+        onPointerDown={handleDown}
+        onPointerMove={handleMove}
+        onPointerUp={handleUp}
+        onPointerCancel={handleUp}
+      >
+        <div
+          className="joystick-knob"
+          style={{ transform: `translate(${knob.x * 50}%, ${knob.y * 50}%)` }}
+        />
+      </div>
+    </section>
+  )
+}
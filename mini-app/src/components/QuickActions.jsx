@@ -14,13 +14,20 @@ export default function QuickActions() {
         { label: 'Refresh', action: () => sendCommand({ type: 'command', action: 'hotkey', keys: ['f5'] }) },
       ]
     },
+    {
+      category: 'Dialogs',
+      items: [
+        { label: 'Confirm (OK / Save / Accept All)', action: () => sendCommand({ type: 'command', action: 'click_any', labels: ['OK', 'Save', 'Accept All', 'Yes'] }) },
+        { label: 'Dismiss (Cancel / Close / No)', action: () => sendCommand({ type: 'command', action: 'click_any', labels: ['Cancel', 'Close', 'No'] }) },
+      ]
+    },
     {
       category: 'Mouse',
       items: [
-        { label: '↑ Up', action: () => sendCommand({ type: 'command', action: 'move_mouse', x: 0, y: -50 }) },
-        { label: '↓ Down', action: () => sendCommand({ type: 'command', action: 'move_mouse', x: 0, y: 50 }) },
-        { label: '← Left', action: () => sendCommand({ type: 'command', action: 'move_mouse', x: -50, y: 0 }) },
-        { label: '→ Right', action: () => sendCommand({ type: 'command', action: 'move_mouse', x: 50, y: 0 }) },
+        { label: '↑ Up', action: () => sendCommand({ type: 'command', action: 'move_mouse', x: 0, y: -50, relative: true }) },
+        { label: '↓ Down', action: () => sendCommand({ type: 'command', action: 'move_mouse', x: 0, y: 50, relative: true }) },
+        { label: '← Left', action: () => sendCommand({ type: 'command', action: 'move_mouse', x: -50, y: 0, relative: true }) },
+        { label: '→ Right', action: () => sendCommand({ type: 'command', action: 'move_mouse', x: 50, y: 0, relative: true }) },
       ]
     },
     {
@@ -1,10 +1,17 @@
-import { useState, useEffect } from 'react'
-import { Image } from 'lucide-react'
+import { useState, useEffect, useRef } from 'react'
+import { Image, Radio } from 'lucide-react'
+import { useTelegram } from '../context/TelegramContext'
 import './ScreenshotViewer.css'
 
+// Bot's Mini App server (mini_app_server.py) - can differ from the static host
+const STREAM_URL = import.meta.env.VITE_STREAM_URL || window.location.origin
+
 export default function ScreenshotViewer() {
+  const { tg } = useTelegram()
   const [screenshot, setScreenshot] = useState(null)
   const [isLoading, setIsLoading] = useState(false)
+  const [isLive, setIsLive] = useState(false)
+  const canvasRef = useRef(null)
 
   useEffect(() => {
     // Listen for messages from the bot
@@ -24,13 +31,73 @@ export default function ScreenshotViewer() {
     return () => window.removeEventListener('message', handleMessage)
   }, [])
 
-  if (!screenshot) {
+  useEffect(() => {
+    // Warm up a screenshot on open, so the "Screenshot" button answers instantly
+    fetch(new URL('/api/prefetch', STREAM_URL), {
+      method: 'POST',
+      headers: { 'X-Telegram-Init-Data': tg.initData || '' },
+    }).catch(() => {})
+  }, [tg])
+
+  useEffect(() => {
+    if (!isLive) return
+
+    // Live view: server sends only the changed tiles (mode=delta) and waits
+    // for 'ack' before the next update (adapts to bandwidth)
+    const url = new URL('/ws/screen', STREAM_URL)
+    url.protocol = url.protocol === 'https:' ? 'wss:' : 'ws:'
+    url.searchParams.set('initData', tg.initData || '')
+    url.searchParams.set('mode', 'delta')
+
+    const ws = new WebSocket(url)
+    ws.binaryType = 'arraybuffer'
+
+    // Message: 4-byte header length, JSON header, then JPEG tiles back to back
+    ws.onmessage = async (event) => {
+      const buffer = event.data
+      const headerLength = new DataView(buffer).getUint32(0)
+      const header = JSON.parse(new TextDecoder().decode(new Uint8Array(buffer, 4, headerLength)))
+
+      const canvas = canvasRef.current
+      if (canvas) {
+        if (canvas.width !== header.w || canvas.height !== header.h) {
+          canvas.width = header.w
+          canvas.height = header.h
+        }
+        const ctx = canvas.getContext('2d')
+        let offset = 4 + headerLength
+        for (const [x, y, , , size] of header.tiles) {
+          const tile = new Blob([new Uint8Array(buffer, offset, size)], { type: 'image/jpeg' })
+          ctx.drawImage(await createImageBitmap(tile), x, y)
+          offset += size
+        }
+      }
+      if (ws.readyState === WebSocket.OPEN) ws.send('ack')
+    }
+    ws.onclose = () => setIsLive(false)
+    ws.onerror = (error) => console.error('Live stream error:', error)
+
+    return () => ws.close()
+  }, [isLive, tg])
+
+  const liveButton = (
+    <button
+      className={`live-toggle ${isLive ? 'active' : ''}`}
+      onClick={() => setIsLive(!isLive)}
+    >
+      <Radio size={14} />
+      {isLive ? 'Live' : 'Go live'}
+    </button>
+  )
+
+  if (!screenshot && !isLive) {
     return (
       <div className="screenshot-viewer empty">
         <div className="screenshot-placeholder">
           <Image size={48} />
           <p>Screenshot will appear here</p>
           <span>Click "Screenshot" button to capture</span>
+          {liveButton}
         </div>
       </div>
     )
@@ -39,10 +106,13 @@ export default function ScreenshotViewer() {
   return (
     <div className="screenshot-viewer">
       <div className="screenshot-header">
-        <h3>Latest Screenshot</h3>
+        <h3>{isLive ? 'Live Screen' : 'Latest Screenshot'}</h3>
+        {liveButton}
       </div>
       <div className="screenshot-container">
-        <img src={screenshot} alt="PC Screenshot" />
+        {isLive
+          ? <canvas ref={canvasRef} />
+          : <img src={screenshot} alt="PC Screenshot" />}
       </div>
     </div>
   )
@@ -1,12 +1,316 @@
 import asyncio
+import json
 import logging
-from aiohttp import web
+import time
+from aiohttp import web, WSMsgType
+import cv2
+import numpy as np
 import os
 
+from auth import verify_webapp_init_data
+from pc_control.capture_service import get_capture_service
+from pc_control.screen import encode_frame
+from pc_control.delta import DeltaEncoder, pack_delta
+from pc_control.mouse_motion import get_mouse_motion
+
 logger = logging.getLogger(__name__)
 
 MINI_APP_DIR = os.path.join(os.path.dirname(__file__), 'mini-app', 'dist')
 
+# Ліміт одночасних live-стрімів екрану
+MAX_STREAMS = 3
+
+AUTH_MANAGER_KEY = web.AppKey('auth_manager', object)
+STREAMS_KEY = web.AppKey('active_streams', int)
+
+
+def authorize_request(request) -> int:
+    """
+    Перевіряє Telegram initData запиту
+    
+    initData передається як ?initData=... (img/WebSocket не можуть ставити заголовки)
+    або в заголовку X-Telegram-Init-Data.
+    
+    Returns:
+        int: Telegram ID користувача або None
+    """
+    init_data = request.query.get('initData') or request.headers.get('X-Telegram-Init-Data', '')
+    user = verify_webapp_init_data(init_data, os.getenv('TELEGRAM_TOKEN', ''))
+    if not user:
+        return None
+    
+    user_id = user.get('id')
+    admin_id = os.getenv('ADMIN_ID')
+    if admin_id and str(user_id) != admin_id:
+        return None
+    
+    auth_manager = request.app.get(AUTH_MANAGER_KEY)
+    if auth_manager is not None and not auth_manager.is_authenticated(user_id):
+        return None
+    
+    return user_id
+
+
+class AdaptiveFrameRate:
+    """Підбирає інтервал між кадрами та якість JPEG під швидкість клієнта"""
+    
+    def __init__(self, min_fps: float = 1.0, max_fps: float = 10.0, quality: int = 70,
+                 min_quality: int = 30, max_quality: int = 80):
+        self.min_interval = 1.0 / max_fps
+        self.max_interval = 1.0 / min_fps
+        self.interval = self.min_interval
+        self.quality = quality
+        self.min_quality = min_quality
+        self.max_quality = max_quality
+    
+    def update(self, delivery_seconds: float):
+        """
+        Оновлює параметри після доставки кадру
+        
+        Args:
+            delivery_seconds: Час, за який клієнт прийняв кадр (drain або ack)
+        """
+        target = min(self.max_interval, max(self.min_interval, delivery_seconds * 1.25))
+        self.interval = 0.7 * self.interval + 0.3 * target
+        
+        # Клієнт не встигає навіть на мінімальному FPS - зменшуємо кадри
+        if delivery_seconds > self.max_interval:
+            self.quality = max(self.min_quality, self.quality - 10)
+        elif delivery_seconds < self.min_interval / 2:
+            self.quality = min(self.max_quality, self.quality + 5)
+
+
+class ScreenStream:
+    """
+    Джерело кадрів для одного глядача: віддає лише змінені кадри
+    
+    У режимі delta замість повних JPEG віддаються лише змінені плитки
+    (формат pack_delta), які клієнт домальовує на canvas.
+    """
+    
+    def __init__(self, max_width: int = 1280, idle_poll: float = 0.2, rate: AdaptiveFrameRate = None,
+                 delta: bool = False):
+        self.capture_service = get_capture_service()
+        self.max_width = max_width
+        self.idle_poll = idle_poll
+        self.rate = rate or AdaptiveFrameRate()
+        self.delta = DeltaEncoder(fmt='jpeg') if delta else None
+        self._last_frame = None
+        self._last_sent = 0.0
+    
+    def _prepare(self, frame: np.ndarray, quality: int) -> bytes:
+        """Повертає закодований кадр або None, якщо екран не змінився (виконується в пулі)"""
+        if self._last_frame is not None and np.array_equal(frame, self._last_frame):
+            return None
+        self._last_frame = frame
+        
+        height, width = frame.shape[:2]
+        if width > self.max_width:
+            scale = self.max_width / width
+            frame = cv2.resize(frame, (self.max_width, int(height * scale)), interpolation=cv2.INTER_AREA)
+        
+        if self.delta is not None:
+            self.delta.quality = quality
+            update = self.delta.encode(frame)
+            return pack_delta(update) if update else None
+        return encode_frame(frame, fmt='jpeg', quality=quality)
+    
+    async def next_frame(self, is_alive=None) -> bytes:
+        """
+        Чекає, поки екран зміниться, і повертає наступний JPEG кадр
+        
+        Args:
+            is_alive: Функція перевірки з'єднання - поки екран не змінюється,
+                      нічого не пишеться, тому розрив треба перевіряти явно
+        """
+        delay = self._last_sent + self.rate.interval - time.monotonic()
+        if delay > 0:
+            await asyncio.sleep(delay)
+        
+        while True:
+            if is_alive is not None and not is_alive():
+                raise ConnectionResetError("Stream client disconnected")
+            
+            frame = await self.capture_service.frame()
+            data = await self.capture_service.run(self._prepare, frame, self.rate.quality)
+            if data is not None:
+                self._last_sent = time.monotonic()
+                return data
+            # Екран не змінився - нічого не відправляємо
+            await asyncio.sleep(self.idle_poll)
+
+
+def _stream_params(request) -> int:
+    """Читає max_width з параметрів запиту"""
+    try:
+        return max(320, min(3840, int(request.query.get('max_width', 1280))))
+    except ValueError:
+        return 1280
+
+
+def _acquire_stream_slot(request) -> bool:
+    """Резервує слот для стріму"""
+    if request.app[STREAMS_KEY] >= MAX_STREAMS:
+        return False
+    request.app[STREAMS_KEY] += 1
+    return True
+
+
+def _release_stream_slot(request):
+    """Звільняє слот стріму"""
+    request.app[STREAMS_KEY] -= 1
+
+
+async def stream_mjpeg(request):
+    """Live-перегляд екрану як MJPEG (multipart/x-mixed-replace)"""
+    user_id = authorize_request(request)
+    if user_id is None:
+        return web.Response(status=403, text='Forbidden')
+    
+    if not _acquire_stream_slot(request):
+        return web.Response(status=503, text='Too many streams')
+    
+    response = web.StreamResponse(headers={
+        'Content-Type': 'multipart/x-mixed-replace; boundary=frame',
+        'Cache-Control': 'no-cache, no-store',
+    })
+    stream = ScreenStream(max_width=_stream_params(request))
+    logger.info(f"MJPEG stream started for user {user_id}")
+    
+    try:
+        await response.prepare(request)
+        is_alive = lambda: request.transport is not None and not request.transport.is_closing()
+        while True:
+            data = await stream.next_frame(is_alive)
+            part = (
+                b'--frame\r\nContent-Type: image/jpeg\r\n'
+                + f'Content-Length: {len(data)}\r\n\r\n'.encode()
+                + data + b'\r\n'
+            )
+            # write() чекає drain - час запису показує пропускну здатність клієнта
+            start = time.monotonic()
+            await response.write(part)
+            stream.rate.update(time.monotonic() - start)
+    
+    except ConnectionResetError:
+        # Клієнт відключився (ClientConnectionResetError в aiohttp 3.10+ - підклас).
+        # CancelledError не перехоплюємо: після finally скасування йде далі
+        pass
+    finally:
+        _release_stream_slot(request)
+        logger.info(f"MJPEG stream stopped for user {user_id}")
+    
+    return response
+
+
+async def stream_websocket(request):
+    """
+    Live-перегляд екрану через WebSocket
+    
+    Сервер відправляє бінарні JPEG кадри (або з ?mode=delta - лише змінені
+    плитки у форматі pack_delta). Клієнт відповідає 'ack' після показу
+    кожного кадру - наступний кадр відправляється лише після ack, тому
+    частота кадрів автоматично підлаштовується під канал клієнта.
+    """
+    user_id = authorize_request(request)
+    if user_id is None:
+        return web.Response(status=403, text='Forbidden')
+    
+    if not _acquire_stream_slot(request):
+        return web.Response(status=503, text='Too many streams')
+    
+    ws = web.WebSocketResponse(heartbeat=30)
+    stream = ScreenStream(max_width=_stream_params(request), delta=request.query.get('mode') == 'delta')
+    ack = asyncio.Event()
+    ack.set()
+    sent_at = 0.0
+    
+    async def send_frames():
+        nonlocal sent_at
+        try:
+            while not ws.closed:
+                await ack.wait()
+                data = await stream.next_frame(lambda: not ws.closed)
+                ack.clear()
+                sent_at = time.monotonic()
+                await ws.send_bytes(data)
+        except ConnectionResetError:
+            await ws.close()
+        except Exception as e:
+            # Помилка захоплення або запису в сокет, що закривається - інакше задача
+            # тихо завершилась би, а клієнт бачив би застиглий кадр
+            logger.error(f"WebSocket stream error for user {user_id}: {e}")
+            await ws.close()
+    
+    sender = None
+    logger.info(f"WebSocket stream started for user {user_id}")
+    
+    try:
+        await ws.prepare(request)
+        sender = asyncio.create_task(send_frames())
+        async for msg in ws:
+            if msg.type == WSMsgType.TEXT and msg.data == 'ack':
+                stream.rate.update(time.monotonic() - sent_at)
+                ack.set()
+    
+    except ConnectionResetError:
+        pass
+    finally:
+        if sender:
+            sender.cancel()
+        _release_stream_slot(request)
+        logger.info(f"WebSocket stream stopped for user {user_id}")
+    
+    return ws
+
+
+async def mouse_websocket(request):
+    """
+    Керування мишею з Mini App (джойстик)
+    
+    Клієнт надсилає текстові повідомлення:
+    - {"vx": 300, "vy": -120} - швидкість у пікселях/с; повторювати частіше
+      ніж раз на MOUSE_JOYSTICK_TTL, інакше рух зупиниться сам
+    - {"dx": 10, "dy": 0} - відносний зсув, {"x": 100, "y": 200} - абсолютна ціль
+    - "stop" - зупинка
+    Рухи зливаються в MouseMotion і застосовуються з обмеженою частотою.
+    """
+    user_id = authorize_request(request)
+    if user_id is None:
+        return web.Response(status=403, text='Forbidden')
+    
+    ws = web.WebSocketResponse(heartbeat=30)
+    motion = get_mouse_motion()
+    logger.info(f"Mouse control started for user {user_id}")
+    
+    try:
+        await ws.prepare(request)
+        async for msg in ws:
+            if msg.type != WSMsgType.TEXT:
+                continue
+            if msg.data == 'stop':
+                motion.stop_motion()
+                continue
+            try:
+                data = json.loads(msg.data)
+                if 'vx' in data or 'vy' in data:
+                    motion.set_velocity(float(data.get('vx', 0)), float(data.get('vy', 0)))
+                elif 'dx' in data or 'dy' in data:
+                    motion.nudge(float(data.get('dx', 0)), float(data.get('dy', 0)))
+                elif 'x' in data and 'y' in data:
+                    motion.move_to(float(data['x']), float(data['y']))
+            except (ValueError, TypeError, AttributeError) as e:
+                logger.warning(f"Invalid mouse message: {msg.data[:100]} ({e})")
+    
+    except ConnectionResetError:
+        pass
+    finally:
+        # Клієнт зник - курсор не має їхати далі
+        motion.stop_motion()
+        logger.info(f"Mouse control stopped for user {user_id}")
+    
+    return ws
+
 
 async def serve_mini_app(request):
     """Serve Mini App static files"""
@@ -49,17 +353,32 @@ async def serve_mini_app(request):
         return web.Response(status=500, text='Internal Server Error')
 
 
+async def prefetch_screenshot(request):
+    """Mini App відкрито - спекулятивно готуємо прев'ю скріншота"""
+    if authorize_request(request) is None:
+        return web.json_response({'error': 'unauthorized'}, status=403)
+    
+    get_capture_service().prefetch()
+    return web.json_response({'status': 'ok'})
+
+
 async def health_check(request):
     """Health check endpoint"""
     return web.json_response({'status': 'ok'})
 
 
-async def start_mini_app_server(port=8080):
+async def start_mini_app_server(port=8080, auth_manager=None):
     """Start the Mini App server"""
     app = web.Application()
+    app[AUTH_MANAGER_KEY] = auth_manager
+    app[STREAMS_KEY] = 0
     
     # Routes
     app.router.add_get('/health', health_check)
+    app.router.add_get('/stream.mjpeg', stream_mjpeg)
+    app.router.add_get('/ws/screen', stream_websocket)
+    app.router.add_get('/ws/mouse', mouse_websocket)
+    app.router.add_post('/api/prefetch', prefetch_screenshot)
     app.router.add_get('/{path:.*}', serve_mini_app)
     
     runner = web.AppRunner(app)
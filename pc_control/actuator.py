@@ -0,0 +1,188 @@
+import asyncio
+import logging
+import queue
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future
+
+from pc_control.click import ClickController
+from pc_control.keyboard import KeyboardController
+from pc_control.input_backends import get_input_backend
+from pc_control.macros import get_macro_manager
+from pc_control.text_entry import get_text_entry
+
+logger = logging.getLogger(__name__)
+
+
+class InputActuator:
+    """
+    Виконавець дій миші та клавіатури в окремому потоці
+    
+    ClickController/KeyboardController блокують (бекенд вводу + time.sleep після
+    кожної дії), тому з async коду їх не можна викликати напряму - зупиниться
+    весь event loop бота і Mini App сервер. Усі дії ставляться в одну чергу
+    і виконуються одним потоком строго по черзі, а корутини лише чекають
+    результат.
+    """
+    
+    def __init__(self, mouse: ClickController = None, keyboard: KeyboardController = None):
+        self.mouse = mouse or ClickController()
+        self.keyboard = keyboard or KeyboardController()
+        self._queue = queue.Queue()
+        self._thread = None
+        self._lock = threading.Lock()
+        # Час у черзі та час виконання останніх дій (секунди)
+        self._waits = deque(maxlen=256)
+        self._runs = deque(maxlen=256)
+        self.stats = {'submitted': 0, 'done': 0, 'errors': 0}
+    
+    def _ensure_thread(self):
+        with self._lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._worker, name='input-actuator', daemon=True)
+                self._thread.start()
+    
+    def _worker(self):
+        """Виконує дії з черги по одній"""
+        while True:
+            item = self._queue.get()
+            if item is None:
+                break
+            future, func, args, kwargs, queued = item
+            if not future.set_running_or_notify_cancel():
+                continue
+            
+            started = time.perf_counter()
+            try:
+                result = func(*args, **kwargs)
+                future.set_result(result)
+                self.stats['done'] += 1
+            except Exception as e:
+                logger.error(f"Input action error ({getattr(func, '__name__', func)}): {e}")
+                future.set_exception(e)
+                self.stats['errors'] += 1
+            finally:
+                self._waits.append(started - queued)
+                self._runs.append(time.perf_counter() - started)
+    
+    def submit(self, func, *args, **kwargs) -> Future:
+        """Ставить дію в чергу, повертає concurrent.futures.Future"""
+        self._ensure_thread()
+        future = Future()
+        self.stats['submitted'] += 1
+        self._queue.put((future, func, args, kwargs, time.perf_counter()))
+        return future
+    
+    def call(self, func, *args, **kwargs):
+        """Блокуючий виклик через чергу (для коду, що вже працює в іншому потоці)"""
+        if threading.current_thread() is self._thread:
+            # Дія з самої черги - виконуємо одразу, інакше потік чекав би сам на себе
+            return func(*args, **kwargs)
+        return self.submit(func, *args, **kwargs).result()
+    
+    async def run(self, func, *args, **kwargs):
+        """Ставить дію в чергу і чекає результат, не блокуючи event loop"""
+        return await asyncio.wrap_future(self.submit(func, *args, **kwargs))
+    
+    def _pointer(self, func, *args, **kwargs):
+        """Дія мишею після рухів, що ще чекають у MouseMotion (виконується в потоці черги)"""
+        # Імпорт тут: mouse_motion сам імпортує цей модуль
+        from pc_control.mouse_motion import get_mouse_motion
+        get_mouse_motion().flush()
+        return func(*args, **kwargs)
+    
+    async def click(self, x: int, y: int, button: str = 'left', clicks: int = 1) -> bool:
+        return await self.run(self._pointer, self.mouse.click, x, y, button=button, clicks=clicks)
+    
+    async def double_click(self, x: int, y: int) -> bool:
+        return await self.run(self._pointer, self.mouse.double_click, x, y)
+    
+    async def right_click(self, x: int, y: int) -> bool:
+        return await self.run(self._pointer, self.mouse.right_click, x, y)
+    
+    async def click_center(self) -> bool:
+        """Клік по центру основного екрану"""
+        def click_center():
+            width, height = get_input_backend().size()
+            return self.mouse.click(width // 2, height // 2)
+        return await self.run(self._pointer, click_center)
+    
+    async def move(self, x: int, y: int) -> bool:
+        return await self.run(self._pointer, self.mouse.move_mouse, x, y)
+    
+    async def drag(self, x1: int, y1: int, x2: int, y2: int, duration: float = 0.5) -> bool:
+        return await self.run(self._pointer, self.mouse.drag, x1, y1, x2, y2, duration=duration)
+    
+    async def type(self, text: str, interval: float = 0.05) -> bool:
+        return await self.run(self.keyboard.type_text, text, interval=interval)
+    
+    async def write(self, text: str) -> bool:
+        """Unicode текст через буфер обміну"""
+        return await self.run(self.keyboard.write_unicode, text)
+    
+    async def enter_text(self, text: str, strategy: str = None, rate: float = None) -> dict:
+        """
+        Вводить текст стратегією TextEntry (paste/keys/slow)
+        
+        Returns:
+            dict: {'strategy', 'chars', 'chunks', 'seconds', 'cps'}
+        """
+        return await self.run(get_text_entry().enter, text, strategy=strategy, rate=rate)
+    
+    async def wait(self, seconds: float):
+        """Очікування (записується в макрос, якщо йде запис); черги не займає"""
+        get_macro_manager().record_wait(seconds)
+        await asyncio.sleep(seconds)
+    
+    async def play_macro(self, name: str, speed: float = 1.0, collapse: bool = True) -> dict:
+        """
+        Відтворює макрос однією дією черги
+        
+        Returns:
+            dict: {'name', 'steps', 'actions', 'seconds'}
+        """
+        return await self.run(get_macro_manager().play, name, speed=speed, collapse=collapse)
+    
+    async def press(self, key: str) -> bool:
+        return await self.run(self.keyboard.press_key, key)
+    
+    async def hotkey(self, *keys) -> bool:
+        return await self.run(self.keyboard.hotkey, *keys)
+    
+    def get_status(self) -> dict:
+        """
+        Стан черги
+        
+        Returns:
+            dict: {'queue_depth', 'submitted', 'done', 'errors', 'wait_ms', 'run_ms', 'run_p95_ms'}
+        """
+        waits, runs = list(self._waits), sorted(self._runs)
+        return {
+            'queue_depth': self._queue.qsize(),
+            **self.stats,
+            'wait_ms': sum(waits) / len(waits) * 1000 if waits else 0.0,
+            'run_ms': sum(runs) / len(runs) * 1000 if runs else 0.0,
+            'run_p95_ms': runs[min(len(runs) - 1, int(0.95 * len(runs)))] * 1000 if runs else 0.0,
+        }
+    
+    def stop(self):
+        """Зупиняє потік після вже поставлених дій"""
+        with self._lock:
+            if self._thread is not None and self._thread.is_alive():
+                self._queue.put(None)
+                self._thread.join(timeout=5)
+            self._thread = None
+
+
+_input_actuator = None
+_input_actuator_lock = threading.Lock()
+
+
+def get_input_actuator() -> InputActuator:
+    """Спільний InputActuator - одна черга вводу на весь процес"""
+    global _input_actuator
+    with _input_actuator_lock:
+        if _input_actuator is None:
+            _input_actuator = InputActuator()
+        return _input_actuator
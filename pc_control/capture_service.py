@@ -0,0 +1,241 @@
+import asyncio
+import functools
+import logging
+import os
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+
+import numpy as np
+
+from pc_control.frame_store import perceptual_hash
+from pc_control.screen import ScreenCapture, crop_frame, resize_frame
+from pc_control.windows import WindowController
+
+logger = logging.getLogger(__name__)
+
+# Розмір dHash для перевірки, чи змінився екран після prefetch: комірка ~30x17 пікс.
+# на 1920x1080 - новий рядок тексту чи прокрутка змінюють хеш
+PREFETCH_HASH_SIZE = 64
+
+
+class CaptureService:
+    """
+    Захоплення екрану поза event loop
+    
+    Всі запити на кадр, що приходять одночасно (або протягом coalesce_window),
+    отримують один і той самий кадр замість N окремих ImageGrab.grab().
+    Кодування кадрів (скріншоти, прев'ю, live-стріми, відео) виконується на
+    обмеженому пулі потоків, а OCR і пошук кнопок - на окремому: розпізнавання
+    триває секунди і не повинно затримувати стріми та доставку скріншотів.
+    """
+    
+    def __init__(self, screen: ScreenCapture = None, max_workers: int = 2, coalesce_window: float = 0.05,
+                 prefetch_ttl: float = 3.0, analysis_workers: int = 2):
+        self.screen = screen or ScreenCapture()
+        self.coalesce_window = coalesce_window
+        self.prefetch_ttl = prefetch_ttl
+        self.windows = WindowController()
+        
+        # Захоплення завжди в одному потоці - воно не може чекати на інші задачі,
+        # тому воркери пулу роботи можуть безпечно чекати на кадр
+        self._grab_pool = ThreadPoolExecutor(max_workers=1, thread_name_prefix='screen-grab')
+        self._work_pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='screen-work')
+        # OCR, пошук кнопок, шаблони - довгі задачі окремо від кодування
+        self._analysis_pool = ThreadPoolExecutor(max_workers=max(1, analysis_workers),
+                                                 thread_name_prefix='screen-analysis')
+        
+        self._lock = threading.Lock()
+        self._inflight = None
+        self._last_frame = None
+        self._last_time = 0.0
+        
+        # Спекулятивно підготовлене прев'ю (див. prefetch())
+        self._warm = None
+        self._prefetching = False
+        self.stats = {'grabs': 0, 'shared': 0, 'prefetch_hits': 0, 'prefetch_misses': 0}
+    
+    def _grab(self) -> np.ndarray:
+        """Робить один знімок (виконується в потоці захоплення)"""
+        try:
+            start = time.perf_counter()
+            frame = self.screen.capture_frame()
+            # Кадр спільний для всіх очікувачів - забороняємо зміни
+            frame.flags.writeable = False
+            logger.debug(f"Frame grabbed in {(time.perf_counter() - start) * 1000:.1f} ms")
+            
+            with self._lock:
+                self._last_frame = frame
+                self._last_time = time.monotonic()
+            return frame
+        
+        finally:
+            with self._lock:
+                self._inflight = None
+    
+    def request_frame(self) -> Future:
+        """
+        Повертає Future з кадром
+        
+        Якщо захоплення вже виконується або останній кадр свіжіший за
+        coalesce_window - повертається той самий кадр.
+        """
+        with self._lock:
+            if self._inflight is not None:
+                self.stats['shared'] += 1
+                return self._inflight
+            
+            if self._last_frame is not None and time.monotonic() - self._last_time <= self.coalesce_window:
+                self.stats['shared'] += 1
+                future = Future()
+                future.set_result(self._last_frame)
+                return future
+            
+            self.stats['grabs'] += 1
+            self._inflight = self._grab_pool.submit(self._grab)
+            return self._inflight
+    
+    def _region(self, frame: np.ndarray, bbox: tuple) -> np.ndarray:
+        """Область зі спільного кадру, або окремий знімок, якщо вона поза основним монітором"""
+        if bbox is None:
+            return frame
+        region = crop_frame(frame, bbox)
+        if region is not None:
+            return region
+        return self._grab_pool.submit(self.screen.capture_frame, bbox).result()
+    
+    def get_frame(self, bbox: tuple = None) -> np.ndarray:
+        """Кадр (або область) для синхронного коду (ButtonFinder, воркери пулу)"""
+        return self._region(self.request_frame().result(), bbox)
+    
+    async def frame(self, bbox: tuple = None) -> np.ndarray:
+        """Кадр (або область) для async коду - не блокує event loop"""
+        frame = await asyncio.wrap_future(self.request_frame())
+        if bbox is None:
+            return frame
+        return await self.run(self._region, frame, bbox)
+    
+    async def run(self, func, *args, **kwargs):
+        """Виконує блокуючу функцію на пулі кодування (коротка робота з кадрами)"""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._work_pool, functools.partial(func, *args, **kwargs))
+    
+    async def analyze(self, func, *args, **kwargs):
+        """Виконує OCR / пошук кнопок на окремому пулі - не займає пул кодування"""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._analysis_pool, functools.partial(func, *args, **kwargs))
+    
+    async def capture_bytes(self, fmt: str = None, quality: int = None, png_compression: int = None,
+                            save: bool = None, bbox: tuple = None) -> bytes:
+        """Асинхронний аналог ScreenCapture.capture_bytes()"""
+        frame = await self.frame(bbox)
+        return await self.run(self.screen.encode, frame, fmt, quality, png_compression, save)
+    
+    def prefetch(self):
+        """
+        Спекулятивно знімає і кодує прев'ю у фоні (коли відкривається меню)
+        
+        Результат живе prefetch_ttl секунд і використовується наступним
+        capture_preview(), якщо за цей час не змінились активне вікно і
+        вміст екрану (dHash свіжого кадру).
+        """
+        with self._lock:
+            if self._prefetching:
+                return
+            if self._warm is not None and time.monotonic() - self._warm['time'] <= self.prefetch_ttl:
+                return
+            self._prefetching = True
+        self._work_pool.submit(self._prefetch)
+    
+    def _prefetch(self):
+        """Готує прев'ю (виконується на пулі роботи)"""
+        try:
+            signature = self.windows.get_foreground_signature()
+            frame = self.get_frame()
+            preview = self.screen.encode(resize_frame(frame, self.screen.preview_size), save=False)
+            with self._lock:
+                self._warm = {
+                    'time': time.monotonic(),
+                    'signature': signature,
+                    'frame': frame,
+                    'hash': perceptual_hash(frame, PREFETCH_HASH_SIZE),
+                    'preview': preview,
+                }
+            logger.debug("Screenshot prefetched")
+        
+        except Exception as e:
+            logger.error(f"Screenshot prefetch error: {e}")
+        
+        finally:
+            with self._lock:
+                self._prefetching = False
+    
+    def take_prefetched(self, frame: np.ndarray) -> dict:
+        """
+        Забирає підготовлене прев'ю, якщо воно ще актуальне (виконується на пулі роботи)
+        
+        Args:
+            frame: Свіжий кадр - з ним порівнюється вміст прев'ю
+        
+        Returns:
+            dict: {'frame', 'preview', ...} або None
+        """
+        with self._lock:
+            warm, self._warm = self._warm, None
+        if warm is None:
+            return None
+        
+        # Застаріле або екран змінився (інше активне вікно, прокрутка, новий текст,
+        # діалог у тому ж вікні) - відкидаємо
+        hit = (
+            time.monotonic() - warm['time'] <= self.prefetch_ttl
+            and warm['signature'] == self.windows.get_foreground_signature()
+            and warm['hash'] == perceptual_hash(frame, PREFETCH_HASH_SIZE)
+        )
+        with self._lock:
+            self.stats['prefetch_hits' if hit else 'prefetch_misses'] += 1
+        return warm if hit else None
+    
+    async def capture_preview(self, save: bool = None, bbox: tuple = None) -> tuple[str, bytes]:
+        """Асинхронний аналог ScreenCapture.preview() - (id кадру, прев'ю)"""
+        frame = await self.frame(bbox)
+        # Знімок потрібен і для перевірки вмісту, але кодування прев'ю пропускаємо
+        warm = await self.run(self.take_prefetched, frame) if bbox is None and self._warm is not None else None
+        if warm is not None:
+            shot_id = self.screen.shots.put(warm['frame'])
+            if self.screen.save_to_disk if save is None else save:
+                await self.run(self.screen.save_frame, warm['frame'])
+            return shot_id, warm['preview']
+        
+        return await self.run(self.screen.preview, frame, save)
+    
+    async def full_bytes(self, shot_id: str) -> bytes:
+        """Асинхронний аналог ScreenCapture.full_bytes()"""
+        return await self.run(self.screen.full_bytes, shot_id)
+    
+    async def capture(self, bbox: tuple = None) -> str:
+        """Асинхронний аналог ScreenCapture.capture() - зберігає PNG і повертає шлях"""
+        frame = await self.frame(bbox)
+        return await self.run(self.screen.save_frame, frame)
+    
+    def shutdown(self):
+        """Зупиняє пули потоків"""
+        self._grab_pool.shutdown(wait=False)
+        self._work_pool.shutdown(wait=False)
+        self._analysis_pool.shutdown(wait=False)
+
+
+_capture_service = None
+_capture_service_lock = threading.Lock()
+
+
+def get_capture_service() -> CaptureService:
+    """Спільний CaptureService для бота, Executor та ButtonFinder"""
+    global _capture_service
+    with _capture_service_lock:
+        if _capture_service is None:
+            _capture_service = CaptureService(
+                prefetch_ttl=float(os.getenv('SCREENSHOT_PREFETCH_TTL', '3')),
+                analysis_workers=int(os.getenv('ANALYSIS_WORKERS', '2')),
+            )
+        return _capture_service
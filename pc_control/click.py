@@ -1,7 +1,8 @@
 import logging
-import pyautogui
 import time
 
+from pc_control.input_backends import get_input_backend
+
 logger = logging.getLogger(__name__)
 
 
@@ -9,15 +10,23 @@ class ClickController:
     """Клас для контролю кліків миші"""
     
     def __init__(self):
-        pyautogui.FAILSAFE = True
         self.delay = 0.5
     
+    @property
+    def backend(self):
+        return get_input_backend()
+    
+    def _settle(self):
+        """Пауза після дії, щоб UI встиг відреагувати (не для бекенда-запису)"""
+        if self.backend.settle:
+            time.sleep(self.delay)
+    
     def click(self, x: int, y: int, button: str = 'left', clicks: int = 1) -> bool:
         """Клік по координатам"""
         try:
             logger.info(f"Clicking at ({x}, {y}) with {button} button")
-            pyautogui.click(x, y, clicks=clicks, button=button)
-            time.sleep(self.delay)
+            self.backend.click(x, y, button=button, clicks=clicks)
+            self._settle()
             return True
             
         except Exception as e:
@@ -36,9 +45,8 @@ class ClickController:
         """Перетягування миші"""
         try:
             logger.info(f"Dragging from ({x1}, {y1}) to ({x2}, {y2})")
-            pyautogui.moveTo(x1, y1)
-            pyautogui.drag(x2 - x1, y2 - y1, duration=duration)
-            time.sleep(self.delay)
+            self.backend.drag(x1, y1, x2, y2, duration=duration)
+            self._settle()
             return True
             
         except Exception as e:
@@ -49,7 +57,7 @@ class ClickController:
         """Рух миші без кліку"""
         try:
             logger.info(f"Moving mouse to ({x}, {y})")
-            pyautogui.moveTo(x, y)
+            self.backend.move(x, y)
             return True
             
         except Exception as e:
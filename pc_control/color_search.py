@@ -0,0 +1,134 @@
+import logging
+
+import cv2
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+# Типові пропорції кнопки (ширина / висота) - поза ними бал форми знижується
+BUTTON_ASPECT = (1.0, 8.0)
+
+
+def color_mask(image: np.ndarray, color_bgr: tuple, tolerance: int = 30, hsv: bool = False,
+               hsv_tolerance: tuple = (8, 60, 60)) -> np.ndarray:
+    """
+    Маска пікселів потрібного кольору
+    
+    Args:
+        image: Кадр BGR
+        color_bgr: Колір у форматі BGR
+        tolerance: Допуск по кожному каналу BGR
+        hsv: Порівнювати в HSV - стійкіше до затемнення/підсвічування кнопки при наведенні
+        hsv_tolerance: Допуск (відтінок 0..179, насиченість, яскравість) для HSV
+    """
+    if not hsv:
+        color = np.array(color_bgr, dtype=np.int16)
+        lower = np.clip(color - tolerance, 0, 255).astype(np.uint8)
+        upper = np.clip(color + tolerance, 0, 255).astype(np.uint8)
+        return cv2.inRange(image, lower, upper)
+    
+    hue, sat, val = (int(v) for v in cv2.cvtColor(np.uint8([[color_bgr]]), cv2.COLOR_BGR2HSV)[0, 0])
+    hue_tol, sat_tol, val_tol = hsv_tolerance
+    converted = cv2.cvtColor(image, cv2.COLOR_BGR2HSV)
+    sat_range = (max(0, sat - sat_tol), min(255, sat + sat_tol))
+    val_range = (max(0, val - val_tol), min(255, val + val_tol))
+    
+    # Відтінок циклічний: червоний біля 0 і біля 179 - два діапазони
+    ranges = [(hue - hue_tol, hue + hue_tol)]
+    if hue - hue_tol < 0:
+        ranges = [(0, hue + hue_tol), (180 + hue - hue_tol, 179)]
+    elif hue + hue_tol > 179:
+        ranges = [(hue - hue_tol, 179), (0, hue + hue_tol - 180)]
+    
+    mask = None
+    for low, high in ranges:
+        part = cv2.inRange(converted, (low, sat_range[0], val_range[0]), (high, sat_range[1], val_range[1]))
+        mask = part if mask is None else cv2.bitwise_or(mask, part)
+    return mask
+
+
+def find_color_regions(image: np.ndarray, color_bgr: tuple, tolerance: int = 30, hsv: bool = False,
+                       hsv_tolerance: tuple = (8, 60, 60), coarse: float = 0.25, min_area: int = 100,
+                       limit: int = 10) -> list:
+    """
+    Області потрібного кольору, ранжовані як кандидати в кнопки
+    
+    Грубий прохід шукає зв'язні області на зменшеному кадрі, точний - уточнює
+    межі кожної з них у повній роздільності лише в її околі. Бал враховує
+    площу (відносно найбільшої), заповненість рамки і пропорції кнопки.
+    
+    Args:
+        image: Кадр BGR
+        color_bgr: Колір у форматі BGR
+        tolerance: Допуск по каналах BGR
+        hsv: Шукати в HSV (див. color_mask)
+        hsv_tolerance: Допуск для HSV
+        coarse: Масштаб грубого проходу (1 - без нього); якщо він нічого не знайшов,
+                пошук повторюється в повній роздільності
+        min_area: Мінімальна площа області в пікселях повного кадру
+        limit: Максимум кандидатів
+    
+    Returns:
+        list: [{'bbox', 'center', 'area', 'fill', 'aspect', 'score'}, ...] від найкращого,
+              координати - в пікселях кадру
+    """
+    height, width = image.shape[:2]
+    coarse = min(1.0, coarse)
+    small = image if coarse == 1 else cv2.resize(image, None, fx=coarse, fy=coarse, interpolation=cv2.INTER_AREA)
+    
+    mask = color_mask(small, color_bgr, tolerance, hsv, hsv_tolerance)
+    _, _, stats, _ = cv2.connectedComponentsWithStats(mask, connectivity=8)
+    stats = stats[1:]
+    # Відсіюємо дрібні області одразу для всіх компонент. На зменшеному кадрі
+    # краї змішуються з фоном і не проходять допуск, тож від маленької кнопки
+    # (11x11 при 0.25) лишається 1-4 пікселі - поріг м'якший за min_area * coarse²,
+    # точну площу перевіряє повний прохід
+    stats = stats[stats[:, cv2.CC_STAT_AREA] >= max(1, int(min_area * coarse * coarse / 4))]
+    # Найбільші першими - точний прохід лише для тих, що можуть потрапити в результат
+    stats = stats[np.argsort(-stats[:, cv2.CC_STAT_AREA])][:limit * 3]
+    
+    candidates = []
+    pad = int(np.ceil(1 / coarse)) + 1
+    for x, y, w, h, _ in stats:
+        left = max(0, int(x / coarse) - pad)
+        top = max(0, int(y / coarse) - pad)
+        right = min(width, int((x + w) / coarse) + pad)
+        bottom = min(height, int((y + h) / coarse) + pad)
+        
+        roi_mask = color_mask(image[top:bottom, left:right], color_bgr, tolerance, hsv, hsv_tolerance)
+        count, _, roi_stats, _ = cv2.connectedComponentsWithStats(roi_mask, connectivity=8)
+        if count < 2:
+            continue
+        rx, ry, rw, rh, area = roi_stats[1 + np.argmax(roi_stats[1:, cv2.CC_STAT_AREA])]
+        if area < min_area:
+            continue
+        
+        aspect = float(rw) / float(rh)
+        low, high = BUTTON_ASPECT
+        shape = 1.0 if low <= aspect <= high else min(aspect / low, high / aspect)
+        bbox = (left + int(rx), top + int(ry), left + int(rx + rw), top + int(ry + rh))
+        candidates.append({
+            'bbox': bbox,
+            'center': ((bbox[0] + bbox[2]) // 2, (bbox[1] + bbox[3]) // 2),
+            'area': int(area),
+            'fill': round(float(area) / float(rw * rh), 3),
+            'aspect': round(float(aspect), 2),
+            'shape': shape,
+        })
+    
+    # Уточнені області можуть збігтися (сусідні грубі компоненти однієї кнопки)
+    unique = {}
+    for candidate in candidates:
+        unique.setdefault(candidate['bbox'], candidate)
+    candidates = list(unique.values())
+    
+    max_area = max((c['area'] for c in candidates), default=1)
+    for candidate in candidates:
+        shape = candidate.pop('shape')
+        candidate['score'] = round(float((candidate['area'] / max_area) ** 0.5 * candidate['fill'] * shape), 3)
+    candidates.sort(key=lambda c: c['score'], reverse=True)
+    if not candidates and coarse < 1:
+        # Грубий прохід міг зовсім загубити дрібну ціль - повторюємо в повній роздільності
+        return find_color_regions(image, color_bgr, tolerance, hsv, hsv_tolerance, coarse=1.0,
+                                  min_area=min_area, limit=limit)
+    return candidates[:limit]
@@ -0,0 +1,141 @@
+import json
+import logging
+import struct
+
+import cv2
+import numpy as np
+
+from pc_control.screen import encode_frame
+
+logger = logging.getLogger(__name__)
+
+
+def changed_tiles(prev: np.ndarray, frame: np.ndarray, tile: int = 64) -> np.ndarray:
+    """
+    Визначає змінені плитки між двома кадрами
+    
+    Args:
+        prev: Попередній кадр (або None)
+        frame: Поточний кадр
+        tile: Розмір плитки в пікселях
+    
+    Returns:
+        np.ndarray: Булева сітка (рядки x стовпці плиток), True - плитка змінилась
+    """
+    height, width = frame.shape[:2]
+    rows = -(-height // tile)
+    cols = -(-width // tile)
+    
+    if prev is None or prev.shape != frame.shape:
+        return np.ones((rows, cols), dtype=bool)
+    
+    # Канали розгортаємо в рядок: плитка = tile рядків x tile*channels байт
+    channels = frame.shape[2] if frame.ndim == 3 else 1
+    diff = cv2.absdiff(prev, frame).reshape(height, width * channels)
+    
+    # Доповнюємо до цілої кількості плиток і згортаємо по кожній плитці
+    pad_bottom = rows * tile - height
+    pad_right = (cols * tile - width) * channels
+    if pad_bottom or pad_right:
+        diff = cv2.copyMakeBorder(diff, 0, pad_bottom, 0, pad_right, cv2.BORDER_CONSTANT, value=0)
+    return diff.reshape(rows, tile, cols, tile * channels).max(axis=(1, 3)) > 0
+
+
+def tile_rects(mask: np.ndarray, tile: int, shape: tuple) -> list:
+    """
+    Перетворює сітку змінених плиток у прямокутники
+    
+    Сусідні змінені плитки в одному рядку об'єднуються, щоб кодувати
+    менше дрібних зображень.
+    
+    Returns:
+        list: [(x, y, w, h), ...] в пікселях кадру
+    """
+    height, width = shape[:2]
+    rects = []
+    for row in range(mask.shape[0]):
+        cols = np.flatnonzero(mask[row])
+        if cols.size == 0:
+            continue
+        # Розбиваємо на неперервні відрізки
+        breaks = np.flatnonzero(np.diff(cols) > 1)
+        starts = np.concatenate(([cols[0]], cols[breaks + 1]))
+        ends = np.concatenate((cols[breaks], [cols[-1]]))
+        y = row * tile
+        h = min(tile, height - y)
+        for start, end in zip(starts, ends):
+            x = int(start) * tile
+            w = min((int(end) + 1) * tile, width) - x
+            rects.append((x, y, w, h))
+    return rects
+
+
+class DeltaEncoder:
+    """
+    Кодує лише змінені частини екрану
+    
+    Тримає попередній кадр і на кожен новий кадр повертає закодовані
+    плитки, що змінились, разом з їх зміщеннями.
+    """
+    
+    def __init__(self, tile: int = 64, fmt: str = 'jpeg', quality: int = 80, full_threshold: float = 0.5):
+        self.tile = tile
+        self.fmt = fmt
+        self.quality = quality
+        # Якщо змінилось більше цієї частки плиток - відправляємо повний кадр
+        self.full_threshold = full_threshold
+        self._prev = None
+    
+    def reset(self):
+        """Забуває попередній кадр - наступне оновлення буде повним"""
+        self._prev = None
+    
+    def encode(self, frame: np.ndarray) -> dict:
+        """
+        Кодує оновлення відносно попереднього кадру
+        
+        Returns:
+            dict: {'width', 'height', 'full', 'changed', 'tiles': [{'x', 'y', 'w', 'h', 'data'}]}
+                  або None, якщо кадр не змінився
+        """
+        height, width = frame.shape[:2]
+        mask = changed_tiles(self._prev, frame, self.tile)
+        self._prev = frame
+        
+        changed = float(mask.mean())
+        if changed == 0:
+            return None
+        
+        full = changed >= self.full_threshold
+        rects = [(0, 0, width, height)] if full else tile_rects(mask, self.tile, frame.shape)
+        
+        tiles = []
+        for x, y, w, h in rects:
+            data = encode_frame(frame[y:y + h, x:x + w], fmt=self.fmt, quality=self.quality)
+            tiles.append({'x': x, 'y': y, 'w': w, 'h': h, 'data': data})
+        
+        logger.debug(f"Delta update: {changed:.1%} tiles changed, {len(tiles)} rects")
+        return {
+            'width': width,
+            'height': height,
+            'full': full,
+            'changed': changed,
+            'tiles': tiles,
+        }
+
+
+def pack_delta(update: dict) -> bytes:
+    """
+    Пакує оновлення в одне бінарне повідомлення
+    
+    Формат: 4 байти довжини заголовка (big-endian), JSON заголовок
+    {"w", "h", "full", "tiles": [[x, y, w, h, size], ...]}, далі дані плиток підряд.
+    """
+    header = json.dumps({
+        'w': update['width'],
+        'h': update['height'],
+        'full': update['full'],
+        'tiles': [[t['x'], t['y'], t['w'], t['h'], len(t['data'])] for t in update['tiles']],
+    }).encode()
+    return struct.pack('>I', len(header)) + header + b''.join(t['data'] for t in update['tiles'])
+
@@ -0,0 +1,174 @@
+import hashlib
+import json
+import logging
+import os
+import threading
+from datetime import datetime
+
+import cv2
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+INDEX_FILE = "index.jsonl"
+
+# Після стільки записів індекс чиститься від посилань на видалені файли
+INDEX_COMPACT_LINES = 5000
+
+
+def exact_hash(frame: np.ndarray) -> str:
+    """Точний хеш пікселів кадру"""
+    return hashlib.blake2b(np.ascontiguousarray(frame).tobytes(), digest_size=16).hexdigest()
+
+
+def perceptual_hash(frame: np.ndarray, size: int = 16) -> str:
+    """
+    Перцептивний dHash по зменшеному кадру
+    
+    Майже однакові кадри (шум стиснення, мерехтіння курсора) дають однаковий хеш.
+    """
+    gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY) if frame.ndim == 3 else frame
+    small = cv2.resize(gray, (size + 1, size), interpolation=cv2.INTER_AREA)
+    bits = (small[:, 1:] > small[:, :-1]).flatten()
+    return np.packbits(bits).tobytes().hex()
+
+
+class FrameStore:
+    """
+    Сховище скріншотів з адресацією за вмістом
+    
+    Кадр зберігається як frame_<хеш>.<ext>. Однаковий кадр не записується
+    повторно - лише додається нове посилання в індекс (час -> хеш).
+    """
+    
+    def __init__(self, directory: str = "screenshots", mode: str = "exact", png_compression: int = 1):
+        self.directory = directory
+        self.mode = mode
+        self.png_compression = png_compression
+        self.index_path = os.path.join(directory, INDEX_FILE)
+        self._lock = threading.Lock()
+        self._index_lines = None
+        os.makedirs(directory, exist_ok=True)
+    
+    def hash_frame(self, frame: np.ndarray) -> str:
+        """Хеш кадру відповідно до режиму"""
+        if self.mode == 'perceptual':
+            return perceptual_hash(frame)
+        return exact_hash(frame)
+    
+    def _find(self, frame_hash: str) -> str:
+        """Шукає файл кадру з будь-яким розширенням"""
+        prefix = f"frame_{frame_hash}"
+        for ext in ('.png', '.jpg', '.webp'):
+            path = os.path.join(self.directory, prefix + ext)
+            if os.path.exists(path):
+                return path
+        return None
+    
+    def put(self, frame: np.ndarray, encoded: bytes = None, fmt: str = 'png') -> dict:
+        """
+        Зберігає кадр
+        
+        Args:
+            frame: Кадр (BGR)
+            encoded: Вже закодований кадр (інакше кодується лише якщо його ще немає)
+            fmt: Формат закодованого кадру
+        
+        Returns:
+            dict: {'hash', 'path', 'new', 'timestamp'}
+        """
+        from pc_control.screen import IMAGE_EXTENSIONS, encode_frame
+        
+        frame_hash = self.hash_frame(frame)
+        timestamp = datetime.now().isoformat(timespec='seconds')
+        
+        with self._lock:
+            path = self._find(frame_hash)
+            if path is not None:
+                try:
+                    # Оновлюємо mtime - ротація рахує вік від останнього посилання
+                    os.utime(path)
+                except FileNotFoundError:
+                    # ScreenshotRetention видалив файл після _find - записуємо заново
+                    path = None
+            is_new = path is None
+            if is_new:
+                if encoded is None:
+                    encoded = encode_frame(frame, fmt=fmt, png_compression=self.png_compression)
+                path = os.path.join(self.directory, f"frame_{frame_hash}{IMAGE_EXTENSIONS[fmt]}")
+                with open(path, 'wb') as f:
+                    f.write(encoded)
+            
+            self._append_index({'ts': timestamp, 'hash': frame_hash, 'file': os.path.basename(path)})
+        
+        if is_new:
+            logger.info(f"Screenshot stored: {path}")
+        else:
+            logger.info(f"Duplicate screenshot, reference added: {path}")
+        
+        return {'hash': frame_hash, 'path': path, 'new': is_new, 'timestamp': timestamp}
+    
+    def _append_index(self, entry: dict):
+        """Додає запис в індекс (викликається під self._lock)"""
+        with open(self.index_path, 'a', encoding='utf-8') as f:
+            f.write(json.dumps(entry) + '\n')
+        
+        if self._index_lines is None:
+            self._index_lines = len(self._read_index())
+        else:
+            self._index_lines += 1
+        
+        if self._index_lines > INDEX_COMPACT_LINES:
+            self._compact_index()
+    
+    def _read_index(self) -> list:
+        """Читає всі записи індексу"""
+        entries = []
+        if not os.path.exists(self.index_path):
+            return entries
+        with open(self.index_path, 'r', encoding='utf-8') as f:
+            for line in f:
+                try:
+                    entries.append(json.loads(line))
+                except json.JSONDecodeError:
+                    continue
+        return entries
+    
+    def _compact_index(self):
+        """Прибирає з індексу посилання на видалені файли"""
+        entries = [e for e in self._read_index()
+                   if os.path.exists(os.path.join(self.directory, e['file']))]
+        tmp_path = self.index_path + '.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            for entry in entries:
+                f.write(json.dumps(entry) + '\n')
+        os.replace(tmp_path, self.index_path)
+        self._index_lines = len(entries)
+        logger.info(f"Screenshot index compacted: {len(entries)} entries")
+    
+    def history(self, limit: int = 20) -> list:
+        """Останні записи індексу (новіші першими), лише для існуючих файлів"""
+        with self._lock:
+            entries = self._read_index()
+        
+        result = []
+        for entry in reversed(entries):
+            # Ротація могла перестиснути PNG в інший формат
+            path = self._find(entry['hash'])
+            if path:
+                result.append({**entry, 'path': path})
+                if len(result) >= limit:
+                    break
+        return result
+    
+    def get(self, hash_prefix: str) -> str:
+        """Шлях до кадру за хешем або його префіксом"""
+        hash_prefix = hash_prefix.lower()
+        try:
+            names = os.listdir(self.directory)
+        except FileNotFoundError:
+            return None
+        for name in names:
+            if name.startswith(f"frame_{hash_prefix}"):
+                return os.path.join(self.directory, name)
+        return None
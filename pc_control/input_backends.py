@@ -0,0 +1,338 @@
+import logging
+import os
+import shutil
+import subprocess
+import sys
+import threading
+import time
+from contextlib import contextmanager
+
+logger = logging.getLogger(__name__)
+
+
+class InputBackend:
+    """
+    Бекенд вводу/дисплея: миша, клавіатура, буфер обміну, розмір екрану
+    
+    ClickController, KeyboardController та інші працюють лише через цей
+    інтерфейс, тож реалізацію можна замінити (інша ОС, запис без дисплея).
+    """
+    
+    name = 'base'
+    # Чи потрібні паузи після дій (реальному UI потрібен час відреагувати)
+    settle = True
+    # Чи є буфер обміну (get_clipboard/set_clipboard)
+    clipboard = True
+    # Чи вводить type_text будь-які Unicode символи (pyautogui - лише ASCII)
+    unicode_typing = False
+    
+    def click(self, x: int, y: int, button: str = 'left', clicks: int = 1):
+        raise NotImplementedError
+    
+    def move(self, x: int, y: int):
+        raise NotImplementedError
+    
+    def drag(self, x1: int, y1: int, x2: int, y2: int, duration: float = 0.5):
+        raise NotImplementedError
+    
+    def press(self, key: str):
+        raise NotImplementedError
+    
+    def hotkey(self, *keys):
+        raise NotImplementedError
+    
+    def type_text(self, text: str, interval: float = 0.05):
+        raise NotImplementedError
+    
+    def paste_text(self, text: str):
+        """Вставляє текст через буфер обміну (Unicode)"""
+        raise NotImplementedError
+    
+    def get_clipboard(self) -> str:
+        raise NotImplementedError
+    
+    def set_clipboard(self, text: str):
+        raise NotImplementedError
+    
+    def position(self) -> tuple:
+        raise NotImplementedError
+    
+    def size(self) -> tuple:
+        raise NotImplementedError
+    
+    def flush(self):
+        """Виконує накопичені в пакеті події поточного потоку (для бекендів з пакетуванням)"""
+    
+    @contextmanager
+    def batch(self):
+        """
+        Явний пакет: події поточного потоку накопичуються і виконуються разом
+        при flush() або виході з блоку. Поза пакетом кожна дія виконується одразу.
+        """
+        yield
+
+
+class PyautoguiBackend(InputBackend):
+    """pyautogui + pyperclip (Windows, macOS, X11)"""
+    
+    name = 'pyautogui'
+    
+    def __init__(self):
+        import pyautogui
+        self._gui = pyautogui
+        pyautogui.FAILSAFE = True
+    
+    def click(self, x: int, y: int, button: str = 'left', clicks: int = 1):
+        self._gui.click(x, y, clicks=clicks, button=button)
+    
+    def move(self, x: int, y: int):
+        self._gui.moveTo(x, y)
+    
+    def drag(self, x1: int, y1: int, x2: int, y2: int, duration: float = 0.5):
+        self._gui.moveTo(x1, y1)
+        self._gui.drag(x2 - x1, y2 - y1, duration=duration)
+    
+    def press(self, key: str):
+        self._gui.press(key)
+    
+    def hotkey(self, *keys):
+        self._gui.hotkey(*keys)
+    
+    def type_text(self, text: str, interval: float = 0.05):
+        self._gui.typewrite(text, interval=interval)
+    
+    def paste_text(self, text: str):
+        self.set_clipboard(text)
+        self._gui.hotkey('ctrl', 'v')
+    
+    def get_clipboard(self) -> str:
+        import pyperclip
+        return pyperclip.paste()
+    
+    def set_clipboard(self, text: str):
+        import pyperclip
+        pyperclip.copy(text)
+    
+    def position(self) -> tuple:
+        x, y = self._gui.position()
+        return x, y
+    
+    def size(self) -> tuple:
+        width, height = self._gui.size()
+        return width, height
+
+
+class XdotoolBackend(InputBackend):
+    """
+    Linux X11 через xdotool
+    
+    Кожна дія виконується одразу (окремий процес xdotool), тож паузи
+    контролерів відраховуються після того, як подія справді відбулась.
+    Усередині with backend.batch() події потоку складаються в один ланцюжок
+    команд і виконуються одним процесом при flush(), перед читанням стану
+    (position/size) або при виході з блоку. Пакет належить потоку, що його
+    відкрив: дії інших потоків у нього не потрапляють.
+    """
+    
+    name = 'xdotool'
+    clipboard = False
+    unicode_typing = True
+    
+    BUTTONS = {'left': '1', 'middle': '2', 'right': '3'}
+    KEYS = {
+        'ctrl': 'ctrl', 'alt': 'alt', 'shift': 'shift', 'win': 'super',
+        'enter': 'Return', 'return': 'Return', 'tab': 'Tab', 'escape': 'Escape', 'esc': 'Escape',
+        'delete': 'Delete', 'backspace': 'BackSpace', 'space': 'space', 'insert': 'Insert',
+        'home': 'Home', 'end': 'End', 'pageup': 'Prior', 'pagedown': 'Next',
+        'up': 'Up', 'down': 'Down', 'left': 'Left', 'right': 'Right', 'printscreen': 'Print',
+    }
+    
+    def __init__(self, executable: str = 'xdotool'):
+        self.executable = shutil.which(executable)
+        if not self.executable:
+            raise RuntimeError("xdotool is not installed")
+        self._local = threading.local()
+        # Процеси xdotool з різних потоків не перемежовуються
+        self._lock = threading.Lock()
+    
+    def keysym(self, key: str) -> str:
+        key = key.lower()
+        if key in self.KEYS:
+            return self.KEYS[key]
+        if len(key) > 1 and key[0] == 'f' and key[1:].isdigit():
+            return key.upper()
+        return key
+    
+    def _add(self, *args):
+        args = [str(arg) for arg in args]
+        if getattr(self._local, 'depth', 0):
+            self._local.pending.extend(args)
+        else:
+            self._run(*args)
+    
+    def _run(self, *args) -> str:
+        with self._lock:
+            result = subprocess.run([self.executable, *args], check=True, capture_output=True, text=True)
+        return result.stdout
+    
+    def flush(self):
+        pending = getattr(self._local, 'pending', None)
+        if pending:
+            self._local.pending = []
+            self._run(*pending)
+    
+    @contextmanager
+    def batch(self):
+        if not getattr(self._local, 'depth', 0):
+            self._local.depth = 0
+            self._local.pending = []
+        self._local.depth += 1
+        try:
+            yield
+        finally:
+            self._local.depth -= 1
+            if not self._local.depth:
+                self.flush()
+    
+    def click(self, x: int, y: int, button: str = 'left', clicks: int = 1):
+        self._add('mousemove', x, y, 'click', '--repeat', clicks, self.BUTTONS.get(button, '1'))
+    
+    def move(self, x: int, y: int):
+        self._add('mousemove', x, y)
+    
+    def drag(self, x1: int, y1: int, x2: int, y2: int, duration: float = 0.5):
+        self._add('mousemove', x1, y1, 'mousedown', '1', 'sleep', duration, 'mousemove', x2, y2, 'mouseup', '1')
+    
+    def press(self, key: str):
+        self._add('key', self.keysym(key))
+    
+    def hotkey(self, *keys):
+        self._add('key', '+'.join(self.keysym(key) for key in keys))
+    
+    def type_text(self, text: str, interval: float = 0.05):
+        self._add('type', '--delay', int(interval * 1000), '--', text)
+    
+    def paste_text(self, text: str):
+        # xdotool type вводить Unicode напряму, буфер обміну не потрібен
+        self._add('type', '--delay', '0', '--', text)
+    
+    def position(self) -> tuple:
+        self.flush()
+        values = dict(line.split('=', 1) for line in self._run('getmouselocation', '--shell').split())
+        return int(values['X']), int(values['Y'])
+    
+    def size(self) -> tuple:
+        self.flush()
+        width, height = self._run('getdisplaygeometry').split()
+        return int(width), int(height)
+
+
+class RecordingBackend(InputBackend):
+    """
+    Бекенд без дисплея: лише записує події з часовими мітками
+    
+    Для бенчмарків і перевірки сценаріїв (Executor, шорткати, команди Mini App)
+    на машині без екрану. Пауз після дій немає - вимірюється лише власний
+    час коду.
+    """
+    
+    name = 'recording'
+    settle = False
+    unicode_typing = True
+    
+    def __init__(self, screen_size: tuple = (1920, 1080)):
+        self.screen_size = screen_size
+        self.cursor = (screen_size[0] // 2, screen_size[1] // 2)
+        self.clipboard_text = ''
+        self.events = []
+        self._start = time.perf_counter()
+        self._lock = threading.Lock()
+    
+    def _record(self, event: str, **data):
+        with self._lock:
+            self.events.append({'t': time.perf_counter() - self._start, 'event': event, **data})
+    
+    def clear(self):
+        with self._lock:
+            self.events = []
+            self._start = time.perf_counter()
+    
+    def click(self, x: int, y: int, button: str = 'left', clicks: int = 1):
+        self.cursor = (x, y)
+        self._record('click', x=x, y=y, button=button, clicks=clicks)
+    
+    def move(self, x: int, y: int):
+        self.cursor = (x, y)
+        self._record('move', x=x, y=y)
+    
+    def drag(self, x1: int, y1: int, x2: int, y2: int, duration: float = 0.5):
+        self.cursor = (x2, y2)
+        self._record('drag', x1=x1, y1=y1, x2=x2, y2=y2)
+    
+    def press(self, key: str):
+        self._record('press', key=key)
+    
+    def hotkey(self, *keys):
+        self._record('hotkey', keys=list(keys))
+    
+    def type_text(self, text: str, interval: float = 0.05):
+        self._record('type', text=text)
+    
+    def paste_text(self, text: str):
+        self.clipboard_text = text
+        self._record('paste', text=text)
+    
+    def get_clipboard(self) -> str:
+        return self.clipboard_text
+    
+    def set_clipboard(self, text: str):
+        self.clipboard_text = text
+        self._record('clipboard', text=text)
+    
+    def position(self) -> tuple:
+        return self.cursor
+    
+    def size(self) -> tuple:
+        return self.screen_size
+
+
+BACKENDS = {
+    'pyautogui': PyautoguiBackend,
+    'xdotool': XdotoolBackend,
+    'recording': RecordingBackend,
+}
+
+_input_backend = None
+_input_backend_lock = threading.Lock()
+
+
+def create_input_backend(name: str = 'auto') -> InputBackend:
+    """
+    Створює бекенд вводу
+    
+    Args:
+        name: auto, pyautogui, xdotool або recording. auto - xdotool на Linux
+              (якщо встановлений), інакше pyautogui
+    """
+    if name == 'auto':
+        name = 'xdotool' if sys.platform.startswith('linux') and shutil.which('xdotool') else 'pyautogui'
+    if name not in BACKENDS:
+        raise ValueError(f"Unknown input backend: {name}")
+    return BACKENDS[name]()
+
+
+def get_input_backend() -> InputBackend:
+    """Спільний бекенд вводу (INPUT_BACKEND, за замовчуванням auto)"""
+    global _input_backend
+    with _input_backend_lock:
+        if _input_backend is None:
+            _input_backend = create_input_backend(os.getenv('INPUT_BACKEND', 'auto').lower())
+            logger.info(f"Input backend: {_input_backend.name}")
+        return _input_backend
+
+
+def set_input_backend(backend: InputBackend):
+    """Замінює спільний бекенд (напр. RecordingBackend для бенчмарків)"""
+    global _input_backend
+    with _input_backend_lock:
+        _input_backend = backend
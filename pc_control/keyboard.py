@@ -1,7 +1,8 @@
 import logging
-import pyautogui
 import time
 
+from pc_control.input_backends import get_input_backend
+
 logger = logging.getLogger(__name__)
 
 
@@ -11,12 +12,21 @@ class KeyboardController:
     def __init__(self):
         self.delay = 0.1
     
+    @property
+    def backend(self):
+        return get_input_backend()
+    
+    def _settle(self):
+        """Пауза після дії, щоб UI встиг відреагувати (не для бекенда-запису)"""
+        if self.backend.settle:
+            time.sleep(self.delay)
+    
     def type_text(self, text: str, interval: float = 0.05) -> bool:
         """Набрати текст"""
         try:
             logger.info(f"Typing text: {text[:50]}...")
-            pyautogui.typewrite(text, interval=interval)
-            time.sleep(self.delay)
+            self.backend.type_text(text, interval=interval)
+            self._settle()
             return True
             
         except Exception as e:
@@ -27,8 +37,8 @@ class KeyboardController:
         """Натиснути клавішу"""
         try:
             logger.info(f"Pressing key: {key}")
-            pyautogui.press(key)
-            time.sleep(self.delay)
+            self.backend.press(key)
+            self._settle()
             return True
             
         except Exception as e:
@@ -47,8 +57,8 @@ class KeyboardController:
         """
         try:
             logger.info(f"Hotkey: {'+'.join(keys)}")
-            pyautogui.hotkey(*keys)
-            time.sleep(self.delay)
+            self.backend.hotkey(*keys)
+            self._settle()
             return True
             
         except Exception as e:
@@ -64,8 +74,8 @@ class KeyboardController:
         """
         try:
             logger.info("Alt+Enter pressed")
-            pyautogui.hotkey('alt', 'enter')
-            time.sleep(self.delay)
+            self.backend.hotkey('alt', 'enter')
+            self._settle()
             return True
             
         except Exception as e:
@@ -81,8 +91,8 @@ class KeyboardController:
         """
         try:
             logger.info("Enter+Alt pressed")
-            pyautogui.hotkey('alt', 'enter')
-            time.sleep(self.delay)
+            self.backend.hotkey('alt', 'enter')
+            self._settle()
             return True
             
         except Exception as e:
@@ -92,11 +102,9 @@ class KeyboardController:
     def write_unicode(self, text: str) -> bool:
         """Написати текст через буфер обміну (для Unicode)"""
         try:
-            import pyperclip
             logger.info(f"Writing unicode text: {text[:50]}...")
-            pyperclip.copy(text)
-            pyautogui.hotkey('ctrl', 'v')
-            time.sleep(self.delay)
+            self.backend.paste_text(text)
+            self._settle()
             return True
             
         except Exception as e:
@@ -0,0 +1,335 @@
+import json
+import logging
+import os
+import re
+import threading
+import time
+
+from pc_control.input_backends import InputBackend, get_input_backend, set_input_backend
+from pc_control.text_entry import get_text_entry
+
+logger = logging.getLogger(__name__)
+
+MACROS_FILE = "data/macros.json"
+MACRO_NAME = re.compile(r'^[\w-]{1,32}$')
+
+# Кроки макросу: [мс від попереднього кроку, код дії, *аргументи]
+# c - клік (x, y[, кнопка, кліків]), m - рух (x, y), d - перетягування (x1, y1, x2, y2[, тривалість]),
+# k - клавіша, h - комбінація (клавіші...), t - текст, w - явне очікування (секунди)
+OPS = {'c', 'm', 'd', 'k', 'h', 't', 'w'}
+
+
+def _trim(args: list, defaults: list) -> list:
+    """Прибирає аргументи в кінці, що дорівнюють значенням за замовчуванням"""
+    args = list(args)
+    while args and defaults and args[-1] == defaults[-1]:
+        args.pop()
+        defaults = defaults[:-1]
+    return args
+
+
+class MacroRecorder(InputBackend):
+    """
+    Обгортка бекенда вводу, що записує дії як кроки макросу
+    
+    Поки йде запис, вона стоїть на місці спільного бекенда, тож записується
+    все, що доходить до миші й клавіатури: команди бота, Mini App, шорткати,
+    REPL pc_control_script.py. Дії передаються справжньому бекенду без змін.
+    """
+    
+    def __init__(self, inner: InputBackend, macro: str):
+        self.inner = inner
+        self.macro = macro
+        self.name = inner.name
+        self.settle = inner.settle
+        self.clipboard = inner.clipboard
+        self.unicode_typing = inner.unicode_typing
+        self.steps = []
+        self._last = time.perf_counter()
+        self._lock = threading.Lock()
+    
+    def add(self, op: str, *args):
+        now = time.perf_counter()
+        with self._lock:
+            self.steps.append([int((now - self._last) * 1000), op, *args])
+            self._last = now
+    
+    def click(self, x: int, y: int, button: str = 'left', clicks: int = 1):
+        self.inner.click(x, y, button=button, clicks=clicks)
+        self.add('c', int(x), int(y), *_trim([button, clicks], ['left', 1]))
+    
+    def move(self, x: int, y: int):
+        self.inner.move(x, y)
+        self.add('m', int(x), int(y))
+    
+    def drag(self, x1: int, y1: int, x2: int, y2: int, duration: float = 0.5):
+        self.inner.drag(x1, y1, x2, y2, duration=duration)
+        self.add('d', int(x1), int(y1), int(x2), int(y2), *_trim([duration], [0.5]))
+    
+    def press(self, key: str):
+        self.inner.press(key)
+        self.add('k', key)
+    
+    def hotkey(self, *keys):
+        self.inner.hotkey(*keys)
+        self.add('h', *keys)
+    
+    def type_text(self, text: str, interval: float = 0.05):
+        self.inner.type_text(text, interval=interval)
+        self.add('t', text)
+    
+    def paste_text(self, text: str):
+        self.inner.paste_text(text)
+        self.add('t', text)
+    
+    def get_clipboard(self) -> str:
+        return self.inner.get_clipboard()
+    
+    def set_clipboard(self, text: str):
+        self.inner.set_clipboard(text)
+    
+    def position(self) -> tuple:
+        return self.inner.position()
+    
+    def size(self) -> tuple:
+        return self.inner.size()
+    
+    def flush(self):
+        self.inner.flush()
+    
+    def batch(self):
+        return self.inner.batch()
+
+
+def compile_macro(steps: list, speed: float = 1.0, collapse: bool = True, gap: float = 0.05) -> list:
+    """
+    Компілює кроки макросу в план відтворення
+    
+    - сусідні шматки тексту зливаються в одне введення (TextEntry вибере стратегію);
+    - рух миші, за яким одразу йде інша дія мишею, відкидається (вона сама ставить курсор);
+    - collapse=True: записані паузи між діями (час на обдумування, дорога через
+      Telegram, фіксовані sleep контролерів) замінюються однаковим gap, лишаються
+      тільки явні очікування (w), сусідні з них додаються; кроки, розділені
+      очікуванням, не зливаються (напр. наведення миші, пауза, клік);
+      collapse=False: паузи відтворюються як були записані, w не додаються ще раз.
+    
+    Args:
+        steps: Кроки [мс, код, *аргументи]
+        speed: Прискорення (2 - удвічі швидше), ділить усі затримки
+        collapse: Згортати паузи
+        gap: Пауза між діями при collapse (секунди)
+    
+    Returns:
+        list: [(затримка в секундах, код, аргументи), ...]
+    """
+    speed = max(speed, 0.01)
+    plan = []
+    pending = 0.0
+    for dt, op, *args in steps:
+        if op not in OPS:
+            raise ValueError(f"Unknown macro step: {op}")
+        if op == 'w':
+            if collapse:
+                pending += float(args[0])
+            continue
+        delay = (pending + (gap if plan else 0.0)) if collapse else dt / 1000.0
+        # Без паузи між кроками (явної або записаної) - їх можна злити
+        adjacent = not pending if collapse else dt < 50
+        pending = 0.0
+        
+        if plan and adjacent and op == 't' and plan[-1][1] == 't':
+            plan[-1] = (plan[-1][0], 't', [plan[-1][2][0] + args[0]])
+            continue
+        if plan and adjacent and op in ('m', 'c', 'd') and plan[-1][1] == 'm':
+            delay = plan[-1][0] if collapse else plan[-1][0] + delay
+            plan.pop()
+        plan.append((delay, op, list(args)))
+    return [(delay / speed, op, args) for delay, op, args in plan]
+
+
+def parse_play_options(args: list) -> tuple:
+    """
+    Параметри відтворення з аргументів команди: raw - записані паузи як є
+    (для програм, яким потрібен час завантажитись між кроками), x2 / 2 / 0.5 - швидкість
+    
+    Returns:
+        tuple: (speed, collapse)
+    
+    Raises:
+        ValueError: невідомий аргумент
+    """
+    speed, collapse = 1.0, True
+    for arg in args:
+        if arg.lower() == 'raw':
+            collapse = False
+        else:
+            speed = float(arg.lower().lstrip('x'))
+            if speed <= 0:
+                raise ValueError(f"Invalid macro speed: {arg}")
+    return speed, collapse
+
+
+class MacroStore:
+    """Іменовані макроси в одному компактному JSON файлі"""
+    
+    def __init__(self, path: str = MACROS_FILE):
+        self.path = path
+        self._lock = threading.Lock()
+        self._macros = self._load()
+    
+    def _load(self) -> dict:
+        try:
+            if os.path.exists(self.path):
+                with open(self.path, 'r', encoding='utf-8') as f:
+                    return json.load(f)
+        except Exception as e:
+            logger.error(f"Error loading macros: {e}")
+        return {}
+    
+    def _save(self):
+        """Записує макроси на диск (викликається під self._lock)"""
+        os.makedirs(os.path.dirname(self.path) or '.', exist_ok=True)
+        tmp_path = self.path + '.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(self._macros, f, ensure_ascii=False, separators=(',', ':'))
+        os.replace(tmp_path, self.path)
+    
+    def save(self, name: str, steps: list):
+        with self._lock:
+            self._macros[name] = {'created': int(time.time()), 'steps': steps}
+            self._save()
+    
+    def get(self, name: str) -> list:
+        """Кроки макросу або None"""
+        with self._lock:
+            macro = self._macros.get(name)
+            return list(macro['steps']) if macro else None
+    
+    def delete(self, name: str) -> bool:
+        with self._lock:
+            if self._macros.pop(name, None) is None:
+                return False
+            self._save()
+            return True
+    
+    def list(self) -> dict:
+        """{назва: кількість кроків}"""
+        with self._lock:
+            return {name: len(macro['steps']) for name, macro in sorted(self._macros.items())}
+
+
+class MacroManager:
+    """Запис, збереження та відтворення макросів"""
+    
+    def __init__(self, store: MacroStore = None, gap: float = 0.05):
+        self.store = store or MacroStore()
+        self.gap = gap
+        self.recorder = None
+        self._lock = threading.Lock()
+    
+    def start(self, name: str):
+        """Починає запис макросу name"""
+        if not MACRO_NAME.match(name):
+            raise ValueError(f"Invalid macro name: {name}")
+        with self._lock:
+            if self.recorder is not None:
+                raise RuntimeError(f"Already recording macro: {self.recorder.macro}")
+            self.recorder = MacroRecorder(get_input_backend(), name)
+            set_input_backend(self.recorder)
+        logger.info(f"Macro recording started: {name}")
+    
+    def _detach(self) -> MacroRecorder:
+        with self._lock:
+            recorder, self.recorder = self.recorder, None
+            if recorder is not None:
+                set_input_backend(recorder.inner)
+            return recorder
+    
+    def stop(self) -> tuple:
+        """
+        Завершує запис і зберігає макрос
+        
+        Returns:
+            tuple: (назва, кількість кроків) або (None, 0), якщо запису не було
+        """
+        recorder = self._detach()
+        if recorder is None:
+            return None, 0
+        self.store.save(recorder.macro, recorder.steps)
+        logger.info(f"Macro saved: {recorder.macro} ({len(recorder.steps)} steps)")
+        return recorder.macro, len(recorder.steps)
+    
+    def cancel(self) -> bool:
+        """Скасовує запис без збереження"""
+        return self._detach() is not None
+    
+    def record_wait(self, seconds: float):
+        """Записує явне очікування (команди wait бота, Mini App, REPL)"""
+        recorder = self.recorder
+        if recorder is not None:
+            recorder.add('w', seconds)
+    
+    def play(self, name: str, speed: float = 1.0, collapse: bool = True) -> dict:
+        """
+        Відтворює макрос (блокує - викликати в потоці InputActuator)
+        
+        Returns:
+            dict: {'name', 'steps', 'actions', 'seconds'}
+        """
+        steps = self.store.get(name)
+        if steps is None:
+            raise KeyError(f"Macro not found: {name}")
+        if self.recorder is not None:
+            raise RuntimeError("Cannot play a macro while recording")
+        plan = compile_macro(steps, speed=speed, collapse=collapse, gap=self.gap)
+        
+        backend = get_input_backend()
+        start = time.perf_counter()
+        # Дії без паузи між ними - одним пакетом (xdotool: один процес)
+        with backend.batch():
+            for delay, op, args in plan:
+                if delay > 0:
+                    # Накопичені події мають відбутися до паузи, а не після неї
+                    backend.flush()
+                    time.sleep(delay)
+                if op == 'c':
+                    x, y, *rest = args
+                    backend.click(x, y, *rest)
+                elif op == 'm':
+                    backend.move(*args)
+                elif op == 'd':
+                    x1, y1, x2, y2, *rest = args
+                    backend.drag(x1, y1, x2, y2, duration=(rest[0] if rest else 0.5) / max(speed, 0.01))
+                elif op == 'k':
+                    backend.press(args[0])
+                elif op == 'h':
+                    backend.hotkey(*args)
+                elif op == 't':
+                    get_text_entry().enter(args[0])
+        seconds = time.perf_counter() - start
+        
+        logger.info(f"Macro played: {name} ({len(steps)} steps -> {len(plan)} actions in {seconds:.2f}s)")
+        return {'name': name, 'steps': len(steps), 'actions': len(plan), 'seconds': round(seconds, 3)}
+    
+    def format_list(self) -> str:
+        """Список макросів для повідомлення"""
+        macros = self.store.list()
+        if not macros:
+            return "📭 Макросів немає"
+        lines = [f"• {name} - {count} кроків" for name, count in macros.items()]
+        if self.recorder is not None:
+            lines.append(f"\n⏺ Йде запис: {self.recorder.macro} ({len(self.recorder.steps)} кроків)")
+        return "🎬 Макроси:\n" + "\n".join(lines)
+
+
+_macro_manager = None
+_macro_manager_lock = threading.Lock()
+
+
+def get_macro_manager() -> MacroManager:
+    """Спільний MacroManager (MACRO_GAP - пауза між діями при відтворенні)"""
+    global _macro_manager
+    with _macro_manager_lock:
+        if _macro_manager is None:
+            _macro_manager = MacroManager(gap=float(os.getenv('MACRO_GAP', '0.05')))
+        return _macro_manager
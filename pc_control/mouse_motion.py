@@ -0,0 +1,261 @@
+import logging
+import os
+import threading
+import time
+from collections import deque
+
+from pc_control.actuator import get_input_actuator
+from pc_control.input_backends import get_input_backend
+
+logger = logging.getLogger(__name__)
+
+
+class MouseMotion:
+    """
+    Злиття рухів миші та безперервний рух (джойстик)
+    
+    Відносні зсуви (шорткати mouse_*, кнопки Mini App) не виконуються кожен
+    окремо: вони додаються до однієї цілі, а окремий потік застосовує її
+    не частіше ніж rate разів на секунду. Швидкі натискання, що прийшли поки
+    попередній рух ще в черзі, зливаються в один moveTo, а не відтворюються
+    по одному після того, як користувач уже зупинився.
+    
+    Позиція курсора читається один раз на початку серії рухів; далі ціль
+    рахується від останньої застосованої позиції.
+    
+    Запити лише запам'ятовуються, тому дія в позиції курсора (клік після
+    зсуву) спершу викликає flush()/drain() - інакше вона випередить рух.
+    Незастосовані запити забираються і застосовуються всередині дії черги
+    InputActuator, тож flush у самій черзі виконується на місці, а не чекає
+    потік руху.
+    
+    Межі затримки:
+    - запит застосовується не пізніше ніж через 1/rate після попереднього
+      руху (плюс час дій, що вже стоять у черзі InputActuator);
+    - команда джойстика діє ttl секунд - якщо нова не прийшла (зв'язок
+      обірвався, 'stop' загубився), рух зупиняється сам;
+    - за один крок джойстик інтегрує не більше max_step секунд, тож затримка
+      черги не перетворюється на стрибок курсора.
+    """
+    
+    def __init__(self, rate: float = 60.0, max_speed: float = 3000.0, ttl: float = 0.3, max_step: float = 0.1):
+        """
+        Args:
+            rate: Максимум рухів на секунду
+            max_speed: Максимальна швидкість джойстика (пікселів на секунду)
+            ttl: Скільки секунд діє одна команда джойстика
+            max_step: Максимальний інтервал інтегрування за крок (секунди)
+        """
+        self.interval = 1.0 / rate
+        self.max_speed = max_speed
+        self.ttl = ttl
+        self.max_step = max_step
+        self._cond = threading.Condition()
+        self._thread = None
+        self._running = False
+        # Незастосовані запити: абсолютна ціль і сумарний відносний зсув
+        self._absolute = None
+        self._offset = (0.0, 0.0)
+        self._pending_since = None
+        self._pending_count = 0
+        # Джойстик: швидкість (пікс/с) і до якого часу вона діє
+        self._velocity = (0.0, 0.0)
+        self._velocity_until = 0.0
+        # Стан серії рухів (None - прочитати з бекенда); _series змінюється в кінці
+        # серії, щоб _tick, що почався раніше, не записав старий курсор назад
+        self._cursor = None
+        self._screen = None
+        self._series = 0
+        self._last_apply = 0.0
+        self._last_tick = None
+        self._latencies = deque(maxlen=256)
+        self.stats = {'requests': 0, 'applied': 0, 'coalesced': 0}
+    
+    def _ensure_thread(self):
+        if self._thread is None or not self._thread.is_alive():
+            self._running = True
+            self._thread = threading.Thread(target=self._worker, name='mouse-motion', daemon=True)
+            self._thread.start()
+    
+    def _request(self):
+        """Фіксує новий запит і будить потік (викликається під self._cond)"""
+        self.stats['requests'] += 1
+        self._pending_count += 1
+        if self._pending_since is None:
+            self._pending_since = time.perf_counter()
+        self._ensure_thread()
+        self._cond.notify()
+    
+    def nudge(self, dx: float, dy: float):
+        """Відносний зсув - додається до вже запланованого руху"""
+        with self._cond:
+            self._offset = (self._offset[0] + dx, self._offset[1] + dy)
+            self._request()
+    
+    def move_to(self, x: float, y: float):
+        """Абсолютна ціль - скасовує незастосовані зсуви"""
+        with self._cond:
+            self._absolute = (float(x), float(y))
+            self._offset = (0.0, 0.0)
+            self._request()
+    
+    def center(self):
+        """Курсор у центр основного екрану"""
+        with self._cond:
+            self._absolute = 'center'
+            self._offset = (0.0, 0.0)
+            self._request()
+    
+    def set_velocity(self, vx: float, vy: float):
+        """
+        Безперервний рух (джойстик), пікселів на секунду
+        
+        Команду треба повторювати частіше, ніж раз на ttl секунд, інакше рух
+        зупиниться. (0, 0) - зупинка.
+        """
+        limit = self.max_speed
+        vx, vy = max(-limit, min(limit, float(vx))), max(-limit, min(limit, float(vy)))
+        with self._cond:
+            self.stats['requests'] += 1
+            self._velocity = (vx, vy)
+            self._velocity_until = time.perf_counter() + self.ttl if (vx or vy) else 0.0
+            if vx or vy:
+                self._ensure_thread()
+                self._cond.notify()
+    
+    def stop_motion(self):
+        """Зупиняє джойстик"""
+        self.set_velocity(0, 0)
+    
+    def _moving(self, now: float) -> bool:
+        return now < self._velocity_until
+    
+    def _tick(self):
+        """Застосовує незастосовані запити і крок джойстика (виконується в потоці InputActuator)"""
+        with self._cond:
+            now = time.perf_counter()
+            absolute, offset = self._absolute, self._offset
+            pending_since, pending_count = self._pending_since, self._pending_count
+            velocity = self._velocity if self._moving(now) else (0.0, 0.0)
+            self._absolute, self._offset = None, (0.0, 0.0)
+            self._pending_since, self._pending_count = None, 0
+            cursor, screen, last_tick, series = self._cursor, self._screen, self._last_tick, self._series
+        if not pending_count and velocity == (0.0, 0.0):
+            return
+        
+        backend = get_input_backend()
+        try:
+            if cursor is None:
+                position, screen = backend.position(), backend.size()
+                cursor = (float(position[0]), float(position[1]))
+            width, height = screen
+            
+            if absolute == 'center':
+                x, y = width / 2, height / 2
+            elif absolute is not None:
+                x, y = absolute
+            else:
+                x, y = cursor
+            x, y = x + offset[0], y + offset[1]
+            
+            tick = time.perf_counter()
+            if velocity != (0.0, 0.0) and last_tick is not None:
+                step = min(tick - last_tick, self.max_step)
+                x, y = x + velocity[0] * step, y + velocity[1] * step
+            
+            x, y = max(0.0, min(width - 1.0, x)), max(0.0, min(height - 1.0, y))
+            if (int(x), int(y)) != (int(cursor[0]), int(cursor[1])) or absolute is not None:
+                backend.move(int(x), int(y))
+                self.stats['applied'] += 1
+                self.stats['coalesced'] += max(0, pending_count - 1)
+            # Дробова частина зберігається - повільний джойстик теж рухається
+            with self._cond:
+                if self._series == series:
+                    self._cursor, self._screen, self._last_tick = (x, y), screen, tick
+            if pending_since is not None:
+                self._latencies.append(time.perf_counter() - pending_since)
+        except Exception as e:
+            logger.error(f"Mouse motion error: {e}")
+            with self._cond:
+                self._cursor = None
+        finally:
+            self._last_apply = time.perf_counter()
+    
+    def flush(self):
+        """
+        Застосовує незастосовані рухи одразу, не чекаючи обмеження частоти
+        
+        Блокує, поки курсор не переміститься; у потоці InputActuator
+        виконується на місці.
+        """
+        get_input_actuator().call(self._tick)
+    
+    async def drain(self):
+        """flush() для async коду - чекає, не блокуючи event loop"""
+        await get_input_actuator().run(self._tick)
+    
+    def _worker(self):
+        actuator = get_input_actuator()
+        while True:
+            with self._cond:
+                while self._running and not self._pending_count and not self._moving(time.perf_counter()):
+                    # Серія завершилась - курсор могли перемістити інші дії
+                    self._series += 1
+                    self._cursor = None
+                    self._last_tick = None
+                    self._cond.wait()
+                if not self._running:
+                    break
+                
+                wait = self._last_apply + self.interval - time.perf_counter()
+                if wait > 0:
+                    # Обмеження частоти: запити, що прийдуть за цей час, зіллються
+                    self._cond.wait(wait)
+                    continue
+            
+            try:
+                actuator.call(self._tick)
+            except Exception as e:
+                logger.error(f"Mouse motion error: {e}")
+            finally:
+                self._last_apply = time.perf_counter()
+    
+    def get_status(self) -> dict:
+        """
+        Returns:
+            dict: {'requests', 'applied', 'coalesced', 'latency_ms', 'latency_p95_ms', 'moving'}
+        """
+        latencies = sorted(self._latencies)
+        return {
+            **self.stats,
+            'latency_ms': sum(latencies) / len(latencies) * 1000 if latencies else 0.0,
+            'latency_p95_ms': latencies[min(len(latencies) - 1, int(0.95 * len(latencies)))] * 1000 if latencies else 0.0,
+            'moving': self._moving(time.perf_counter()),
+        }
+    
+    def stop(self):
+        """Зупиняє потік"""
+        with self._cond:
+            self._running = False
+            self._velocity_until = 0.0
+            self._cond.notify()
+        if self._thread is not None:
+            self._thread.join(timeout=5)
+        self._thread = None
+
+
+_mouse_motion = None
+_mouse_motion_lock = threading.Lock()
+
+
+def get_mouse_motion() -> MouseMotion:
+    """Спільний MouseMotion (MOUSE_RATE, MOUSE_MAX_SPEED, MOUSE_JOYSTICK_TTL)"""
+    global _mouse_motion
+    with _mouse_motion_lock:
+        if _mouse_motion is None:
+            _mouse_motion = MouseMotion(
+                rate=float(os.getenv('MOUSE_RATE', '60')),
+                max_speed=float(os.getenv('MOUSE_MAX_SPEED', '3000')),
+                ttl=float(os.getenv('MOUSE_JOYSTICK_TTL', '0.3')),
+            )
+        return _mouse_motion
@@ -0,0 +1,612 @@
+import functools
+import logging
+import os
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor
+
+import cv2
+import numpy as np
+
+from pc_control.frame_store import exact_hash
+from pc_control.ocr_backends import OCR_FIELDS, OcrBackend, PytesseractBackend, create_ocr_backend
+
+logger = logging.getLogger(__name__)
+
+# Плитки, нижчі за це, не мають сенсу - розбиваємо лише великі кадри
+MIN_TILE_HEIGHT = 240
+
+# Якщо текстові області займають більшу частку кадру - префільтр не дає виграшу
+PREFILTER_MAX_COVERAGE = 0.6
+
+# Відступ між областями в колажі для OCR (пікселів)
+COLLAGE_GAP = 16
+
+
+def split_tiles(shape: tuple, rows: int, cols: int = 1, overlap: int = 64) -> list:
+    """
+    Розбиває кадр на плитки з перекриттям
+    
+    Кожна плитка "володіє" своєю коміркою (core) - слово з центром у чужій
+    комірці відкидається при злитті, тож дублікати з зон перекриття зникають.
+    
+    Returns:
+        list: [{'bbox': (left, top, right, bottom), 'core': (left, top, right, bottom)}, ...]
+    """
+    height, width = shape[:2]
+    ys = [round(i * height / rows) for i in range(rows + 1)]
+    xs = [round(i * width / cols) for i in range(cols + 1)]
+    tiles = []
+    for row in range(rows):
+        for col in range(cols):
+            core = (xs[col], ys[row], xs[col + 1], ys[row + 1])
+            bbox = (
+                max(0, core[0] - overlap),
+                max(0, core[1] - overlap),
+                min(width, core[2] + overlap),
+                min(height, core[3] + overlap),
+            )
+            tiles.append({'bbox': bbox, 'core': core})
+    return tiles
+
+
+def merge_tile_data(results: list) -> dict:
+    """
+    Зливає результати OCR плиток в один результат image_to_data
+    
+    Args:
+        results: [(плитка з split_tiles(), dict image_to_data плитки), ...]
+    
+    Returns:
+        dict: Слова в координатах кадру; block_num унікальний для кожної плитки
+    """
+    merged = {field: [] for field in OCR_FIELDS}
+    for index, (tile, data) in enumerate(results):
+        x0, y0 = tile['bbox'][:2]
+        core_left, core_top, core_right, core_bottom = tile['core']
+        for i, text in enumerate(data['text']):
+            if not str(text).strip():
+                continue
+            left = x0 + int(data['left'][i])
+            top = y0 + int(data['top'][i])
+            center_x = left + int(data['width'][i]) // 2
+            center_y = top + int(data['height'][i]) // 2
+            # Слово з зони перекриття належить сусідній плитці
+            if not (core_left <= center_x < core_right and core_top <= center_y < core_bottom):
+                continue
+            for field in OCR_FIELDS:
+                merged[field].append(data[field][i] if field in data else 0)
+            merged['left'][-1] = left
+            merged['top'][-1] = top
+            merged['block_num'][-1] = (index + 1) * 100000 + int(merged['block_num'][-1])
+    return merged
+
+
+def detect_text_regions(gray: np.ndarray, pad_x: int = 6, pad_y: int = 2, join: int = 24,
+                        min_height: int = 6, max_height: int = 80) -> list:
+    """
+    Дешевий пошук областей з текстом (без OCR)
+    
+    Морфологічний градієнт виділяє контури символів, горизонтальне закриття
+    зливає символи в слова й рядки, а зв'язні компоненти з висотою рядка
+    тексту стають кандидатами. Перекриті після відступу області об'єднуються.
+    
+    Args:
+        gray: Сірий кадр
+        pad_x: Відступ області по горизонталі
+        pad_y: Відступ по вертикалі (малий - щоб сусідні рядки не злипались в один блок)
+        join: Максимальний проміжок між символами одного рядка
+        min_height: Мінімальна висота рядка тексту
+        max_height: Максимальна висота рядка тексту
+    
+    Returns:
+        list: [(left, top, right, bottom), ...] зверху вниз
+    """
+    height, width = gray.shape[:2]
+    gradient = cv2.morphologyEx(gray, cv2.MORPH_GRADIENT, cv2.getStructuringElement(cv2.MORPH_ELLIPSE, (3, 3)))
+    _, binary = cv2.threshold(gradient, 0, 255, cv2.THRESH_BINARY | cv2.THRESH_OTSU)
+    binary = cv2.morphologyEx(binary, cv2.MORPH_CLOSE, cv2.getStructuringElement(cv2.MORPH_RECT, (join, 1)))
+    
+    _, _, stats, _ = cv2.connectedComponentsWithStats(binary, connectivity=8)
+    mask = np.zeros((height, width), dtype=np.uint8)
+    for x, y, w, h, area in stats[1:]:
+        # Рядок тексту: обмежена висота і достатньо щільний
+        if not min_height <= h <= max_height or w < min_height or area < 0.2 * w * h:
+            continue
+        mask[max(0, y - pad_y):y + h + pad_y, max(0, x - pad_x):x + w + pad_x] = 255
+    
+    # Об'єднуємо області, що перекрились після відступу
+    _, _, stats, _ = cv2.connectedComponentsWithStats(mask, connectivity=4)
+    regions = [(int(x), int(y), int(x + w), int(y + h)) for x, y, w, h, _ in stats[1:]]
+    regions.sort(key=lambda r: (r[1], r[0]))
+    return regions
+
+
+def pack_regions(gray: np.ndarray, regions: list, gap: int = COLLAGE_GAP) -> tuple:
+    """
+    Складає області в один компактний колаж (полицями) для одного виклику OCR
+    
+    Між областями на полиці - gap (окремі слова для Tesseract), між полицями - gap / 2.
+    
+    Returns:
+        (колаж, [(x, y, область), ...]) - розміщення кожної області в колажі
+    """
+    width = max(gray.shape[1], max(r[2] - r[0] for r in regions) + 2 * gap)
+    placements = []
+    x, y = gap, gap // 2
+    shelf_height = 0
+    # Області однакової висоти на одній полиці - менше порожнього місця
+    for region in sorted(regions, key=lambda r: (r[3] - r[1], r[0])):
+        w, h = region[2] - region[0], region[3] - region[1]
+        if x + w + gap > width:
+            x = gap
+            y += shelf_height + gap // 2
+            shelf_height = 0
+        placements.append((x, y, region))
+        x += w + gap
+        shelf_height = max(shelf_height, h)
+    
+    background = int(np.median(gray))
+    collage = np.full((y + shelf_height + gap // 2, width), background, dtype=np.uint8)
+    for x, y, (left, top, right, bottom) in placements:
+        collage[y:y + bottom - top, x:x + right - left] = gray[top:bottom, left:right]
+    return collage, placements
+
+
+def map_collage_data(data: dict, placements: list) -> dict:
+    """
+    Переводить результат OCR колажу в координати кадру
+    
+    Кожна область отримує власні block_num, тож слова з сусідніх на полиці
+    областей не склеюються в один рядок TextIndex.
+    """
+    mapped = {field: [] for field in OCR_FIELDS}
+    for i, text in enumerate(data['text']):
+        if not str(text).strip():
+            continue
+        center_x = int(data['left'][i]) + int(data['width'][i]) // 2
+        center_y = int(data['top'][i]) + int(data['height'][i]) // 2
+        for index, (x, y, (left, top, right, bottom)) in enumerate(placements):
+            if x <= center_x < x + right - left and y <= center_y < y + bottom - top:
+                break
+        else:
+            continue
+        for field in OCR_FIELDS:
+            mapped[field].append(data[field][i] if field in data else 0)
+        mapped['left'][-1] = left + int(data['left'][i]) - x
+        mapped['top'][-1] = top + int(data['top'][i]) - y
+        mapped['block_num'][-1] = (index + 1) * 100 + int(mapped['block_num'][-1])
+    return mapped
+
+
+def ocr_text_regions(gray: np.ndarray, ocr=None) -> dict:
+    """
+    OCR лише областей з текстом (префільтр OpenCV + один виклик на колаж)
+    
+    Якщо тексту на кадрі багато - виконується звичайний OCR всього кадру.
+    
+    Args:
+        gray: Сірий кадр
+        ocr: Функція OCR (OcrBackend.image_to_data), за замовчуванням - pytesseract
+    """
+    ocr = ocr or PytesseractBackend().image_to_data
+    regions = detect_text_regions(gray)
+    if not regions:
+        return {field: [] for field in OCR_FIELDS}
+    
+    coverage = sum((r[2] - r[0]) * (r[3] - r[1]) for r in regions) / (gray.shape[0] * gray.shape[1])
+    if coverage > PREFILTER_MAX_COVERAGE:
+        return ocr(gray)
+    
+    collage, placements = pack_regions(gray, regions)
+    return map_collage_data(ocr(collage), placements)
+
+
+def frame_fingerprint(image: np.ndarray) -> str:
+    """Швидкий відбиток зображення (пікселі + розмір) для ключа кешу"""
+    return f"{exact_hash(image)}:{image.shape[1]}x{image.shape[0]}"
+
+
+def normalize_text(text: str) -> str:
+    """Нижній регістр і один пробіл між словами"""
+    return ' '.join(text.lower().split())
+
+
+def edit_distance(a: str, b: str) -> int:
+    """Відстань Левенштейна"""
+    if len(a) < len(b):
+        a, b = b, a
+    previous = list(range(len(b) + 1))
+    for i, char_a in enumerate(a, start=1):
+        current = [i]
+        for j, char_b in enumerate(b, start=1):
+            current.append(min(
+                previous[j] + 1,
+                current[j - 1] + 1,
+                previous[j - 1] + (char_a != char_b),
+            ))
+        previous = current
+    return previous[-1]
+
+
+def similarity(a: str, b: str) -> float:
+    """Схожість рядків 0..1 за відстанню редагування"""
+    if not a and not b:
+        return 1.0
+    return 1 - edit_distance(a, b) / max(len(a), len(b))
+
+
+class TextIndex:
+    """
+    Текстовий індекс одного кадру
+    
+    Будується з одного проходу Tesseract: слова групуються в рядки
+    (block/par/line), для кожного рядка відомі межі та впевненість.
+    Пошук фраз, префіксів і нечіткий пошук - без повторного OCR.
+    """
+    
+    # Бали за тип збігу (для ранжування)
+    SCORE_EXACT = 1.0
+    SCORE_PREFIX = 0.9
+    SCORE_CONTAINS = 0.85
+    SCORE_FUZZY = 0.8
+    
+    def __init__(self, data: dict):
+        self.data = data
+        self.lines = OrderedDict()
+        
+        for i, text in enumerate(data.get('text', [])):
+            text = (text or '').strip()
+            if not text:
+                continue
+            left, top = int(data['left'][i]), int(data['top'][i])
+            word = {
+                'text': text,
+                'norm': text.lower(),
+                'bbox': (left, top, left + int(data['width'][i]), top + int(data['height'][i])),
+                'conf': float(data['conf'][i]) if 'conf' in data else -1.0,
+            }
+            key = tuple(int(data[k][i]) if k in data else 0 for k in ('block_num', 'par_num', 'line_num'))
+            self.lines.setdefault(key, []).append(word)
+    
+    @property
+    def words(self) -> list:
+        return [word for line in self.lines.values() for word in line]
+    
+    @property
+    def text(self) -> str:
+        """Весь розпізнаний текст, рядок за рядком"""
+        return '\n'.join(' '.join(w['text'] for w in line) for line in self.lines.values())
+    
+    @property
+    def blocks(self) -> dict:
+        """Текст по блоках Tesseract: {block_num: текст}"""
+        blocks = OrderedDict()
+        for (block, _, _), line in self.lines.items():
+            blocks.setdefault(block, []).append(' '.join(w['text'] for w in line))
+        return {block: '\n'.join(lines) for block, lines in blocks.items()}
+    
+    def _score(self, query: str, candidate: str, min_similarity: float) -> float:
+        """Бал збігу запиту з кандидатом (0 - не збігається)"""
+        if candidate == query:
+            return self.SCORE_EXACT
+        if candidate.startswith(query):
+            return self.SCORE_PREFIX
+        if query in candidate:
+            return self.SCORE_CONTAINS
+        ratio = similarity(query, candidate)
+        if ratio >= min_similarity:
+            return self.SCORE_FUZZY * ratio
+        return 0.0
+    
+    def find(self, query: str, min_similarity: float = 0.75, limit: int = 5, origin: tuple = (0, 0)) -> list:
+        """
+        Шукає фразу в кадрі
+        
+        Фраза з N слів порівнюється з кожною послідовністю з N слів рядка:
+        точний збіг, префікс, входження або нечіткий збіг (Левенштейн).
+        
+        Args:
+            query: Текст для пошуку (напр. "Accept All")
+            min_similarity: Мінімальна схожість для нечіткого збігу (0..1)
+            limit: Максимум кандидатів
+            origin: Зміщення кадру в глобальних координатах екрану
+        
+        Returns:
+            list: [{'text', 'bbox', 'center', 'score', 'conf'}, ...] від найкращого
+        """
+        query = normalize_text(query)
+        if not query:
+            return []
+        size = len(query.split())
+        left0, top0 = origin
+        
+        candidates = []
+        for line in self.lines.values():
+            for start in range(max(1, len(line) - size + 1)):
+                window = line[start:start + size]
+                score = self._score(query, ' '.join(w['norm'] for w in window), min_similarity)
+                if not score:
+                    continue
+                left = left0 + min(w['bbox'][0] for w in window)
+                top = top0 + min(w['bbox'][1] for w in window)
+                right = left0 + max(w['bbox'][2] for w in window)
+                bottom = top0 + max(w['bbox'][3] for w in window)
+                candidates.append({
+                    'text': ' '.join(w['text'] for w in window),
+                    'bbox': (left, top, right, bottom),
+                    'center': ((left + right) // 2, (top + bottom) // 2),
+                    'score': round(score, 3),
+                    'conf': min(w['conf'] for w in window),
+                })
+        
+        candidates.sort(key=lambda c: (c['score'], c['conf']), reverse=True)
+        return candidates[:limit]
+
+
+class OcrCache:
+    """
+    Кеш результатів OCR (TextIndex) з TTL та LRU витісненням
+    
+    Результати спільні для всіх, хто їх отримав - не змінюйте їх.
+    """
+    
+    def __init__(self, max_items: int = 16, ttl: float = 30.0):
+        self.max_items = max_items
+        self.ttl = ttl
+        self._items = OrderedDict()
+        self._lock = threading.Lock()
+    
+    def get(self, key: str):
+        """Результат за ключем або None (відсутній чи застарів)"""
+        with self._lock:
+            item = self._items.get(key)
+            if item is None:
+                return None
+            stored, value = item
+            if self.ttl and time.monotonic() - stored > self.ttl:
+                del self._items[key]
+                return None
+            self._items.move_to_end(key)
+            return value
+    
+    def put(self, key: str, value):
+        """Зберігає результат"""
+        with self._lock:
+            self._items[key] = (time.monotonic(), value)
+            self._items.move_to_end(key)
+            while len(self._items) > self.max_items:
+                self._items.popitem(last=False)
+    
+    def clear(self):
+        """Очищає кеш"""
+        with self._lock:
+            self._items.clear()
+    
+    def __len__(self):
+        return len(self._items)
+
+
+class OcrEngine:
+    """
+    OCR з кешем за відбитком кадру
+    
+    Однаковий кадр (або область) не розпізнається повторно: результат
+    береться з кешу, а одночасні запити на той самий кадр чекають
+    один прохід Tesseract.
+    
+    Великий кадр розбивається на горизонтальні смуги з перекриттям, які
+    розпізнаються паралельно (workers > 1). З prefilter кожна смуга
+    розпізнається лише в областях, схожих на текст. В інкрементальному режимі
+    результати смуг запам'ятовуються, і повторно розпізнаються лише смуги,
+    пікселі яких змінились.
+    """
+    
+    # Скільки останніх розмірів кадру (екран, області) пам'ятати для інкрементального OCR
+    MAX_TILE_STATES = 4
+    
+    def __init__(self, cache: OcrCache = None, workers: int = 1, overlap: int = 64, incremental: bool = False,
+                 prefilter: bool = False, backend: OcrBackend = None):
+        self.cache = cache or OcrCache()
+        self.workers = max(1, workers)
+        self.overlap = overlap
+        self.incremental = incremental
+        self.backend = backend or PytesseractBackend()
+        # OCR лише знайдених OpenCV текстових областей (див. ocr_text_regions)
+        if prefilter:
+            self._ocr = functools.partial(ocr_text_regions, ocr=self.backend.image_to_data)
+        else:
+            self._ocr = self.backend.image_to_data
+        self._pool = None
+        self._lock = threading.Lock()
+        self._inflight = {}
+        # Розмір кадру -> {'hashes': [...], 'results': [...]} останнього проходу плитками
+        self._tile_states = OrderedDict()
+        self.stats = {
+            'runs': 0, 'tiled_runs': 0, 'hits': 0, 'shared': 0, 'ocr_seconds': 0.0,
+            'tiles_ocr': 0, 'tiles_reused': 0,
+        }
+    
+    def _get_pool(self) -> ThreadPoolExecutor:
+        """
+        Пул для плиток
+        
+        pytesseract запускає окремий процес, а tesserocr відпускає GIL під час
+        розпізнавання, тому потоки дають справжній паралелізм на ядрах без
+        копіювання плиток між процесами.
+        """
+        with self._lock:
+            if self._pool is None:
+                self._pool = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix='ocr-tile')
+            return self._pool
+    
+    def _run_tiled(self, gray: np.ndarray, tiles: list) -> tuple[dict, int]:
+        """
+        OCR плиток паралельно і злиття результатів
+        
+        Returns:
+            (результат image_to_data, кількість плиток, взятих з попереднього проходу)
+        """
+        crops = [np.ascontiguousarray(gray[top:bottom, left:right])
+                 for left, top, right, bottom in (tile['bbox'] for tile in tiles)]
+        results = [None] * len(tiles)
+        
+        if self.incremental:
+            # Плитка з тими самими пікселями (включно з перекриттям) дає той самий текст
+            hashes = [exact_hash(crop) for crop in crops]
+            with self._lock:
+                previous = self._tile_states.get(gray.shape)
+            if previous is not None:
+                for i, tile_hash in enumerate(hashes):
+                    if previous['hashes'][i] == tile_hash:
+                        results[i] = previous['results'][i]
+        
+        pending = [i for i, result in enumerate(results) if result is None]
+        if len(pending) == 1:
+            results[pending[0]] = self._ocr(crops[pending[0]])
+        elif pending:
+            pool = self._get_pool()
+            futures = {i: pool.submit(self._ocr, crops[i]) for i in pending}
+            for i, future in futures.items():
+                results[i] = future.result()
+        
+        if self.incremental:
+            with self._lock:
+                self._tile_states[gray.shape] = {'hashes': hashes, 'results': results}
+                self._tile_states.move_to_end(gray.shape)
+                while len(self._tile_states) > self.MAX_TILE_STATES:
+                    self._tile_states.popitem(last=False)
+        
+        self.stats['tiles_ocr'] += len(pending)
+        self.stats['tiles_reused'] += len(tiles) - len(pending)
+        return merge_tile_data(list(zip(tiles, results))), len(tiles) - len(pending)
+    
+    def _run(self, gray: np.ndarray) -> dict:
+        """Один прохід OCR (цілим кадром або плитками)"""
+        start = time.perf_counter()
+        # Інкрементальний режим ділить кадр на смуги незалежно від workers - від
+        # кількості смуг залежить, скільки з них можна взяти з попереднього проходу;
+        # workers обмежує лише паралельність
+        rows = gray.shape[0] // MIN_TILE_HEIGHT
+        if not self.incremental:
+            rows = min(self.workers, rows)
+        
+        if rows > 1:
+            tiles = split_tiles(gray.shape, rows, overlap=self.overlap)
+            result, reused = self._run_tiled(gray, tiles)
+            self.stats['tiled_runs'] += 1
+        else:
+            tiles = None
+            result = self._ocr(gray)
+        
+        elapsed = time.perf_counter() - start
+        self.stats['runs'] += 1
+        self.stats['ocr_seconds'] += elapsed
+        logger.info(
+            f"OCR pass: {gray.shape[1]}x{gray.shape[0]} in {elapsed:.2f} s"
+            + (f" ({len(tiles) - reused}/{len(tiles)} tiles)" if tiles else "")
+        )
+        return result
+    
+    def get_metrics(self) -> dict:
+        """Статистика кешу/плиток і затримки бекенда"""
+        return {**self.stats, **self.backend.metrics()}
+    
+    def shutdown(self):
+        """Зупиняє пул плиток і звільняє рушії бекенда"""
+        with self._lock:
+            if self._pool is not None:
+                self._pool.shutdown(wait=True)
+                self._pool = None
+        self.backend.close()
+    
+    def image_to_data(self, image: np.ndarray) -> dict:
+        """
+        Аналог pytesseract.image_to_data(..., output_type=DICT) з кешем
+        
+        Args:
+            image: Кадр BGR або вже сірий
+        
+        Returns:
+            dict: {'text', 'left', 'top', 'width', 'height', 'conf', ...}
+        """
+        return self.index(image).data
+    
+    def index(self, image: np.ndarray) -> TextIndex:
+        """
+        Текстовий індекс кадру (один прохід OCR на кадр, далі - з кешу)
+        
+        Args:
+            image: Кадр BGR або вже сірий
+        """
+        key = frame_fingerprint(image)
+        
+        result = self.cache.get(key)
+        if result is not None:
+            self.stats['hits'] += 1
+            logger.debug("OCR cache hit")
+            return result
+        
+        with self._lock:
+            future = self._inflight.get(key)
+            owner = future is None
+            if owner:
+                future = Future()
+                self._inflight[key] = future
+            else:
+                self.stats['shared'] += 1
+        
+        if not owner:
+            return future.result()
+        
+        try:
+            gray = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY) if image.ndim == 3 else image
+            result = TextIndex(self._run(gray))
+            self.cache.put(key, result)
+            future.set_result(result)
+            return result
+        
+        except Exception as e:
+            future.set_exception(e)
+            raise
+        
+        finally:
+            with self._lock:
+                self._inflight.pop(key, None)
+
+
+_ocr_engine = None
+_ocr_engine_lock = threading.Lock()
+
+
+def get_ocr_engine() -> OcrEngine:
+    """Спільний OcrEngine для ScreenCapture, ButtonFinder та Executor"""
+    global _ocr_engine
+    with _ocr_engine_lock:
+        if _ocr_engine is None:
+            # 0 - за кількістю ядер (не більше 8), 1 - без паралельних плиток. З OCR_INCREMENTAL
+            # кадр усе одно ділиться на смуги (щоб повторно брати незмінені), але при 1
+            # вони розпізнаються по черзі; один виклик на кадр - OCR_INCREMENTAL=false
+            workers = int(os.getenv('OCR_WORKERS', '0')) or min(os.cpu_count() or 1, 8)
+            cache = OcrCache(
+                max_items=int(os.getenv('OCR_CACHE_SIZE', '16')),
+                ttl=float(os.getenv('OCR_CACHE_TTL', '30')),
+            )
+            # Один рушій на кожну паралельну плитку; паралельність дають плитки -
+            # OpenMP всередині Tesseract лише заважає, тож один потік на рушій
+            backend = create_ocr_backend(
+                os.getenv('OCR_BACKEND', 'auto').lower(),
+                lang=os.getenv('OCR_LANG', 'eng'),
+                size=workers,
+                threads=1 if workers > 1 else None,
+            )
+            logger.info(f"OCR backend: {backend.name}")
+            _ocr_engine = OcrEngine(
+                cache,
+                workers=workers,
+                incremental=os.getenv('OCR_INCREMENTAL', 'true').lower() in ('1', 'true', 'yes'),
+                prefilter=os.getenv('OCR_PREFILTER', 'false').lower() in ('1', 'true', 'yes'),
+                backend=backend,
+            )
+        return _ocr_engine
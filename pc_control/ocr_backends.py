@@ -0,0 +1,194 @@
+import logging
+import os
+import queue
+import threading
+import time
+from collections import deque
+
+import numpy as np
+import pytesseract
+from PIL import Image
+
+logger = logging.getLogger(__name__)
+
+# Колонки результату pytesseract.image_to_data
+OCR_FIELDS = ('level', 'page_num', 'block_num', 'par_num', 'line_num', 'word_num',
+              'left', 'top', 'width', 'height', 'conf', 'text')
+
+
+class OcrBackend:
+    """
+    Базовий OCR бекенд
+    
+    image_to_data() повертає dict у форматі pytesseract.image_to_data(..., output_type=DICT)
+    і записує затримку кожного виклику.
+    """
+    
+    name = 'base'
+    
+    def __init__(self, lang: str = 'eng'):
+        self.lang = lang
+        self.calls = 0
+        self.errors = 0
+        self.latencies = deque(maxlen=256)
+        self._metrics_lock = threading.Lock()
+    
+    def _recognize(self, gray: np.ndarray) -> dict:
+        raise NotImplementedError
+    
+    def image_to_data(self, gray: np.ndarray) -> dict:
+        """Розпізнає сірий кадр"""
+        start = time.perf_counter()
+        try:
+            return self._recognize(gray)
+        except Exception:
+            with self._metrics_lock:
+                self.errors += 1
+            raise
+        finally:
+            elapsed = time.perf_counter() - start
+            with self._metrics_lock:
+                self.calls += 1
+                self.latencies.append(elapsed)
+    
+    def metrics(self) -> dict:
+        """
+        Затримки останніх викликів
+        
+        Returns:
+            dict: {'backend', 'calls', 'errors', 'avg_ms', 'p50_ms', 'p95_ms', 'last_ms'}
+        """
+        with self._metrics_lock:
+            latencies = sorted(self.latencies)
+            last = self.latencies[-1] if self.latencies else 0.0
+            calls, errors = self.calls, self.errors
+        
+        def percentile(p: float) -> float:
+            if not latencies:
+                return 0.0
+            return latencies[min(len(latencies) - 1, int(p * len(latencies)))] * 1000
+        
+        return {
+            'backend': self.name,
+            'calls': calls,
+            'errors': errors,
+            'avg_ms': sum(latencies) / len(latencies) * 1000 if latencies else 0.0,
+            'p50_ms': percentile(0.5),
+            'p95_ms': percentile(0.95),
+            'last_ms': last * 1000,
+        }
+    
+    def close(self):
+        """Звільняє ресурси бекенда"""
+
+
+class PytesseractBackend(OcrBackend):
+    """Запасний бекенд: новий процес tesseract на кожен виклик"""
+    
+    name = 'pytesseract'
+    
+    def _recognize(self, gray: np.ndarray) -> dict:
+        return pytesseract.image_to_data(gray, lang=self.lang, output_type=pytesseract.Output.DICT)
+
+
+class TesserocrBackend(OcrBackend):
+    """
+    Пул "теплих" рушіїв Tesseract у процесі (tesserocr)
+    
+    Кожен PyTessBaseAPI один раз завантажує traineddata і живе весь час роботи
+    бота - немає запуску процесу, тимчасових файлів і повторного читання моделей.
+    Рушій використовується одним потоком за раз; tesserocr відпускає GIL під час
+    розпізнавання, тож size рушіїв працюють паралельно.
+    """
+    
+    name = 'tesserocr'
+    
+    def __init__(self, lang: str = 'eng', size: int = 1):
+        super().__init__(lang)
+        import tesserocr
+        self._tesserocr = tesserocr
+        self._apis = []
+        self._pool = queue.Queue()
+        for _ in range(max(1, size)):
+            api = tesserocr.PyTessBaseAPI(lang=lang)
+            self._apis.append(api)
+            self._pool.put(api)
+        logger.info(f"Tesserocr pool ready: {len(self._apis)} engines ({lang})")
+    
+    def _recognize(self, gray: np.ndarray) -> dict:
+        api = self._pool.get()
+        try:
+            api.SetImage(Image.fromarray(gray))
+            api.Recognize()
+            return self._collect(api)
+        finally:
+            api.Clear()
+            self._pool.put(api)
+    
+    def _collect(self, api) -> dict:
+        """Слова з ResultIterator у форматі image_to_data"""
+        RIL = self._tesserocr.RIL
+        data = {field: [] for field in OCR_FIELDS}
+        iterator = api.GetIterator()
+        if iterator is None:
+            return data
+        
+        block = par = line = word = 0
+        while True:
+            if iterator.IsAtBeginningOf(RIL.BLOCK):
+                block, par, line = block + 1, 0, 0
+            if iterator.IsAtBeginningOf(RIL.PARA):
+                par, line = par + 1, 0
+            if iterator.IsAtBeginningOf(RIL.TEXTLINE):
+                line, word = line + 1, 0
+            word += 1
+            
+            box = iterator.BoundingBox(RIL.WORD)
+            text = iterator.GetUTF8Text(RIL.WORD)
+            if box and text:
+                left, top, right, bottom = box
+                for field, value in (
+                    ('level', 5), ('page_num', 1), ('block_num', block), ('par_num', par),
+                    ('line_num', line), ('word_num', word), ('left', left), ('top', top),
+                    ('width', right - left), ('height', bottom - top),
+                    ('conf', iterator.Confidence(RIL.WORD)), ('text', text),
+                ):
+                    data[field].append(value)
+            
+            if not iterator.Next(RIL.WORD):
+                break
+        return data
+    
+    def close(self):
+        for api in self._apis:
+            api.End()
+        self._apis = []
+
+
+def create_ocr_backend(name: str = 'auto', lang: str = 'eng', size: int = 1, threads: int = None) -> OcrBackend:
+    """
+    Створює OCR бекенд
+    
+    Args:
+        name: auto (tesserocr, якщо встановлений), tesserocr або pytesseract
+        lang: Мови Tesseract (напр. eng+ukr)
+        size: Скільки рушіїв тримати в пулі (для tesserocr)
+        threads: Потоків OpenMP на одне розпізнавання (OMP_THREAD_LIMIT). OpenMP
+                 читає його один раз на процес - при завантаженні tesserocr або
+                 запуску tesseract, тому задається тут, до створення рушіїв.
+                 Явно заданий у середовищі OMP_THREAD_LIMIT має пріоритет
+    """
+    if threads:
+        os.environ.setdefault('OMP_THREAD_LIMIT', str(threads))
+        logger.info(f"Tesseract OpenMP threads: {os.environ['OMP_THREAD_LIMIT']}")
+    
+    if name in ('auto', 'tesserocr'):
+        try:
+            return TesserocrBackend(lang=lang, size=size)
+        except ImportError:
+            if name == 'tesserocr':
+                logger.warning("tesserocr is not installed, falling back to pytesseract")
+        except Exception as e:
+            logger.warning(f"Tesserocr init error, falling back to pytesseract: {e}")
+    
+    return PytesseractBackend(lang=lang)
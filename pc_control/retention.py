@@ -0,0 +1,272 @@
+import json
+import logging
+import os
+import threading
+import time
+
+import cv2
+
+from pc_control.screen import IMAGE_EXTENSIONS, encode_frame
+
+logger = logging.getLogger(__name__)
+
+RETENTION_FILE = "data/screenshot_retention.json"
+
+# Налаштування за замовчуванням (0 - обмеження вимкнене)
+DEFAULT_SETTINGS = {
+    'max_age_days': 7,
+    'max_count': 500,
+    'max_size_mb': 1024,
+    'recompress_after_hours': 24,
+    'recompress_format': 'jpeg',
+    'recompress_quality': 80,
+    'interval_minutes': 10,
+}
+
+SETTING_DESCRIPTIONS = {
+    'max_age_days': 'Максимальний вік скріншота (днів)',
+    'max_count': 'Максимальна кількість файлів',
+    'max_size_mb': 'Максимальний розмір папки (МБ)',
+    'recompress_after_hours': 'Перестискати PNG старші за (годин)',
+    'recompress_format': 'Формат перестиснення (jpeg, webp)',
+    'recompress_quality': 'Якість перестиснення (1-100)',
+    'interval_minutes': 'Інтервал очищення (хвилин)',
+}
+
+IMAGE_FILE_EXTENSIONS = tuple(set(IMAGE_EXTENSIONS.values()))
+
+# Файли, змінені менше ніж стільки секунд тому, не чіпаємо - їх ще можуть писати
+MIN_FILE_AGE = 60
+
+
+class ScreenshotRetention:
+    """
+    Ротація та квота для папки screenshots/
+    
+    Працює у фоновому потоці і ніколи не виконується на шляху захоплення:
+    перестискає старі PNG, видаляє файли за віком, кількістю та сумарним розміром.
+    """
+    
+    def __init__(self, directory: str = "screenshots", settings_file: str = RETENTION_FILE):
+        self.directory = directory
+        self.settings_file = settings_file
+        self.settings = self.load_settings()
+        self.last_run = None
+        self.last_stats = {}
+        self._stop = threading.Event()
+        self._wake = threading.Event()
+        self._thread = None
+    
+    def load_settings(self) -> dict:
+        """Завантажує налаштування з JSON"""
+        settings = dict(DEFAULT_SETTINGS)
+        try:
+            if os.path.exists(self.settings_file):
+                with open(self.settings_file, 'r', encoding='utf-8') as f:
+                    settings.update(json.load(f))
+        except Exception as e:
+            logger.error(f"Error loading retention settings: {e}")
+        return settings
+    
+    def save_settings(self):
+        """Зберігає налаштування в JSON"""
+        try:
+            os.makedirs(os.path.dirname(self.settings_file), exist_ok=True)
+            with open(self.settings_file, 'w', encoding='utf-8') as f:
+                json.dump(self.settings, f, indent=2, ensure_ascii=False)
+        except Exception as e:
+            logger.error(f"Error saving retention settings: {e}")
+    
+    def update_setting(self, key: str, value: str) -> tuple[bool, str]:
+        """
+        Змінює налаштування
+        
+        Args:
+            key: Назва налаштування
+            value: Нове значення (рядок з команди бота)
+        
+        Returns:
+            (успіх, повідомлення)
+        """
+        if key not in DEFAULT_SETTINGS:
+            return False, f"❌ Невідоме налаштування: {key}"
+        
+        if key == 'recompress_format':
+            value = value.lower()
+            if value not in ('jpeg', 'webp'):
+                return False, "❌ Формат має бути jpeg або webp"
+        else:
+            try:
+                value = float(value) if '.' in value else int(value)
+            except ValueError:
+                return False, f"❌ Значення має бути числом: {value}"
+            if value < 0:
+                return False, "❌ Значення не може бути від'ємним"
+            if key == 'recompress_quality' and not 1 <= value <= 100:
+                return False, "❌ Якість має бути від 1 до 100"
+        
+        self.settings[key] = value
+        self.save_settings()
+        self._wake.set()
+        logger.info(f"Retention setting changed: {key}={value}")
+        return True, f"✅ {SETTING_DESCRIPTIONS[key]}: {value}"
+    
+    def _scan(self) -> list:
+        """Повертає [(шлях, mtime, розмір), ...] від найстаріших до найновіших"""
+        files = []
+        try:
+            with os.scandir(self.directory) as entries:
+                for entry in entries:
+                    if entry.is_file() and entry.name.lower().endswith(IMAGE_FILE_EXTENSIONS):
+                        stat = entry.stat()
+                        files.append((entry.path, stat.st_mtime, stat.st_size))
+        except FileNotFoundError:
+            return []
+        files.sort(key=lambda f: f[1])
+        return files
+    
+    def _recompress(self, path: str) -> int:
+        """Перестискає PNG у дешевший формат, повертає зекономлені байти"""
+        fmt = self.settings['recompress_format']
+        frame = cv2.imread(path)
+        if frame is None:
+            return 0
+        
+        data = encode_frame(frame, fmt=fmt, quality=int(self.settings['recompress_quality']))
+        old_size = os.path.getsize(path)
+        if len(data) >= old_size:
+            return 0
+        
+        new_path = os.path.splitext(path)[0] + IMAGE_EXTENSIONS[fmt]
+        mtime = os.path.getmtime(path)
+        with open(new_path, 'wb') as f:
+            f.write(data)
+        # Зберігаємо час створення, щоб вік рахувався від оригіналу
+        os.utime(new_path, (mtime, mtime))
+        os.remove(path)
+        return old_size - len(data)
+    
+    def run_once(self) -> dict:
+        """Одне проходження очищення"""
+        stats = {'deleted': 0, 'recompressed': 0, 'freed_bytes': 0}
+        now = time.time()
+        settings = self.settings
+        
+        def evict(files: list) -> list:
+            path, _, size = files.pop(0)
+            if self._remove(path):
+                stats['deleted'] += 1
+                stats['freed_bytes'] += size
+            return files
+        
+        # Свіжі файли не чіпаємо, але враховуємо в квотах
+        all_files = self._scan()
+        files = [f for f in all_files if now - f[1] > MIN_FILE_AGE]
+        recent_count = len(all_files) - len(files)
+        
+        # 1. Видаляємо за віком
+        max_age = settings['max_age_days'] * 86400
+        while max_age and files and now - files[0][1] > max_age:
+            evict(files)
+        
+        # 2. Видаляємо найстаріші понад ліміт кількості
+        max_count = settings['max_count']
+        while max_count and files and len(files) + recent_count > max_count:
+            evict(files)
+        
+        # 3. Перестискаємо старі PNG, що залишились
+        recompress_after = settings['recompress_after_hours'] * 3600
+        if recompress_after:
+            for path, mtime, _ in files:
+                if self._stop.is_set():
+                    return stats
+                if path.lower().endswith('.png') and now - mtime > recompress_after:
+                    try:
+                        saved = self._recompress(path)
+                        if saved:
+                            stats['recompressed'] += 1
+                            stats['freed_bytes'] += saved
+                    except Exception as e:
+                        logger.error(f"Recompress error for {path}: {e}")
+        
+        # 4. Видаляємо найстаріші, поки не вкладемось у розмір
+        max_bytes = settings['max_size_mb'] * 1024 * 1024
+        if max_bytes:
+            all_files = self._scan()
+            total_bytes = sum(f[2] for f in all_files)
+            files = [f for f in all_files if now - f[1] > MIN_FILE_AGE]
+            while files and total_bytes > max_bytes:
+                total_bytes -= files[0][2]
+                evict(files)
+        
+        return stats
+    
+    def _remove(self, path: str) -> bool:
+        """Видаляє файл"""
+        try:
+            os.remove(path)
+            return True
+        except OSError as e:
+            logger.error(f"Error removing {path}: {e}")
+            return False
+    
+    def _loop(self):
+        """Фоновий цикл очищення"""
+        while not self._stop.is_set():
+            try:
+                self.last_stats = self.run_once()
+                self.last_run = time.time()
+                if self.last_stats['deleted'] or self.last_stats['recompressed']:
+                    logger.info(
+                        f"Screenshot retention: deleted {self.last_stats['deleted']}, "
+                        f"recompressed {self.last_stats['recompressed']}, "
+                        f"freed {self.last_stats['freed_bytes'] / 1024 / 1024:.1f} MB"
+                    )
+            except Exception as e:
+                logger.error(f"Screenshot retention error: {e}")
+            
+            interval = max(1, self.settings['interval_minutes']) * 60
+            self._wake.wait(interval)
+            self._wake.clear()
+    
+    def start(self):
+        """Запускає фонове очищення"""
+        if self._thread and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._loop, name='screenshot-retention', daemon=True)
+        self._thread.start()
+        logger.info("Screenshot retention started")
+    
+    def stop(self):
+        """Зупиняє фонове очищення"""
+        self._stop.set()
+        self._wake.set()
+        if self._thread:
+            self._thread.join(timeout=5)
+        logger.info("Screenshot retention stopped")
+    
+    def run_now(self):
+        """Просить фоновий потік виконати очищення негайно"""
+        self._wake.set()
+    
+    def get_status(self) -> str:
+        """Форматований стан для бота"""
+        files = self._scan()
+        total_mb = sum(f[2] for f in files) / 1024 / 1024
+        
+        text = "🗂 Скріншоти:\n\n"
+        text += f"📁 Файлів: {len(files)} ({total_mb:.1f} МБ)\n"
+        if self.last_run:
+            last_run = time.strftime('%Y-%m-%d %H:%M:%S', time.localtime(self.last_run))
+            text += (
+                f"🧹 Останнє очищення: {last_run} - видалено {self.last_stats.get('deleted', 0)}, "
+                f"перестиснено {self.last_stats.get('recompressed', 0)}\n"
+            )
+        text += "\n⚙️ Налаштування:\n"
+        for key, description in SETTING_DESCRIPTIONS.items():
+            text += f"• {key} = {self.settings[key]} - {description}\n"
+        text += "\n💡 Змінити: /retention max_count 200\n"
+        text += "🧹 Очистити зараз: /retention run\n"
+        text += "0 - вимкнути обмеження"
+        return text
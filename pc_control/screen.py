@@ -1,14 +1,159 @@
 import logging
-import pyautogui
+import secrets
+import tempfile
+import threading
+import time
+from collections import OrderedDict, deque
 from PIL import ImageGrab
-import pytesseract
 import cv2
 import numpy as np
 from datetime import datetime
 import os
+from pc_control.frame_store import FrameStore
+from pc_control.ocr import get_ocr_engine
+from pc_control.actuator import get_input_actuator
+from pc_control.input_backends import get_input_backend
 
 logger = logging.getLogger(__name__)
 
+# Формат -> розширення файлу для cv2.imencode
+IMAGE_EXTENSIONS = {
+    'png': '.png',
+    'jpeg': '.jpg',
+    'jpg': '.jpg',
+    'webp': '.webp',
+}
+
+
+def encode_frame(frame: np.ndarray, fmt: str = 'png', quality: int = 85, png_compression: int = 1) -> bytes:
+    """
+    Кодує кадр (BGR) у буфер зображення
+    
+    Args:
+        frame: Кадр у форматі BGR (як повертає cv2.imread)
+        fmt: Формат - png, jpeg або webp
+        quality: Якість для JPEG/WebP (1-100)
+        png_compression: Рівень стиснення PNG (0-9, 0 - найшвидше)
+    
+    Returns:
+        bytes: Закодоване зображення
+    """
+    fmt = fmt.lower()
+    if fmt not in IMAGE_EXTENSIONS:
+        raise ValueError(f"Unsupported image format: {fmt}")
+    
+    if fmt == 'png':
+        params = [cv2.IMWRITE_PNG_COMPRESSION, int(png_compression)]
+    elif fmt == 'webp':
+        params = [cv2.IMWRITE_WEBP_QUALITY, int(quality)]
+    else:
+        params = [cv2.IMWRITE_JPEG_QUALITY, int(quality)]
+    
+    ok, buffer = cv2.imencode(IMAGE_EXTENSIONS[fmt], frame, params)
+    if not ok:
+        raise ValueError(f"Failed to encode frame as {fmt}")
+    return buffer.tobytes()
+
+
+def list_monitors() -> list:
+    """
+    Список моніторів у глобальних координатах
+    
+    Returns:
+        list: [{'index': 1, 'bbox': (left, top, right, bottom), 'primary': bool}, ...]
+              Основний монітор має початок у (0, 0), інші можуть мати від'ємні координати.
+    """
+    try:
+        import win32api
+        monitors = []
+        for index, (hmonitor, _, rect) in enumerate(win32api.EnumDisplayMonitors(), start=1):
+            info = win32api.GetMonitorInfo(hmonitor)
+            monitors.append({
+                'index': index,
+                'bbox': tuple(rect),
+                'primary': bool(info.get('Flags', 0) & 1),
+            })
+        if monitors:
+            return monitors
+    
+    except Exception as e:
+        logger.warning(f"Monitor enumeration error: {e}")
+    
+    # Без win32api знаємо лише основний монітор
+    width, height = get_input_actuator().call(get_input_backend().size)
+    return [{'index': 1, 'bbox': (0, 0, width, height), 'primary': True}]
+
+
+def crop_frame(frame: np.ndarray, bbox: tuple) -> np.ndarray:
+    """
+    Вирізає область з кадру основного монітора
+    
+    Returns:
+        np.ndarray: Область кадру або None, якщо bbox виходить за межі кадру
+    """
+    left, top, right, bottom = bbox
+    height, width = frame.shape[:2]
+    if left < 0 or top < 0 or right > width or bottom > height or right <= left or bottom <= top:
+        return None
+    return frame[top:bottom, left:right]
+
+
+def resize_frame(frame: np.ndarray, max_side: int) -> np.ndarray:
+    """Зменшує кадр так, щоб більша сторона не перевищувала max_side"""
+    height, width = frame.shape[:2]
+    scale = max_side / max(height, width)
+    if scale >= 1:
+        return frame
+    size = (max(1, round(width * scale)), max(1, round(height * scale)))
+    return cv2.resize(frame, size, interpolation=cv2.INTER_AREA)
+
+
+class ScreenshotCache:
+    """
+    Піраміда розмірів для відправлених скріншотів
+    
+    Прев'ю кодується одразу, а кадр у повному розмірі лише зберігається
+    в пам'яті і кодується при першому запиті (кнопка "Повний розмір").
+    Тримає останні max_items кадрів (LRU).
+    """
+    
+    def __init__(self, max_items: int = 5):
+        self.max_items = max_items
+        self._items = OrderedDict()
+        self._lock = threading.Lock()
+    
+    def put(self, frame: np.ndarray) -> str:
+        """Зберігає кадр і повертає його id (для callback_data)"""
+        shot_id = secrets.token_hex(6)
+        with self._lock:
+            self._items[shot_id] = {'frame': frame, 'full': None}
+            while len(self._items) > self.max_items:
+                self._items.popitem(last=False)
+        return shot_id
+    
+    def full_bytes(self, shot_id: str, png_compression: int = 1) -> bytes:
+        """
+        Повнорозмірний PNG кадру (кодується один раз)
+        
+        Returns:
+            bytes: PNG або None, якщо кадр уже витіснений з кешу
+        """
+        with self._lock:
+            item = self._items.get(shot_id)
+            if item is None:
+                return None
+            self._items.move_to_end(shot_id)
+            if item['full'] is not None:
+                return item['full']
+            frame = item['frame']
+        
+        data = encode_frame(frame, fmt='png', png_compression=png_compression)
+        with self._lock:
+            item['full'] = data
+            # Закодований PNG замінює сирий кадр у пам'яті
+            item['frame'] = None
+        return data
+
 
 class ScreenCapture:
     """Клас для роботи зі скріншотами та розпізнаванням"""
@@ -16,41 +161,404 @@ class ScreenCapture:
     def __init__(self):
         self.screenshot_dir = "screenshots"
         os.makedirs(self.screenshot_dir, exist_ok=True)
+        
+        # Налаштування кодування (можна змінити через .env)
+        self.image_format = os.getenv('SCREENSHOT_FORMAT', 'jpeg').lower()
+        self.quality = int(os.getenv('SCREENSHOT_QUALITY', '85'))
+        self.png_compression = int(os.getenv('SCREENSHOT_PNG_COMPRESSION', '1'))
+        self.save_to_disk = os.getenv('SCREENSHOT_SAVE', 'false').lower() in ('1', 'true', 'yes')
+        
+        # Сховище з адресацією за вмістом: exact, perceptual або off (файли за часом)
+        dedup = os.getenv('SCREENSHOT_DEDUP', 'exact').lower()
+        self.store = None if dedup == 'off' else FrameStore(self.screenshot_dir, dedup, self.png_compression)
+        
+        # Прев'ю для Telegram (більша сторона, пікселів) та кеш повнорозмірних кадрів
+        self.preview_size = int(os.getenv('SCREENSHOT_PREVIEW_SIZE', '1280'))
+        self.shots = ScreenshotCache(int(os.getenv('SCREENSHOT_CACHE_SIZE', '5')))
+        
+        # Кодувальник змінених плиток для capture_delta()
+        self._delta = None
     
-    def capture(self) -> str:
-        """Робить скріншот екрану"""
+    def resolve_region(self, bbox: tuple = None, monitor: int = None, window: str = None) -> tuple:
+        """
+        Перетворює опис області в bbox у глобальних координатах екрану
+        
+        Args:
+            bbox: (left, top, right, bottom)
+            monitor: Номер монітора (1, 2, ...), див. list_monitors()
+            window: Частина заголовка вікна
+        
+        Returns:
+            tuple: (left, top, right, bottom) або None - весь екран
+        """
+        if window:
+            from pc_control.windows import WindowController
+            rect = WindowController().get_window_rect(window)
+            if not rect:
+                raise ValueError(f"Window not found: {window}")
+            return rect
+        
+        if monitor is not None:
+            for info in list_monitors():
+                if info['index'] == int(monitor):
+                    return info['bbox']
+            raise ValueError(f"Monitor not found: {monitor}")
+        
+        if bbox is not None:
+            left, top, right, bottom = (int(v) for v in bbox)
+            if right <= left or bottom <= top:
+                raise ValueError(f"Invalid region: {bbox}")
+            return (left, top, right, bottom)
+        
+        return None
+    
+    def capture_frame(self, bbox: tuple = None) -> np.ndarray:
+        """
+        Робить скріншот і повертає кадр у пам'яті (BGR)
+        
+        Args:
+            bbox: Область у глобальних координатах (інакше основний монітор)
+        """
         try:
-            timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-            filename = f"{self.screenshot_dir}/screenshot_{timestamp}.png"
-            
-            screenshot = ImageGrab.grab()
-            screenshot.save(filename)
+            # Області поза основним монітором потребують знімка всіх екранів
+            screenshot = ImageGrab.grab(bbox=bbox, all_screens=bbox is not None)
+            frame = np.asarray(screenshot.convert('RGB'))
+            return cv2.cvtColor(frame, cv2.COLOR_RGB2BGR)
+        
+        except Exception as e:
+            logger.error(f"Screenshot error: {e}")
+            raise
+    
+    def capture_bytes(self, fmt: str = None, quality: int = None, png_compression: int = None,
+                      save: bool = None, bbox: tuple = None) -> bytes:
+        """
+        Робить скріншот і повертає закодований буфер (без запису на диск)
+        
+        Args:
+            fmt: Формат - png, jpeg або webp (за замовчуванням SCREENSHOT_FORMAT)
+            quality: Якість для JPEG/WebP
+            png_compression: Рівень стиснення PNG
+            save: Також зберегти файл у screenshots/
+            bbox: Область у глобальних координатах (див. resolve_region())
+        
+        Returns:
+            bytes: Закодоване зображення для BufferedInputFile
+        """
+        return self.encode(self.capture_frame(bbox), fmt, quality, png_compression, save)
+    
+    def encode(self, frame: np.ndarray, fmt: str = None, quality: int = None, png_compression: int = None,
+               save: bool = None) -> bytes:
+        """Кодує вже захоплений кадр з налаштуваннями цього ScreenCapture"""
+        fmt = (fmt or self.image_format).lower()
+        data = encode_frame(
+            frame,
+            fmt=fmt,
+            quality=self.quality if quality is None else quality,
+            png_compression=self.png_compression if png_compression is None else png_compression,
+        )
+        
+        if self.save_to_disk if save is None else save:
+            if self.store:
+                self.store.put(frame, encoded=data, fmt=fmt)
+            else:
+                self.save_bytes(data, fmt)
+        
+        return data
+    
+    def preview(self, frame: np.ndarray, save: bool = None) -> tuple[str, bytes]:
+        """
+        Прев'ю кадру для швидкої відправки
+        
+        Кадр у повному розмірі лишається в кеші - див. full_bytes().
+        
+        Args:
+            frame: Кадр (BGR)
+            save: Також зберегти повний кадр у screenshots/
+        
+        Returns:
+            (id кадру, закодоване прев'ю у форматі SCREENSHOT_FORMAT)
+        """
+        shot_id = self.shots.put(frame)
+        data = self.encode(resize_frame(frame, self.preview_size), save=False)
+        
+        if self.save_to_disk if save is None else save:
+            self.save_frame(frame)
+        
+        return shot_id, data
+    
+    def full_bytes(self, shot_id: str) -> bytes:
+        """Повнорозмірний PNG раніше відправленого прев'ю (або None, якщо він застарів)"""
+        return self.shots.full_bytes(shot_id, self.png_compression)
+    
+    def capture_delta(self, frame: np.ndarray = None, tile: int = 64) -> dict:
+        """
+        Повертає лише змінені плитки відносно попереднього виклику
+        
+        Args:
+            frame: Готовий кадр (інакше робиться новий скріншот)
+            tile: Розмір плитки в пікселях
             
-            logger.info(f"Screenshot saved: {filename}")
-            return filename
+        Returns:
+            dict: Оновлення з DeltaEncoder.encode() або None, якщо екран не змінився
+        """
+        if self._delta is None or self._delta.tile != tile:
+            from pc_control.delta import DeltaEncoder
+            self._delta = DeltaEncoder(tile=tile, fmt=self.image_format, quality=self.quality)
+        
+        if frame is None:
+            frame = self.capture_frame()
+        return self._delta.encode(frame)
+    
+    def save_bytes(self, data: bytes, fmt: str = 'png') -> str:
+        """Зберігає закодований скріншот у screenshots/"""
+        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+        filename = f"{self.screenshot_dir}/screenshot_{timestamp}{IMAGE_EXTENSIONS[fmt.lower()]}"
+        
+        with open(filename, 'wb') as f:
+            f.write(data)
+        
+        logger.info(f"Screenshot saved: {filename}")
+        return filename
+    
+    def capture(self, bbox: tuple = None) -> str:
+        """Робить скріншот екрану (або області)"""
+        return self.save_frame(self.capture_frame(bbox))
+    
+    def save_frame(self, frame: np.ndarray) -> str:
+        """Зберігає кадр як PNG у screenshots/"""
+        try:
+            if self.store:
+                # Однаковий кадр не кодується і не пишеться повторно
+                return self.store.put(frame, fmt='png')['path']
             
+            data = encode_frame(frame, fmt='png', png_compression=self.png_compression)
+            return self.save_bytes(data, 'png')
+        
         except Exception as e:
             logger.error(f"Screenshot error: {e}")
             raise
     
-    def find_text_on_screen(self, text: str) -> tuple:
-        """Знаходить текст на екрані за допомогою OCR"""
+    def region_frame(self, frame: np.ndarray = None, bbox: tuple = None) -> np.ndarray:
+        """
+        Кадр області: вирізається з готового кадру основного монітора,
+        а якщо область поза ним - знімається окремо
+        """
+        if frame is not None:
+            if bbox is None:
+                return frame
+            region = crop_frame(frame, bbox)
+            if region is not None:
+                return region
+        return self.capture_frame(bbox)
+    
+    def find_text_on_screen(self, text: str, frame: np.ndarray = None, bbox: tuple = None) -> tuple:
+        """
+        Знаходить текст на екрані за допомогою OCR
+        
+        Args:
+            text: Текст для пошуку
+            frame: Готовий кадр основного монітора (інакше робиться новий скріншот)
+            bbox: Шукати лише в цій області (глобальні координати)
+        
+        Returns:
+            tuple: (x, y) у глобальних координатах екрану для ClickController або None
+        """
         try:
-            screenshot = ImageGrab.grab()
-            screenshot_np = np.array(screenshot)
-            
-            result = pytesseract.image_to_data(screenshot_np, output_type=pytesseract.Output.DICT)
+            frame = self.region_frame(frame, bbox)
+            left, top = bbox[:2] if bbox else (0, 0)
+            # Кеш за відбитком кадру - незмінений екран не розпізнається повторно
+            matches = get_ocr_engine().index(frame).find(text, origin=(left, top))
             
-            for i, word in enumerate(result['text']):
-                if text.lower() in word.lower():
-                    x = result['left'][i] + result['width'][i] // 2
-                    y = result['top'][i] + result['height'][i] // 2
-                    logger.info(f"Text '{text}' found at ({x}, {y})")
-                    return (x, y)
+            if matches:
+                x, y = matches[0]['center']
+                logger.info(f"Text '{text}' found at ({x}, {y}): '{matches[0]['text']}' (score {matches[0]['score']})")
+                return (x, y)
             
             logger.warning(f"Text '{text}' not found on screen")
             return None
-            
+        
         except Exception as e:
             logger.error(f"Text search error: {e}")
             return None
+
+
+class ScreenRecorder:
+    """
+    Фоновий запис екрану в кільцевий буфер у пам'яті
+    
+    Кадри зменшуються і зберігаються як змінені плитки (DeltaEncoder):
+    групи кадрів починаються з ключового кадру, найстаріші групи
+    відкидаються за часом або розміром - пам'ять не росте.
+    Останні N секунд можна експортувати у відео (cv2.VideoWriter).
+    """
+    
+    def __init__(self, grab=None, fps: float = 2, seconds: int = 60, max_side: int = 960,
+                 keyframe_interval: int = 20, quality: int = 70, max_mb: int = 64):
+        """
+        Args:
+            grab: Функція, що повертає кадр (за замовчуванням ScreenCapture().capture_frame)
+            fps: Кадрів на секунду
+            seconds: Скільки останніх секунд тримати
+            max_side: Більша сторона збереженого кадру
+            keyframe_interval: Ключовий кадр кожні стільки кадрів
+            quality: Якість JPEG плиток
+            max_mb: Верхня межа пам'яті буфера
+        """
+        self.grab = grab or ScreenCapture().capture_frame
+        self.fps = fps
+        self.seconds = seconds
+        self.max_side = max_side
+        self.keyframe_interval = keyframe_interval
+        self.quality = quality
+        self.max_bytes = max_mb * 1024 * 1024
+        
+        # Групи: [{'start': час, 'bytes': розмір, 'frames': [(час, оновлення або None), ...]}]
+        self._groups = deque()
+        self._bytes = 0
+        self._encoder = None
+        self._since_key = 0
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+    
+    @property
+    def running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+    
+    def _record(self, frame: np.ndarray, timestamp: float):
+        """Додає кадр у буфер"""
+        if self._encoder is None:
+            from pc_control.delta import DeltaEncoder
+            self._encoder = DeltaEncoder(tile=32, fmt='jpeg', quality=self.quality)
+        
+        if self._since_key >= self.keyframe_interval:
+            self._encoder.reset()
+        
+        update = self._encoder.encode(resize_frame(frame, self.max_side))
+        size = sum(len(t['data']) for t in update['tiles']) if update else 0
+        
+        with self._lock:
+            if update and update['full']:
+                self._groups.append({'start': timestamp, 'bytes': 0, 'frames': []})
+                self._since_key = 0
+            if not self._groups:
+                return
+            group = self._groups[-1]
+            group['frames'].append((timestamp, update))
+            group['bytes'] += size
+            self._bytes += size
+            self._since_key += 1
+            self._trim(timestamp)
+    
+    def _trim(self, now: float):
+        """Відкидає найстаріші групи (викликається під self._lock)"""
+        cutoff = now - self.seconds
+        while len(self._groups) > 1 and (self._groups[1]['start'] <= cutoff or self._bytes > self.max_bytes):
+            self._bytes -= self._groups.popleft()['bytes']
+    
+    def _loop(self):
+        """Фоновий цикл запису"""
+        interval = 1 / self.fps
+        while not self._stop.is_set():
+            started = time.monotonic()
+            try:
+                self._record(self.grab(), time.time())
+            except Exception as e:
+                logger.error(f"Screen recorder error: {e}")
+            self._stop.wait(max(0.0, interval - (time.monotonic() - started)))
+    
+    def start(self):
+        """Запускає запис"""
+        if self.running:
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._loop, name='screen-recorder', daemon=True)
+        self._thread.start()
+        logger.info(f"Screen recorder started ({self.fps} fps, last {self.seconds}s)")
+    
+    def stop(self):
+        """Зупиняє запис і звільняє буфер"""
+        self._stop.set()
+        if self._thread:
+            self._thread.join(timeout=5)
+        self._thread = None
+        with self._lock:
+            self._groups.clear()
+            self._bytes = 0
+            self._encoder = None
+            self._since_key = 0
+        logger.info("Screen recorder stopped")
+    
+    def frames(self, seconds: float = None):
+        """
+        Відновлює кадри за останні seconds секунд
+        
+        Yields:
+            (час, кадр BGR)
+        """
+        with self._lock:
+            groups = [list(g['frames']) for g in self._groups]
+        if not groups:
+            return
+        
+        cutoff = groups[-1][-1][0] - seconds if seconds else 0
+        canvas = None
+        for group in groups:
+            if group[-1][0] < cutoff:
+                continue
+            for timestamp, update in group:
+                if update:
+                    if update['full'] or canvas is None or canvas.shape[:2] != (update['height'], update['width']):
+                        canvas = np.zeros((update['height'], update['width'], 3), dtype=np.uint8)
+                    for t in update['tiles']:
+                        tile = cv2.imdecode(np.frombuffer(t['data'], np.uint8), cv2.IMREAD_COLOR)
+                        canvas[t['y']:t['y'] + t['h'], t['x']:t['x'] + t['w']] = tile
+                if timestamp >= cutoff and canvas is not None:
+                    yield timestamp, canvas
+    
+    def export(self, seconds: float = 30) -> bytes:
+        """
+        Експортує останні seconds секунд у MP4
+        
+        Returns:
+            bytes: Відео або None, якщо буфер порожній
+        """
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            path = os.path.join(tmp_dir, 'replay.mp4')
+            writer = None
+            count = 0
+            try:
+                for _, frame in self.frames(seconds):
+                    if writer is None:
+                        height, width = frame.shape[:2]
+                        writer = cv2.VideoWriter(path, cv2.VideoWriter_fourcc(*'mp4v'), self.fps, (width, height))
+                    elif frame.shape[:2] != (height, width):
+                        frame = cv2.resize(frame, (width, height), interpolation=cv2.INTER_AREA)
+                    writer.write(frame)
+                    count += 1
+            finally:
+                if writer is not None:
+                    writer.release()
+            
+            if not count:
+                return None
+            
+            with open(path, 'rb') as f:
+                data = f.read()
+        
+        logger.info(f"Replay exported: {count} frames, {len(data) / 1024:.0f} KB")
+        return data
+    
+    def get_status(self) -> str:
+        """Форматований стан для бота"""
+        with self._lock:
+            frames = sum(len(g['frames']) for g in self._groups)
+            start = self._groups[0]['start'] if self._groups else None
+            used_mb = self._bytes / 1024 / 1024
+        
+        text = "🎞 Запис екрану:\n\n"
+        text += f"{'🟢 Увімкнено' if self.running else '⚪ Вимкнено'} ({self.fps} fps, до {self.seconds} с)\n"
+        if start:
+            text += f"📦 У буфері: {frames} кадрів, {time.time() - start:.0f} с, {used_mb:.1f} МБ\n"
+        text += "\n💡 /recorder on | off, /replay 30"
+        return text
@@ -0,0 +1,232 @@
+import hashlib
+import json
+import logging
+import os
+import threading
+from datetime import datetime
+
+import cv2
+import numpy as np
+
+from pc_control.ocr import normalize_text
+
+logger = logging.getLogger(__name__)
+
+TEMPLATES_DIR = "data/templates"
+INDEX_FILE = "index.json"
+
+
+def display_scale() -> float:
+    """Масштаб екрану Windows (DPI / 96), 1.0 якщо невідомо"""
+    try:
+        import ctypes
+        return round(ctypes.windll.user32.GetDpiForSystem() / 96, 2)
+    except Exception:
+        return 1.0
+
+
+class TemplateStore:
+    """
+    Кеш зображень кнопок для швидкого пошуку без OCR
+    
+    Шаблон - невелика вирізка кнопки, збережена після успішного кліку (або
+    завантажена користувачем), з ключем мітка + масштаб екрану. Пошук -
+    cv2.matchTemplate на зменшеному сірому кадрі для кількох масштабів шаблону:
+    мілісекунди замість секунд OCR.
+    """
+    
+    def __init__(self, directory: str = TEMPLATES_DIR, threshold: float = 0.85, downscale: float = 0.5,
+                 scales: tuple = (0.8, 0.9, 1.0, 1.1, 1.25)):
+        self.directory = directory
+        self.threshold = threshold
+        self.downscale = downscale
+        self.scales = scales
+        self.index_path = os.path.join(directory, INDEX_FILE)
+        self._lock = threading.Lock()
+        # Декодовані шаблони (сірі) за ключем
+        self._images = {}
+        self.index = self._load_index()
+    
+    @staticmethod
+    def make_key(label: str, scale: float) -> str:
+        return f"{normalize_text(label)}@{scale:.2f}"
+    
+    def _load_index(self) -> dict:
+        """Читає індекс шаблонів"""
+        try:
+            if os.path.exists(self.index_path):
+                with open(self.index_path, 'r', encoding='utf-8') as f:
+                    return json.load(f)
+        except Exception as e:
+            logger.error(f"Error loading template index: {e}")
+        return {}
+    
+    def _save_index(self):
+        """Записує індекс (викликається під self._lock)"""
+        os.makedirs(self.directory, exist_ok=True)
+        tmp_path = self.index_path + '.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(self.index, f, indent=2, ensure_ascii=False)
+        os.replace(tmp_path, self.index_path)
+    
+    def save(self, label: str, image: np.ndarray, scale: float = None, source: str = 'learned') -> str:
+        """
+        Зберігає шаблон кнопки
+        
+        Args:
+            label: Текст кнопки
+            image: Вирізка кнопки (BGR або сіра) у пікселях екрану
+            scale: Масштаб екрану, на якому зроблена вирізка (за замовчуванням - поточний)
+            source: learned (після кліку) або upload (від користувача)
+        
+        Returns:
+            str: Ключ шаблону
+        """
+        scale = scale or display_scale()
+        key = self.make_key(label, scale)
+        gray = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY) if image.ndim == 3 else image
+        gray = np.ascontiguousarray(gray)
+        filename = f"tpl_{hashlib.blake2b(key.encode('utf-8'), digest_size=8).hexdigest()}.png"
+        
+        with self._lock:
+            os.makedirs(self.directory, exist_ok=True)
+            cv2.imwrite(os.path.join(self.directory, filename), gray)
+            self.index[key] = {
+                'label': label,
+                'scale': scale,
+                'file': filename,
+                'width': int(gray.shape[1]),
+                'height': int(gray.shape[0]),
+                'source': source,
+                'created': datetime.now().isoformat(timespec='seconds'),
+            }
+            self._images[key] = gray
+            self._save_index()
+        
+        logger.info(f"Template saved: {key} ({gray.shape[1]}x{gray.shape[0]}, {source})")
+        return key
+    
+    def learn(self, label: str, frame: np.ndarray, bbox: tuple, pad: int = 4) -> str:
+        """
+        Запам'ятовує кнопку з кадру після успішного кліку
+        
+        Args:
+            label: Текст кнопки
+            frame: Кадр, на якому кнопку знайдено
+            bbox: Межі кнопки в координатах кадру
+        """
+        height, width = frame.shape[:2]
+        left, top, right, bottom = bbox
+        crop = frame[max(0, top - pad):min(height, bottom + pad), max(0, left - pad):min(width, right + pad)]
+        if crop.size == 0:
+            return None
+        return self.save(label, crop)
+    
+    def remove(self, label: str) -> int:
+        """Видаляє всі шаблони мітки, повертає кількість"""
+        norm = normalize_text(label)
+        with self._lock:
+            keys = [key for key, entry in self.index.items() if normalize_text(entry['label']) == norm]
+            for key in keys:
+                entry = self.index.pop(key)
+                self._images.pop(key, None)
+                try:
+                    os.remove(os.path.join(self.directory, entry['file']))
+                except FileNotFoundError:
+                    pass
+            if keys:
+                self._save_index()
+        return len(keys)
+    
+    def list(self) -> list:
+        """Усі шаблони: [{'label', 'scale', 'width', 'height', 'source', ...}, ...]"""
+        with self._lock:
+            return list(self.index.values())
+    
+    def _candidates(self, label: str, scale: float) -> list:
+        """Шаблони мітки: [(сіре зображення, відношення масштабів), ...], спочатку для поточного масштабу"""
+        norm = normalize_text(label)
+        candidates = []
+        with self._lock:
+            for key, entry in self.index.items():
+                if normalize_text(entry['label']) != norm:
+                    continue
+                image = self._images.get(key)
+                if image is None:
+                    image = cv2.imread(os.path.join(self.directory, entry['file']), cv2.IMREAD_GRAYSCALE)
+                    if image is None:
+                        continue
+                    self._images[key] = image
+                candidates.append((image, scale / entry['scale']))
+        candidates.sort(key=lambda c: abs(c[1] - 1))
+        return candidates
+    
+    def has(self, label: str) -> bool:
+        norm = normalize_text(label)
+        with self._lock:
+            return any(normalize_text(entry['label']) == norm for entry in self.index.values())
+    
+    def prepare(self, frame: np.ndarray) -> np.ndarray:
+        """Зменшений сірий кадр для match() (один раз на кадр для всіх міток)"""
+        gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY) if frame.ndim == 3 else frame
+        if self.downscale == 1:
+            return gray
+        return cv2.resize(gray, None, fx=self.downscale, fy=self.downscale, interpolation=cv2.INTER_AREA)
+    
+    def match(self, label: str, prepared: np.ndarray, origin: tuple = (0, 0)) -> dict:
+        """
+        Шукає кнопку за шаблоном
+        
+        Args:
+            label: Текст кнопки
+            prepared: Кадр з prepare()
+            origin: Зміщення кадру в глобальних координатах екрану
+        
+        Returns:
+            dict: {'center', 'bbox', 'score', 'scale'} у глобальних координатах або None
+        """
+        best = None
+        for template, ratio in self._candidates(label, display_scale()):
+            for scale in self.scales:
+                factor = self.downscale * ratio * scale
+                w = round(template.shape[1] * factor)
+                h = round(template.shape[0] * factor)
+                if w < 8 or h < 8 or w > prepared.shape[1] or h > prepared.shape[0]:
+                    continue
+                resized = cv2.resize(template, (w, h), interpolation=cv2.INTER_AREA if factor < 1 else cv2.INTER_LINEAR)
+                result = cv2.matchTemplate(prepared, resized, cv2.TM_CCOEFF_NORMED)
+                _, score, _, (x, y) = cv2.minMaxLoc(result)
+                if best is None or score > best[0]:
+                    best = (score, x, y, w, h, ratio * scale)
+            # Впевнений збіг з шаблоном поточного масштабу - інші не перебираємо
+            if best and best[0] >= self.threshold:
+                break
+        
+        if best is None or best[0] < self.threshold:
+            return None
+        
+        score, x, y, w, h, scale = best
+        left0, top0 = origin
+        left = left0 + round(x / self.downscale)
+        top = top0 + round(y / self.downscale)
+        right = left0 + round((x + w) / self.downscale)
+        bottom = top0 + round((y + h) / self.downscale)
+        return {
+            'bbox': (left, top, right, bottom),
+            'center': ((left + right) // 2, (top + bottom) // 2),
+            'score': round(float(score), 3),
+            'scale': round(scale, 2),
+        }
+
+
+_template_store = None
+_template_store_lock = threading.Lock()
+
+
+def get_template_store() -> TemplateStore:
+    """Спільний TemplateStore для ButtonFinder і бота"""
+    global _template_store
+    with _template_store_lock:
+        if _template_store is None:
+            _template_store = TemplateStore(threshold=float(os.getenv('TEMPLATE_THRESHOLD', '0.85')))
+        return _template_store
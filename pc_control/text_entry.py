@@ -0,0 +1,153 @@
+import logging
+import os
+import threading
+import time
+
+from pc_control.input_backends import get_input_backend
+
+logger = logging.getLogger(__name__)
+
+STRATEGIES = ('auto', 'paste', 'keys', 'slow')
+
+
+class TextEntry:
+    """
+    Введення тексту з вибором стратегії під вміст і довжину
+    
+    - paste: шматками через буфер обміну (вміст буфера зберігається і
+      відновлюється після вставки) - найшвидше для довгих і Unicode текстів
+    - keys: нативні події клавіш пакетами без паузи між символами
+    - slow: набір з обмеженням швидкості для програм, що гублять символи
+    
+    auto вибирає keys для коротких текстів, які бекенд може набрати, і paste
+    для довгих або з символами поза ASCII (pyautogui набирає лише ASCII).
+    """
+    
+    def __init__(self, strategy: str = 'auto', chunk_size: int = 2000, keys_max: int = 200,
+                 rate: float = 30.0, paste_pause: float = 0.05):
+        """
+        Args:
+            strategy: Стратегія за замовчуванням (auto, paste, keys, slow)
+            chunk_size: Символів на одну вставку / один пакет подій
+            keys_max: Найдовший текст, який auto набирає клавішами
+            rate: Символів на секунду для slow
+            paste_pause: Пауза після вставки, щоб програма встигла прочитати буфер
+        """
+        if strategy not in STRATEGIES:
+            raise ValueError(f"Unknown text entry strategy: {strategy}")
+        if rate <= 0:
+            raise ValueError(f"Text entry rate must be positive: {rate}")
+        self.strategy = strategy
+        self.chunk_size = max(1, chunk_size)
+        self.keys_max = keys_max
+        self.rate = rate
+        self.paste_pause = paste_pause
+        self.last = None
+    
+    def choose(self, text: str, backend=None) -> str:
+        """Стратегія для тексту (auto -> paste або keys)"""
+        backend = backend or get_input_backend()
+        if not backend.clipboard:
+            return 'keys'
+        if len(text) > self.keys_max or not (text.isascii() or backend.unicode_typing):
+            return 'paste'
+        return 'keys'
+    
+    def _chunks(self, text: str, size: int) -> list:
+        return [text[i:i + size] for i in range(0, len(text), size)]
+    
+    def _paste(self, backend, text: str) -> int:
+        saved = None
+        # Бекенд без буфера обміну (xdotool) вставляє текст власним способом
+        if backend.clipboard:
+            try:
+                saved = backend.get_clipboard()
+            except Exception as e:
+                logger.warning(f"Clipboard read error, it will not be restored: {e}")
+        
+        chunks = self._chunks(text, self.chunk_size)
+        try:
+            for chunk in chunks:
+                backend.paste_text(chunk)
+                # Програма читає буфер асинхронно - наступний шматок лише після паузи
+                if backend.settle:
+                    backend.flush()
+                    time.sleep(self.paste_pause)
+        finally:
+            if saved is not None:
+                backend.set_clipboard(saved)
+        return len(chunks)
+    
+    def _keys(self, backend, text: str) -> int:
+        chunks = self._chunks(text, self.chunk_size)
+        for chunk in chunks:
+            backend.type_text(chunk, interval=0)
+        return len(chunks)
+    
+    def _slow(self, backend, text: str, rate: float) -> int:
+        # Короткі пакети, щоб xdotool не тримав довгий ланцюжок до flush
+        chunks = self._chunks(text, max(1, int(rate)))
+        for chunk in chunks:
+            backend.type_text(chunk, interval=1.0 / rate)
+            backend.flush()
+        return len(chunks)
+    
+    def enter(self, text: str, strategy: str = None, rate: float = None) -> dict:
+        """
+        Вводить текст у активне поле
+        
+        Args:
+            text: Текст
+            strategy: auto, paste, keys, slow (None - стратегія за замовчуванням)
+            rate: Символів на секунду для slow (None - швидкість за замовчуванням)
+        
+        Returns:
+            dict: {'strategy', 'chars', 'chunks', 'seconds', 'cps'}
+        """
+        strategy = strategy or self.strategy
+        if strategy not in STRATEGIES:
+            raise ValueError(f"Unknown text entry strategy: {strategy}")
+        rate = self.rate if rate is None else float(rate)
+        if rate <= 0:
+            raise ValueError(f"Text entry rate must be positive: {rate}")
+        
+        backend = get_input_backend()
+        if strategy == 'auto':
+            strategy = self.choose(text, backend)
+        
+        start = time.perf_counter()
+        if strategy == 'paste':
+            chunks = self._paste(backend, text)
+        elif strategy == 'keys':
+            chunks = self._keys(backend, text)
+        else:
+            chunks = self._slow(backend, text, rate)
+        backend.flush()
+        seconds = time.perf_counter() - start
+        
+        self.last = {
+            'strategy': strategy,
+            'chars': len(text),
+            'chunks': chunks,
+            'seconds': round(seconds, 4),
+            'cps': round(len(text) / seconds, 1) if seconds > 0 else float(len(text)),
+        }
+        logger.info(f"Text entry: {len(text)} chars via {strategy} in {seconds:.3f}s ({self.last['cps']:.0f} chars/s)")
+        return self.last
+
+
+_text_entry = None
+_text_entry_lock = threading.Lock()
+
+
+def get_text_entry() -> TextEntry:
+    """Спільний TextEntry (TEXT_ENTRY_STRATEGY, TEXT_ENTRY_RATE, TEXT_ENTRY_CHUNK)"""
+    global _text_entry
+    with _text_entry_lock:
+        if _text_entry is None:
+            _text_entry = TextEntry(
+                strategy=os.getenv('TEXT_ENTRY_STRATEGY', 'auto').lower(),
+                chunk_size=int(os.getenv('TEXT_ENTRY_CHUNK', '2000')),
+                rate=float(os.getenv('TEXT_ENTRY_RATE', '30')),
+            )
+        return _text_entry
@@ -43,6 +43,54 @@ class WindowController:
             logger.error(f"Get active window error: {e}")
             return ""
     
+    def get_foreground_signature(self) -> tuple:
+        """
+        Дешевий відбиток стану екрану: активне вікно, його заголовок і положення
+        
+        Returns:
+            tuple: (hwnd, заголовок, прямокутник) або None, якщо win32gui недоступний
+        """
+        try:
+            import win32gui
+            hwnd = win32gui.GetForegroundWindow()
+            return (hwnd, win32gui.GetWindowText(hwnd), tuple(win32gui.GetWindowRect(hwnd)))
+            
+        except Exception as e:
+            logger.debug(f"Foreground signature error: {e}")
+            return None
+    
+    def get_window_rect(self, window_title: str) -> tuple:
+        """
+        Прямокутник вікна за частиною заголовка
+        
+        Returns:
+            tuple: (left, top, right, bottom) у глобальних координатах або None
+        """
+        try:
+            import win32gui
+            matches = []
+            
+            def enum_windows(hwnd, lParam):
+                if win32gui.IsWindowVisible(hwnd) and not win32gui.IsIconic(hwnd):
+                    title = win32gui.GetWindowText(hwnd)
+                    if title and window_title.lower() in title.lower():
+                        matches.append(hwnd)
+                return True
+            
+            win32gui.EnumWindows(enum_windows, None)
+            if not matches:
+                logger.warning(f"Window not found: {window_title}")
+                return None
+            
+            # EnumWindows іде в Z-порядку - перше вікно найближче до переднього плану
+            rect = win32gui.GetWindowRect(matches[0])
+            logger.info(f"Window '{window_title}' rect: {rect}")
+            return tuple(rect)
+            
+        except Exception as e:
+            logger.error(f"Get window rect error: {e}")
+            return None
+    
     def list_windows(self) -> list:
         """Отримати список всіх вікон"""
         try:
@@ -4,10 +4,11 @@
 Імітує дії людини: клік, клавіатура, скріншоти
 """
 
-import asyncio
-import sys
+import time
+from pc_control.actuator import get_input_actuator
 from pc_control.click import ClickController
 from pc_control.keyboard import KeyboardController
+from pc_control.macros import get_macro_manager, parse_play_options
 from pc_control.screen import ScreenCapture
 from pc_control.windows import WindowController
 
@@ -16,10 +17,15 @@ class PCController:
     """Головний контролер ПК"""
     
     def __init__(self):
-        self.click = ClickController()
+        # mouse, а не click - інакше атрибут перекрив би метод click()
+        self.mouse = ClickController()
         self.keyboard = KeyboardController()
         self.screen = ScreenCapture()
         self.windows = WindowController()
+        self.macros = get_macro_manager()
+        # Дії виконуються через спільну чергу вводу (як у бота): по черзі,
+        # з виконанням подій бекенда до паузи контролера
+        self.input = get_input_actuator()
     
     def screenshot(self):
         """Зробити скріншот"""
@@ -32,31 +38,31 @@ class PCController:
         """Клік по координатам"""
         print(f"🖱️ Клік по ({x}, {y})")
         if double:
-            self.click.double_click(x, y)
+            self.input.call(self.mouse.double_click, x, y)
             print("✅ Подвійний клік виконано")
         elif button == 'right':
-            self.click.right_click(x, y)
+            self.input.call(self.mouse.right_click, x, y)
             print("✅ Правий клік виконано")
         else:
-            self.click.click(x, y)
+            self.input.call(self.mouse.click, x, y)
             print("✅ Клік виконано")
     
     def type_text(self, text: str):
         """Набрати текст"""
         print(f"⌨️ Набираю: {text}")
-        self.keyboard.write_unicode(text)
+        self.input.call(self.keyboard.write_unicode, text)
         print("✅ Текст введено")
     
     def press_key(self, key: str):
         """Натиснути клавішу"""
         print(f"⌨️ Натискаю: {key}")
-        self.keyboard.press_key(key)
+        self.input.call(self.keyboard.press_key, key)
         print("✅ Клавіша натиснута")
     
     def hotkey(self, *keys):
         """Комбінація клавіш"""
         print(f"⌨️ Комбінація: {'+'.join(keys)}")
-        self.keyboard.hotkey(*keys)
+        self.input.call(self.keyboard.hotkey, *keys)
         print("✅ Комбінація виконана")
     
     def open_app(self, app_name: str):
@@ -85,15 +91,34 @@ class PCController:
     def wait(self, seconds: float):
         """Чекати"""
         print(f"⏳ Чекаю {seconds} сек...")
-        import time
+        self.macros.record_wait(seconds)
         time.sleep(seconds)
         print("✅ Очікування завершено")
     
     def drag(self, x1: int, y1: int, x2: int, y2: int):
         """Перетягування"""
         print(f"🖱️ Перетягую з ({x1}, {y1}) на ({x2}, {y2})")
-        self.click.drag(x1, y1, x2, y2)
+        self.input.call(self.mouse.drag, x1, y1, x2, y2)
         print("✅ Перетягування виконано")
+    
+    def record(self, name: str):
+        """Почати запис макросу"""
+        self.macros.start(name)
+        print(f"⏺ Запис макросу {name}. Завершити: stop, скасувати: cancel")
+    
+    def stop_recording(self):
+        """Зберегти записаний макрос"""
+        name, count = self.macros.stop()
+        if name is None:
+            print("❌ Запис не йде")
+        else:
+            print(f"💾 Макрос {name} збережено: {count} кроків")
+    
+    def play(self, name: str, speed: float = 1.0, collapse: bool = True):
+        """Відтворити макрос через чергу вводу"""
+        print(f"🎬 Відтворюю {name} (x{speed}{'' if collapse else ', записані паузи'})...")
+        result = self.input.call(self.macros.play, name, speed=speed, collapse=collapse)
+        print(f"✅ {result['steps']} кроків → {result['actions']} дій за {result['seconds']:.2f} с")
 
 
 def print_menu():
@@ -112,8 +137,12 @@ def print_menu():
     print("8. find TEXT          - Знайти текст")
     print("9. wait SECONDS       - Чекати")
     print("10. drag X1 Y1 X2 Y2  - Перетягування")
-    print("11. help              - Довідка")
-    print("12. exit              - Вихід")
+    print("11. rec NAME          - Почати запис макросу")
+    print("12. stop | cancel     - Зберегти / скасувати запис")
+    print("13. play NAME [raw] [SPEED] - Відтворити макрос (raw - записані паузи)")
+    print("14. macros            - Список макросів")
+    print("15. help              - Довідка")
+    print("16. exit              - Вихід")
     print("="*50 + "\n")
 
 
@@ -200,6 +229,28 @@ def main():
                 x1, y1, x2, y2 = int(parts[1]), int(parts[2]), int(parts[3]), int(parts[4])
                 controller.drag(x1, y1, x2, y2)
             
+            elif cmd == 'rec':
+                if len(parts) < 2:
+                    print("❌ Використовуйте: rec NAME")
+                    continue
+                controller.record(parts[1])
+            
+            elif cmd == 'stop':
+                controller.stop_recording()
+            
+            elif cmd == 'cancel':
+                print("🗑 Запис скасовано" if controller.macros.cancel() else "❌ Запис не йде")
+            
+            elif cmd == 'play':
+                if len(parts) < 2:
+                    print("❌ Використовуйте: play NAME [raw] [SPEED]")
+                    continue
+                speed, collapse = parse_play_options(parts[2:])
+                controller.play(parts[1], speed, collapse)
+            
+            elif cmd == 'macros':
+                print(controller.macros.format_list())
+            
             elif cmd == 'exit':
                 print("👋 До побачення!")
                 break
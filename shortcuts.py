@@ -1,8 +1,10 @@
 import logging
-import pyautogui
 from pc_control.keyboard import KeyboardController
 from pc_control.click import ClickController
 from pc_control.windows import WindowController
+from pc_control.actuator import get_input_actuator
+from pc_control.input_backends import get_input_backend
+from pc_control.mouse_motion import get_mouse_motion
 
 logger = logging.getLogger(__name__)
 
@@ -189,6 +191,9 @@ class ShortcutExecutor:
         self.keyboard = KeyboardController()
         self.click = ClickController()
         self.windows = WindowController()
+        # Дії виконуються в потоці InputActuator - event loop не блокується
+        self.input = get_input_actuator()
+        self.motion = get_mouse_motion()
     
     def get_shortcuts(self) -> dict:
         """Отримує список всіх шорткатів"""
@@ -263,36 +268,34 @@ class ShortcutExecutor:
                 logger.info(f"Executing predefined shortcut: {shortcut_name}")
                 
                 if action == 'alt_enter':
-                    self.keyboard.alt_enter()
+                    await self.input.run(self.keyboard.alt_enter)
                     return f"✅ {description} виконано"
                 
                 elif action == 'hotkey':
                     keys = shortcut.get('keys', [])
-                    self.keyboard.hotkey(*keys)
+                    await self.input.hotkey(*keys)
                     return f"✅ {description} виконано"
                 
                 elif action == 'key':
                     key = shortcut.get('key')
-                    self.keyboard.press_key(key)
+                    await self.input.press(key)
                     return f"✅ {description} виконано"
                 
                 elif action == 'mouse_move':
-                    return self._execute_mouse_move(shortcut)
+                    return await self._execute_mouse_move(shortcut)
                 
                 elif action == 'mouse_center':
-                    return self._execute_mouse_center()
+                    return await self._execute_mouse_center()
                 
                 elif action == 'mouse_click':
                     button = shortcut.get('button', 'left')
-                    current_pos = pyautogui.position()
-                    if self.click.click(current_pos.x, current_pos.y, button=button):
+                    if await self.input.run(self._click_current, button=button):
                         return f"✅ {description} виконано"
                     else:
                         return f"❌ Помилка кліку миші"
                 
                 elif action == 'mouse_double_click':
-                    current_pos = pyautogui.position()
-                    if self.click.double_click(current_pos.x, current_pos.y):
+                    if await self.input.run(self._click_current, clicks=2):
                         return f"✅ {description} виконано"
                     else:
                         return f"❌ Помилка подвійного кліку миші"
@@ -308,7 +311,7 @@ class ShortcutExecutor:
                     return f"❌ Невалідна комбінація: '{shortcut_name}'\n\nДозволені клавіші: ctrl, alt, shift, enter, tab, escape, delete, backspace, space, f1-f12, home, end, pageup, pagedown, insert, стрілки, printscreen"
                 
                 logger.info(f"Executing custom shortcut: {shortcut_name}")
-                self.keyboard.hotkey(*keys)
+                await self.input.hotkey(*keys)
                 return f"✅ Комбінація {shortcut_name.upper()} виконана"
             
             else:
@@ -318,45 +321,41 @@ class ShortcutExecutor:
             logger.error(f"Shortcut execution error: {e}")
             return f"❌ Помилка виконання шорткату: {str(e)}"
     
-    def _execute_mouse_move(self, shortcut: dict) -> str:
-        """Виконує рух миші"""
+    def _click_current(self, button: str = 'left', clicks: int = 1) -> bool:
+        """Клік у поточній позиції курсора (виконується в потоці InputActuator)"""
+        # Спершу зсуви mouse_*, що ще не дійшли до курсора
+        self.motion.flush()
+        current_x, current_y = get_input_backend().position()
+        return self.click.click(current_x, current_y, button=button, clicks=clicks)
+    
+    # Зсув курсора для напрямків mouse_*
+    DIRECTIONS = {'up': (0, -1), 'down': (0, 1), 'left': (-1, 0), 'right': (1, 0)}
+    
+    async def _execute_mouse_move(self, shortcut: dict) -> str:
+        """Виконує рух миші (зсуви, що прийшли поки чекаємо, зливаються в MouseMotion)"""
         try:
             direction = shortcut.get('direction')
             distance = shortcut.get('distance', 50)
             description = shortcut.get('description', '')
             
-            current_x, current_y = pyautogui.position()
-            
-            if direction == 'up':
-                new_x, new_y = current_x, current_y - distance
-            elif direction == 'down':
-                new_x, new_y = current_x, current_y + distance
-            elif direction == 'left':
-                new_x, new_y = current_x - distance, current_y
-            elif direction == 'right':
-                new_x, new_y = current_x + distance, current_y
-            else:
+            if direction not in self.DIRECTIONS:
                 return f"❌ Невідомий напрямок: {direction}"
             
-            if self.click.move_mouse(new_x, new_y):
-                return f"✅ {description} виконано"
-            else:
-                return f"❌ Помилка руху миші"
+            dx, dy = self.DIRECTIONS[direction]
+            self.motion.nudge(dx * distance, dy * distance)
+            await self.motion.drain()
+            return f"✅ {description} виконано"
                 
         except Exception as e:
             logger.error(f"Mouse move error: {e}")
             return f"❌ Помилка руху миші: {str(e)}"
     
-    def _execute_mouse_center(self) -> str:
+    async def _execute_mouse_center(self) -> str:
         """Виконує рух миші в центр екрану"""
         try:
-            screen_width, screen_height = pyautogui.size()
-            center_x, center_y = screen_width // 2, screen_height // 2
-            
-            if self.click.move_mouse(center_x, center_y):
-                return f"✅ Рух миші в центр екрану виконано"
-            else:
-                return f"❌ Помилка руху миші в центр"
+            self.motion.center()
+            await self.motion.drain()
+            return f"✅ Рух миші в центр екрану виконано"
                 
         except Exception as e:
             logger.error(f"Mouse center error: {e}")